@@ -0,0 +1 @@
+"""Benchmarks for the interface parser and the wrappers."""
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Benchmark the calls of pybind bindings with Eigen arguments, wrapped with and
+without `--eigen_ref_args`, with NumPy arrays of both memory layouts.
+
+The benchmark wraps a small interface, compiles the two modules with the
+pybind11 headers of this repository, and times the calls of each module in a
+fresh interpreter, since both register the same C++ class. It needs a C++
+compiler, the Eigen headers and NumPy.
+
+E.g.
+```
+python benchmarks/eigen_args_benchmark.py --size 1000 --output new.json \
+    --baseline old.json
+```
+"""
+
+# pylint: disable=import-error, wrong-import-position
+
+import argparse
+import importlib.util
+import json
+import os
+import os.path as osp
+import platform
+import subprocess
+import sys
+import sysconfig
+import tempfile
+import timeit
+from typing import Any, Dict
+
+sys.path.append(osp.dirname(osp.dirname(osp.abspath(__file__))))
+
+from benchmarks.run_benchmarks import ROOT_DIR, git_commit
+from gtwrap.pybind_wrapper import PybindWrapper
+
+# The wrapped modules, keyed by their name, and whether they take the Eigen
+# arguments as Eigen::Ref.
+VARIANTS = {"eigen_args_copy": False, "eigen_args_ref": True}
+
+# The benchmarked calls: the wrapped method and the memory layout of the
+# argument, "F" for column major like Eigen, "C" for row major like NumPy.
+CASES = (("sumMatrix", "F"), ("sumMatrix", "C"), ("sumRef", "F"),
+         ("sumRef", "C"), ("sumVector", "F"))
+
+_HEADER = """
+#pragma once
+
+#include <Eigen/Core>
+
+namespace gtsam {
+using Matrix = Eigen::MatrixXd;
+using Vector = Eigen::VectorXd;
+}  // namespace gtsam
+
+namespace bench {
+class Summer {
+ public:
+  Summer() {}
+  double sumMatrix(const gtsam::Matrix& A) const { return A.sum(); }
+  double sumRef(const Eigen::Ref<const gtsam::Matrix>& A) const {
+    return A.sum();
+  }
+  double sumVector(const Eigen::Ref<const gtsam::Vector>& v) const {
+    return v.sum();
+  }
+};
+}  // namespace bench
+"""
+
+# The callees are declared with const references in the interface, as usual.
+_INTERFACE = """
+#include <eigen_args.h>
+
+namespace bench {
+class Summer {
+  Summer();
+  double sumMatrix(const gtsam::Matrix& A) const;
+  double sumRef(const gtsam::Matrix& A) const;
+  double sumVector(const gtsam::Vector& v) const;
+};
+}  // namespace bench
+"""
+
+# Run in a fresh interpreter to time the calls of a built module.
+_CHILD_CODE = """
+import json, sys
+from benchmarks.eigen_args_benchmark import _load_module, measure_calls
+module = _load_module(sys.argv[1], sys.argv[2])
+print(json.dumps(measure_calls(module, *map(int, sys.argv[3:]))))
+"""
+
+_TEMPLATE = """
+#include <pybind11/eigen.h>
+#include <pybind11/pybind11.h>
+
+{includes}
+
+{boost_class_export}
+
+namespace py = pybind11;
+
+PYBIND11_MODULE({module_name}, m_) {{
+    m_.doc() = "pybind11 wrapper of {module_name}";
+
+{wrapped_namespace}
+}}
+"""
+
+
+def write_sources(build_dir: str) -> Dict[str, str]:
+    """
+    Write the header and wrap the interface of the benchmark in `build_dir`.
+
+    Returns the generated .cpp file of each of the `VARIANTS`.
+    """
+    with open(osp.join(build_dir, "eigen_args.h"), "w",
+              encoding="UTF-8") as f:
+        f.write(_HEADER)
+    interface = osp.join(build_dir, "eigen_args.i")
+    with open(interface, "w", encoding="UTF-8") as f:
+        f.write(_INTERFACE)
+
+    sources = {}
+    for module_name, eigen_ref_args in VARIANTS.items():
+        wrapper = PybindWrapper(module_name=module_name,
+                                top_module_namespaces=[''],
+                                ignore_classes=[''],
+                                module_template=_TEMPLATE,
+                                eigen_ref_args=eigen_ref_args)
+        sources[module_name] = osp.join(build_dir, module_name + ".cpp")
+        wrapper.wrap([interface], sources[module_name])
+    return sources
+
+
+def build_module(source: str, cxx: str, eigen_include: str) -> str:
+    """Compile the wrapped `source` into an extension module next to it."""
+    module = osp.splitext(source)[0] + sysconfig.get_config_var("EXT_SUFFIX")
+    command = [
+        cxx, "-O2", "-DNDEBUG", "-shared", "-fPIC", "-std=c++17",
+        "-I" + osp.dirname(source), "-I" + eigen_include,
+        "-I" + osp.join(ROOT_DIR, "pybind11", "include"),
+        "-I" + sysconfig.get_paths()["include"], source, "-o", module
+    ]
+    if sys.platform == "darwin":
+        command[1:1] = ["-undefined", "dynamic_lookup"]
+    subprocess.run(command, check=True)
+    return module
+
+
+def _load_module(name: str, path: str):
+    """Import the extension module `name` from `path`."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure_calls(module, size: int, repeat: int,
+                  number: int) -> Dict[str, float]:
+    """
+    Measure the time per call of each of the `CASES` of the wrapped `module`,
+    with `size` x `size` matrices and vectors of the same number of entries.
+
+    The times are the best of `repeat` runs of `number` calls.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    summer = module.bench.Summer()
+    matrix = np.random.default_rng(0).random((size, size))
+    arguments = {
+        "F": np.asfortranarray(matrix),
+        "C": np.ascontiguousarray(matrix)
+    }
+    times = {}
+    for method, layout in CASES:
+        function = getattr(summer, method)
+        argument = arguments[layout]
+        if method == "sumVector":
+            argument = argument.reshape(-1, order="A")
+        times[f"{method}/{layout}"] = min(
+            timeit.repeat(lambda f=function, a=argument: f(a),
+                          number=number,
+                          repeat=repeat)) / number
+    return times
+
+
+def run_eigen_args_benchmark(size: int = 1000,
+                             repeat: int = 5,
+                             number: int = 20,
+                             cxx: str = "c++",
+                             eigen_include: str = "/usr/include/eigen3",
+                             build_dir: str = "") -> Dict[str, Any]:
+    """
+    Build the modules of the `VARIANTS` and measure their calls.
+
+    Returns the results along with the environment they were measured in.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        build_dir = build_dir or tmp_dir
+        sources = write_sources(build_dir)
+        results = []
+        for module_name, source in sources.items():
+            module = build_module(source, cxx, eigen_include)
+            output = subprocess.run([
+                sys.executable, "-c", _CHILD_CODE, module_name, module,
+                str(size),
+                str(repeat),
+                str(number)
+            ],
+                                    env=dict(os.environ, PYTHONPATH=ROOT_DIR),
+                                    capture_output=True,
+                                    text=True,
+                                    check=True).stdout
+            results.append({
+                "config": {
+                    "eigen_ref_args": VARIANTS[module_name],
+                    "size": size,
+                },
+                "times": json.loads(output),
+            })
+
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "number": number,
+        "results": results,
+    }
+
+
+def format_results(report: Dict[str, Any], baseline: Dict[str, Any] = None):
+    """
+    Format the results as a table of the times per call.
+
+    The times with `eigen_ref_args` are also shown relative to the times
+    without, or to the `baseline` report if given.
+    """
+    reference = {}
+    for result in (baseline or report)["results"]:
+        if baseline or not result["config"]["eigen_ref_args"]:
+            key = json.dumps(result["config"], sort_keys=True)
+            reference[key] = result["times"]
+
+    lines = [
+        f"{'eigen_ref_args':<15} {'size':>6} " +
+        " ".join(f"{case + ' [us]':>17} {'vs':>6}" for case in
+                 (f"{method}/{layout}" for method, layout in CASES))
+    ]
+    for result in report["results"]:
+        config = result["config"]
+        old_config = dict(config) if baseline else dict(config,
+                                                        eigen_ref_args=False)
+        old_times = reference.get(json.dumps(old_config, sort_keys=True), {})
+        cells = []
+        for case, time in result["times"].items():
+            old = old_times.get(case)
+            cells.append(f"{time * 1e6:>17.1f} " +
+                         (f"{time / old:>5.2f}x" if old else f"{'':>6}"))
+        lines.append(f"{str(config['eigen_ref_args']):<15} "
+                     f"{config['size']:>6} " + " ".join(cells))
+    return "\n".join(lines)
+
+
+def main():
+    """Main runner."""
+    arg_parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    arg_parser.add_argument("--size",
+                            type=int,
+                            default=1000,
+                            help="Number of rows and columns of the matrices")
+    arg_parser.add_argument("--repeat",
+                            type=int,
+                            default=5,
+                            help="Number of timed runs per call")
+    arg_parser.add_argument("--number",
+                            type=int,
+                            default=20,
+                            help="Number of calls per timed run")
+    arg_parser.add_argument("--cxx",
+                            type=str,
+                            default=os.environ.get("CXX", "c++"),
+                            help="The C++ compiler")
+    arg_parser.add_argument("--eigen_include",
+                            type=str,
+                            default="/usr/include/eigen3",
+                            help="The directory of the Eigen headers")
+    arg_parser.add_argument("--build_dir",
+                            type=str,
+                            default="",
+                            help="Directory to build the modules in, "
+                            "a temporary one by default")
+    arg_parser.add_argument("--output",
+                            type=str,
+                            default="",
+                            help="JSON file to write the results to")
+    arg_parser.add_argument("--baseline",
+                            type=str,
+                            default="",
+                            help="JSON results of an earlier run to compare to")
+    args = arg_parser.parse_args()
+
+    report = run_eigen_args_benchmark(args.size, args.repeat, args.number,
+                                      args.cxx, args.eigen_include,
+                                      args.build_dir)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="UTF-8") as f:
+            baseline = json.load(f)
+
+    print(format_results(report, baseline))
+
+    if args.output:
+        os.makedirs(osp.dirname(osp.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="UTF-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Generator for synthetic interface files of arbitrary size, to benchmark
+the parser, the template instantiator and the wrappers on GTSAM-scale inputs.
+"""
+
+import argparse
+from typing import Dict, List
+
+# Every n-th class is a template class.
+TEMPLATE_EVERY = 5
+
+
+def _namespaces(level: int) -> List[str]:
+    """The namespaces of the given nesting level, outermost first."""
+    return ["bench"] + [f"level{i}" for i in range(1, level + 1)]
+
+
+def _plain_class(name: str, qualified_name: str, other: str,
+                 num_methods: int) -> List[str]:
+    """Declaration of a non-template class with `num_methods` methods."""
+    lines = [f"class {name} {{"]
+    lines.append(f"  {name}();")
+    lines.append(f"  {name}(double x, int n);")
+    for j in range(num_methods):
+        if j % 3 == 0:
+            lines.append(f"  double method{j}(double x, int n) const;")
+        elif j % 3 == 1:
+            lines.append(
+                f"  {qualified_name} compose{j}(const {qualified_name}& other)"
+                " const;")
+        else:
+            lines.append(f"  void update{j}(const {other}& other, "
+                         "size_t index = 0);")
+    lines.append(f"  static {qualified_name} Create(double x);")
+    lines.append("  double value;")
+    lines.append("};")
+    return lines
+
+
+def _template_class(name: str, instantiations: List[str],
+                    num_methods: int) -> List[str]:
+    """Declaration of a template class with `num_methods` methods."""
+    lines = [f"template <T = {{{', '.join(instantiations)}}}>"]
+    lines.append(f"class {name} {{")
+    lines.append(f"  {name}();")
+    lines.append(f"  {name}(const T& t);")
+    lines.append("  T get() const;")
+    for j in range(num_methods):
+        if j % 2 == 0:
+            lines.append(f"  double method{j}(const T& t, double x) const;")
+        else:
+            lines.append(f"  void update{j}(const T& t);")
+    lines.append("};")
+    return lines
+
+
+def generate_interface(num_classes: int = 100,
+                       num_methods: int = 10,
+                       num_instantiations: int = 3,
+                       namespace_depth: int = 3) -> str:
+    """
+    Generate the content of a synthetic interface file.
+
+    The classes are spread round-robin over `namespace_depth` levels of
+    nested namespaces, `bench::level1::level2::...`.
+    Every `TEMPLATE_EVERY`-th class is a template class which is instantiated
+    with up to `num_instantiations` of the preceding non-template classes,
+    and every namespace also gets a global function.
+
+    Args:
+        num_classes: The total number of classes.
+        num_methods: The number of methods of each class.
+        num_instantiations: The number of instantiations of each template.
+        namespace_depth: The number of nested namespaces, at least 1.
+    """
+    namespace_depth = max(namespace_depth, 1)
+    declarations: Dict[int, List[str]] = {
+        level: []
+        for level in range(namespace_depth)
+    }
+    plain_classes: List[str] = []
+
+    for i in range(num_classes):
+        level = i % namespace_depth
+        prefix = "::".join(_namespaces(level))
+        if i % TEMPLATE_EVERY == TEMPLATE_EVERY - 1 and plain_classes:
+            name = f"Template{i}"
+            declarations[level] += _template_class(
+                name, plain_classes[-num_instantiations:], num_methods)
+        else:
+            name = f"Class{i}"
+            qualified_name = f"{prefix}::{name}"
+            other = plain_classes[-1] if plain_classes else qualified_name
+            declarations[level] += _plain_class(name, qualified_name, other,
+                                                num_methods)
+            plain_classes.append(qualified_name)
+
+    for level in range(namespace_depth):
+        declarations[level].append(
+            f"double function{level}(double x, int n = {level});")
+
+    lines: List[str] = []
+    for level in range(namespace_depth):
+        lines.append(f"namespace {_namespaces(level)[-1]} {{")
+        lines += declarations[level]
+    lines += ["}"] * namespace_depth
+
+    return "\n".join(lines) + "\n"
+
+
+def _factor_class(name: str, instantiations: List[str],
+                  num_methods: int) -> List[str]:
+    """
+    Declaration of a template class like the GTSAM factors, whose methods
+    use the template parameter in many ways.
+    """
+    lines = [f"template <T = {{{', '.join(instantiations)}}}>"]
+    lines.append(f"class {name} {{")
+    lines.append(f"  {name}(size_t key, const T& measured);")
+    lines.append("  T measured() const;")
+    lines.append("  static This Create(const T* measured);")
+    for j in range(num_methods):
+        if j % 4 == 0:
+            lines.append(f"  double error{j}(const T& a, const T& b, "
+                         "double scale = 1.0) const;")
+        elif j % 4 == 1:
+            lines.append(f"  std::vector<T> values{j}("
+                         "const std::vector<T>& others) const;")
+        elif j % 4 == 2:
+            lines.append(f"  This compose{j}(const This& other) const;")
+        else:
+            lines.append(f"  void print{j}(const string& s, size_t key) "
+                         "const;")
+    lines.append("};")
+    return lines
+
+
+def generate_templated_interface(num_templates: int = 20,
+                                 num_instantiations: int = 20,
+                                 num_methods: int = 10) -> str:
+    """
+    Generate an interface of template classes with many instantiations,
+    to benchmark the template instantiation.
+
+    Args:
+        num_templates: The number of template classes.
+        num_instantiations: The number of instantiations of each template.
+        num_methods: The number of methods of each template class.
+    """
+    lines = ["namespace bench {"]
+    values = []
+    for i in range(num_instantiations):
+        lines += [f"class Value{i} {{", f"  Value{i}();", "};"]
+        values.append(f"bench::Value{i}")
+    for i in range(num_templates):
+        lines += _factor_class(f"Factor{i}", values, num_methods)
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    """Main runner."""
+    arg_parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    arg_parser.add_argument("--classes",
+                            type=int,
+                            default=100,
+                            help="Number of classes")
+    arg_parser.add_argument("--methods",
+                            type=int,
+                            default=10,
+                            help="Number of methods per class")
+    arg_parser.add_argument("--instantiations",
+                            type=int,
+                            default=3,
+                            help="Number of instantiations per template")
+    arg_parser.add_argument("--depth",
+                            type=int,
+                            default=3,
+                            help="Depth of the namespace nesting")
+    arg_parser.add_argument("--out",
+                            type=str,
+                            required=True,
+                            help="Name of the output interface file")
+    args = arg_parser.parse_args()
+
+    with open(args.out, "w", encoding="UTF-8") as f:
+        f.write(
+            generate_interface(args.classes, args.methods,
+                               args.instantiations, args.depth))
+
+
+if __name__ == "__main__":
+    main()
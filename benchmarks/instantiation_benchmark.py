@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Benchmark the template instantiation of interfaces with template classes
+which have many instantiations, like the GTSAM factors, including the
+members of all the classes.
+
+E.g.
+```
+python benchmarks/instantiation_benchmark.py --instantiations 10 40 \
+    --output new.json --baseline old.json
+```
+"""
+
+# pylint: disable=import-error, wrong-import-position
+
+import argparse
+import json
+import os
+import os.path as osp
+import pickle
+import platform
+import sys
+from typing import Any, Dict, List
+
+sys.path.append(osp.dirname(osp.dirname(osp.abspath(__file__))))
+
+import gtwrap.template_instantiator as instantiator
+from benchmarks.generate_interface import generate_templated_interface
+from benchmarks.run_benchmarks import git_commit, measure
+from gtwrap.interface_parser import Module, Namespace
+
+
+def instantiate(namespace):
+    """
+    Instantiate the `namespace` and the members of all its classes,
+    which are otherwise only instantiated when they are wrapped.
+    """
+    namespace = instantiator.instantiate_namespace(namespace)
+    namespaces = [namespace]
+    while namespaces:
+        for element in namespaces.pop().content:
+            if isinstance(element, Namespace):
+                namespaces.append(element)
+            elif isinstance(element, instantiator.InstantiatedClass):
+                element.instantiate_members()
+    return namespace
+
+
+def run_instantiation_benchmark(sizes: List[int],
+                                num_templates: int = 20,
+                                num_methods: int = 10,
+                                repeat: int = 3) -> Dict[str, Any]:
+    """
+    Benchmark the instantiation of templates with each number of
+    instantiations in `sizes`.
+
+    Returns the results along with the environment they were measured in.
+    """
+    results = []
+    for num_instantiations in sizes:
+        config = {
+            "templates": num_templates,
+            "instantiations": num_instantiations,
+            "methods": num_methods,
+        }
+        content = generate_templated_interface(num_templates,
+                                               num_instantiations, num_methods)
+        parsed = pickle.dumps(
+            Module.parseString(content, backend="recursive_descent"))
+        results.append({
+            "config": config,
+            # The instantiation modifies the namespace, so use a fresh copy.
+            "instantiate": measure(lambda: pickle.loads(parsed), instantiate,
+                                   repeat),
+        })
+
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def format_results(report: Dict[str, Any], baseline: Dict[str, Any] = None):
+    """
+    Format the results as a table.
+
+    If a `baseline` report is given, the wall time is also shown relative to
+    the baseline for the same configuration.
+    """
+    baseline_stats = {}
+    if baseline:
+        for result in baseline["results"]:
+            key = json.dumps(result["config"], sort_keys=True)
+            baseline_stats[key] = result["instantiate"]
+
+    lines = [
+        f"{'templates':>10} {'instantiations':>15} {'wall [s]':>10} "
+        f"{'cpu [s]':>10} {'peak [MB]':>10} {'vs baseline':>12}"
+    ]
+    for result in report["results"]:
+        key = json.dumps(result["config"], sort_keys=True)
+        stats = result["instantiate"]
+        ratio = ""
+        old_stats = baseline_stats.get(key)
+        if old_stats and old_stats["wall_time"] > 0:
+            ratio = f"{stats['wall_time'] / old_stats['wall_time']:.2f}x"
+        lines.append(f"{result['config']['templates']:>10} "
+                     f"{result['config']['instantiations']:>15} "
+                     f"{stats['wall_time']:>10.3f} "
+                     f"{stats['cpu_time']:>10.3f} "
+                     f"{stats['peak_memory'] / 2**20:>10.1f} {ratio:>12}")
+    return "\n".join(lines)
+
+
+def main():
+    """Main runner."""
+    arg_parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    arg_parser.add_argument("--instantiations",
+                            type=int,
+                            nargs="+",
+                            default=[10, 40],
+                            help="The numbers of instantiations to benchmark")
+    arg_parser.add_argument("--templates",
+                            type=int,
+                            default=20,
+                            help="Number of template classes")
+    arg_parser.add_argument("--methods",
+                            type=int,
+                            default=10,
+                            help="Number of methods per template class")
+    arg_parser.add_argument("--repeat",
+                            type=int,
+                            default=3,
+                            help="Number of timed runs")
+    arg_parser.add_argument("--output",
+                            type=str,
+                            default="",
+                            help="JSON file to write the results to")
+    arg_parser.add_argument("--baseline",
+                            type=str,
+                            default="",
+                            help="JSON results of an earlier run to compare to")
+    args = arg_parser.parse_args()
+
+    report = run_instantiation_benchmark(args.instantiations, args.templates,
+                                         args.methods, args.repeat)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="UTF-8") as f:
+            baseline = json.load(f)
+
+    print(format_results(report, baseline))
+
+    if args.output:
+        os.makedirs(osp.dirname(osp.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="UTF-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Benchmark the memory used by large parsed and instantiated interface files,
+i.e. the memory retained by the syntax tree and the peak resident set size.
+Each interface is measured in a fresh interpreter so that the peak RSS of one
+measurement does not include the others.
+
+E.g.
+```
+python benchmarks/memory_benchmark.py --classes 500 1000 --output new.json \
+    --baseline old.json
+```
+"""
+
+# pylint: disable=import-error, wrong-import-position
+
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import os.path as osp
+import platform
+import sys
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+sys.path.append(osp.dirname(osp.dirname(osp.abspath(__file__))))
+
+import gtwrap.template_instantiator as instantiator
+from benchmarks.generate_interface import generate_interface
+from benchmarks.run_benchmarks import git_commit
+from gtwrap.interface_parser import Module
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def max_rss() -> int:
+    """Get the peak resident set size of this process in bytes, if known."""
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def measure_memory(content: str, backend: str) -> Dict[str, int]:
+    """
+    Measure the memory of parsing and instantiating the interface `content`.
+
+    The peak RSS is measured first, since tracing the allocations takes
+    memory itself, and the traced memory in a second run.
+    """
+    start_rss = max_rss()
+    module = instantiator.instantiate_namespace(
+        Module.parseString(content, backend=backend))
+    peak_rss = max_rss()
+    del module
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        module = instantiator.instantiate_namespace(
+            Module.parseString(content, backend=backend))
+        gc.collect()
+        retained_memory, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "retained_memory": retained_memory,
+        "peak_memory": peak_memory,
+        "start_rss": start_rss,
+        "peak_rss": peak_rss,
+    }
+
+
+def run_memory_benchmark(sizes: List[int],
+                         num_methods: int = 10,
+                         num_instantiations: int = 3,
+                         namespace_depth: int = 3,
+                         backend: str = "recursive_descent") -> Dict[str, Any]:
+    """
+    Measure the memory of interfaces with each number of classes in `sizes`.
+
+    Returns the results along with the environment they were measured in.
+    """
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for num_classes in sizes:
+        config = {
+            "classes": num_classes,
+            "methods": num_methods,
+            "instantiations": num_instantiations,
+            "depth": namespace_depth,
+        }
+        content = generate_interface(num_classes, num_methods,
+                                     num_instantiations, namespace_depth)
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            memory = pool.submit(measure_memory, content, backend).result()
+        results.append({
+            "config": config,
+            "interface_size": len(content),
+            "memory": memory,
+        })
+
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "backend": backend,
+        "results": results,
+    }
+
+
+def format_results(report: Dict[str, Any], baseline: Dict[str, Any] = None):
+    """
+    Format the results as a table.
+
+    If a `baseline` report is given, the retained memory and the growth of
+    the RSS are also shown relative to the baseline for the same
+    configuration.
+    """
+    baseline_memory = {}
+    if baseline:
+        for result in baseline["results"]:
+            key = json.dumps(result["config"], sort_keys=True)
+            baseline_memory[key] = result["memory"]
+
+    def ratio(new, old):
+        return f"{new / old:.2f}x" if old else ""
+
+    lines = [
+        f"{'classes':>8} {'retained [MB]':>14} {'traced peak [MB]':>17} "
+        f"{'RSS growth [MB]':>16} {'retained vs':>12} {'RSS vs':>12}"
+    ]
+    for result in report["results"]:
+        key = json.dumps(result["config"], sort_keys=True)
+        memory = result["memory"]
+        growth = memory["peak_rss"] - memory["start_rss"]
+        retained_ratio, growth_ratio = "", ""
+        old_memory = baseline_memory.get(key)
+        if old_memory:
+            old_growth = old_memory["peak_rss"] - old_memory["start_rss"]
+            retained_ratio = ratio(memory["retained_memory"],
+                                   old_memory["retained_memory"])
+            growth_ratio = ratio(growth, old_growth)
+        lines.append(f"{result['config']['classes']:>8} "
+                     f"{memory['retained_memory'] / 2**20:>14.1f} "
+                     f"{memory['peak_memory'] / 2**20:>17.1f} "
+                     f"{growth / 2**20:>16.1f} "
+                     f"{retained_ratio:>12} {growth_ratio:>12}")
+    return "\n".join(lines)
+
+
+def main():
+    """Main runner."""
+    arg_parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    arg_parser.add_argument("--classes",
+                            type=int,
+                            nargs="+",
+                            default=[250, 1000],
+                            help="The numbers of classes to measure")
+    arg_parser.add_argument("--methods",
+                            type=int,
+                            default=10,
+                            help="Number of methods per class")
+    arg_parser.add_argument("--instantiations",
+                            type=int,
+                            default=3,
+                            help="Number of instantiations per template")
+    arg_parser.add_argument("--depth",
+                            type=int,
+                            default=3,
+                            help="Depth of the namespace nesting")
+    arg_parser.add_argument("--backend",
+                            choices=Module.BACKENDS,
+                            default="recursive_descent",
+                            help="The parser backend")
+    arg_parser.add_argument("--output",
+                            type=str,
+                            default="",
+                            help="JSON file to write the results to")
+    arg_parser.add_argument("--baseline",
+                            type=str,
+                            default="",
+                            help="JSON results of an earlier run to compare to")
+    args = arg_parser.parse_args()
+
+    report = run_memory_benchmark(args.classes, args.methods,
+                                  args.instantiations, args.depth,
+                                  args.backend)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="UTF-8") as f:
+            baseline = json.load(f)
+
+    print(format_results(report, baseline))
+
+    if args.output:
+        os.makedirs(osp.dirname(osp.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="UTF-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Benchmark the parsing, template instantiation and wrapping of synthetic
+interface files, and write the timings and peak memory usage as JSON so that
+the results of different commits can be compared.
+
+E.g.
+```
+python benchmarks/run_benchmarks.py --classes 100 500 1000 --output new.json \
+    --baseline old.json
+```
+"""
+
+# pylint: disable=import-error, wrong-import-position
+
+import argparse
+import json
+import os
+import os.path as osp
+import pickle
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+sys.path.append(osp.dirname(osp.dirname(osp.abspath(__file__))))
+
+import pyparsing  # type: ignore
+
+import gtwrap.template_instantiator as instantiator
+from benchmarks.generate_interface import generate_interface
+from gtwrap.interface_parser import Module
+from gtwrap.matlab_wrapper import MatlabWrapper
+from gtwrap.pybind_wrapper import PybindWrapper
+
+ROOT_DIR = osp.dirname(osp.dirname(osp.abspath(__file__)))
+PYBIND_TEMPLATE = osp.join(ROOT_DIR, "templates", "pybind_wrapper.tpl.example")
+
+# The benchmarked phases. The wrapper phases run end to end,
+# i.e. they include parsing and instantiating the interface.
+PHASES = ("parse", "instantiate", "pybind_wrap_file", "matlab_wrap")
+
+
+def measure(setup: Callable[[], Any], run: Callable[[Any], Any],
+            repeat: int) -> Dict[str, float]:
+    """
+    Measure the wall time, CPU time and peak memory of `run(setup())`.
+
+    The times are the best of `repeat` runs. The peak memory is measured in
+    an extra run, since tracing the allocations slows down the execution.
+    """
+    wall_times, cpu_times = [], []
+    for _ in range(repeat):
+        arg = setup()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        run(arg)
+        wall_times.append(time.perf_counter() - wall_start)
+        cpu_times.append(time.process_time() - cpu_start)
+
+    arg = setup()
+    tracemalloc.start()
+    try:
+        run(arg)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_time": min(wall_times),
+        "cpu_time": min(cpu_times),
+        "peak_memory": peak_memory,
+    }
+
+
+def benchmark(content: str,
+              phases=PHASES,
+              repeat: int = 1,
+              backend: str = "pyparsing",
+              strip_comments: bool = False) -> Dict[str, Dict[str, float]]:
+    """
+    Benchmark the given phases on the interface `content`.
+
+    Args:
+        content: The contents of the interface file.
+        phases: The names of the phases to benchmark, see `PHASES`.
+        repeat: The number of timed runs of each phase.
+        backend: The parser backend used for the `parse` phase.
+        strip_comments: Whether the `parse` phase strips the comments first.
+    """
+    parsed = pickle.dumps(Module.parseString(content, backend=backend))
+
+    with open(PYBIND_TEMPLATE, "r", encoding="UTF-8") as f:
+        module_template = f.read()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        interface_file = osp.join(tmp_dir, "bench.i")
+        with open(interface_file, "w", encoding="UTF-8") as f:
+            f.write(content)
+
+        benchmarks = {
+            "parse": (lambda: content,
+                      lambda s: Module.parseString(
+                          s, backend=backend, strip_comments=strip_comments)),
+            # The instantiation modifies the namespace, so use a fresh copy.
+            "instantiate": (lambda: pickle.loads(parsed),
+                            instantiator.instantiate_namespace),
+            "pybind_wrap_file":
+            (lambda: PybindWrapper("bench", module_template=module_template),
+             lambda wrapper: wrapper.wrap_file(content, module_name="bench")),
+            "matlab_wrap": (lambda: MatlabWrapper("bench"),
+                            lambda wrapper: wrapper.wrap(
+                                [interface_file], osp.join(tmp_dir, "matlab"))),
+        }
+        for phase in phases:
+            setup, run = benchmarks[phase]
+            results[phase] = measure(setup, run, repeat)
+
+    return results
+
+
+def git_commit() -> str:
+    """Get the current commit of the repository, if available."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"],
+                              cwd=ROOT_DIR,
+                              capture_output=True,
+                              text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run_benchmarks(sizes: List[int],
+                   num_methods: int = 10,
+                   num_instantiations: int = 3,
+                   namespace_depth: int = 3,
+                   phases=PHASES,
+                   repeat: int = 1,
+                   backend: str = "pyparsing",
+                   strip_comments: bool = False) -> Dict[str, Any]:
+    """
+    Benchmark interfaces with each number of classes in `sizes`.
+
+    Returns the results along with the environment they were measured in.
+    """
+    results = []
+    for num_classes in sizes:
+        config = {
+            "classes": num_classes,
+            "methods": num_methods,
+            "instantiations": num_instantiations,
+            "depth": namespace_depth,
+        }
+        content = generate_interface(num_classes, num_methods,
+                                     num_instantiations, namespace_depth)
+        results.append({
+            "config": config,
+            "interface_size": len(content),
+            "phases": benchmark(content, phases, repeat, backend,
+                                strip_comments),
+        })
+
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pyparsing": pyparsing.__version__,
+        "backend": backend,
+        "strip_comments": strip_comments,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def format_results(report: Dict[str, Any], baseline: Dict[str, Any] = None):
+    """
+    Format the results as a table.
+
+    If a `baseline` report is given, the wall time of each phase is
+    also shown relative to the baseline for the same configuration.
+    """
+    baseline_phases = {}
+    if baseline:
+        for result in baseline["results"]:
+            key = json.dumps(result["config"], sort_keys=True)
+            baseline_phases[key] = result["phases"]
+
+    lines = [
+        f"{'classes':>8} {'phase':<18} {'wall [s]':>10} {'cpu [s]':>10} "
+        f"{'peak [MB]':>10} {'vs baseline':>12}"
+    ]
+    for result in report["results"]:
+        key = json.dumps(result["config"], sort_keys=True)
+        for phase, stats in result["phases"].items():
+            ratio = ""
+            old_stats = baseline_phases.get(key, {}).get(phase)
+            if old_stats and old_stats["wall_time"] > 0:
+                ratio = f"{stats['wall_time'] / old_stats['wall_time']:.2f}x"
+            lines.append(f"{result['config']['classes']:>8} {phase:<18} "
+                         f"{stats['wall_time']:>10.3f} "
+                         f"{stats['cpu_time']:>10.3f} "
+                         f"{stats['peak_memory'] / 2**20:>10.1f} {ratio:>12}")
+    return "\n".join(lines)
+
+
+def main():
+    """Main runner."""
+    arg_parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    arg_parser.add_argument("--classes",
+                            type=int,
+                            nargs="+",
+                            default=[10, 20, 40],
+                            help="The numbers of classes to benchmark")
+    arg_parser.add_argument("--methods",
+                            type=int,
+                            default=10,
+                            help="Number of methods per class")
+    arg_parser.add_argument("--instantiations",
+                            type=int,
+                            default=3,
+                            help="Number of instantiations per template")
+    arg_parser.add_argument("--depth",
+                            type=int,
+                            default=3,
+                            help="Depth of the namespace nesting")
+    arg_parser.add_argument("--phases",
+                            nargs="+",
+                            choices=PHASES,
+                            default=list(PHASES),
+                            help="The phases to benchmark")
+    arg_parser.add_argument("--repeat",
+                            type=int,
+                            default=1,
+                            help="Number of timed runs of each phase")
+    arg_parser.add_argument("--backend",
+                            choices=Module.BACKENDS,
+                            default="pyparsing",
+                            help="The parser backend for the parse phase")
+    arg_parser.add_argument("--strip_comments",
+                            action="store_true",
+                            help="Strip the comments before the parse phase")
+    arg_parser.add_argument("--output",
+                            type=str,
+                            default="",
+                            help="JSON file to write the results to")
+    arg_parser.add_argument("--baseline",
+                            type=str,
+                            default="",
+                            help="JSON results of an earlier run to compare to")
+    args = arg_parser.parse_args()
+
+    report = run_benchmarks(args.classes, args.methods, args.instantiations,
+                            args.depth, args.phases, args.repeat, args.backend,
+                            args.strip_comments)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="UTF-8") as f:
+            baseline = json.load(f)
+
+    print(format_results(report, baseline))
+
+    if args.output:
+        os.makedirs(osp.dirname(osp.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="UTF-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
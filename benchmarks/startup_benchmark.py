@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Benchmark the startup of the interface parser, i.e. the time to import
+`gtwrap.interface_parser` and the latency of the first parse, which includes
+building the grammar, in fresh interpreters. The wrapping scripts pay this
+for every interface file of a build.
+
+E.g.
+```
+python benchmarks/startup_benchmark.py --repeat 5 --output new.json \
+    --baseline old.json
+```
+"""
+
+# pylint: disable=import-error, wrong-import-position
+
+import argparse
+import json
+import os
+import os.path as osp
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+sys.path.append(osp.dirname(osp.dirname(osp.abspath(__file__))))
+
+from benchmarks.generate_interface import generate_interface
+from benchmarks.run_benchmarks import ROOT_DIR, git_commit
+
+# The measurements of each backend, in the order of the table.
+MEASUREMENTS = ("interpreter", "import", "first_parse", "second_parse",
+                "process")
+
+# Run in the fresh interpreter to time the import and the parses of the
+# interface given on the standard input.
+_CHILD_CODE = """
+import json, sys, time
+start = time.perf_counter()
+from gtwrap.interface_parser import Module
+imported = time.perf_counter()
+content = sys.stdin.read()
+Module.parseString(content, backend=sys.argv[1])
+first = time.perf_counter()
+Module.parseString(content, backend=sys.argv[1])
+second = time.perf_counter()
+print(json.dumps({"import": imported - start, "first_parse": first - imported,
+                  "second_parse": second - first}))
+"""
+
+
+def _run_python(args: List[str], stdin: str = "") -> Tuple[float, str]:
+    """
+    Run a fresh interpreter with `args`, returning its wall time and
+    standard output.
+    """
+    env = dict(os.environ,
+               PYTHONPATH=os.pathsep.join(
+                   [ROOT_DIR, os.environ.get("PYTHONPATH", "")]))
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable] + args,
+                            input=stdin,
+                            env=env,
+                            cwd=ROOT_DIR,
+                            capture_output=True,
+                            text=True,
+                            check=True)
+    return time.perf_counter() - start, result.stdout
+
+
+def measure_startup(content: str, backend: str,
+                    repeat: int) -> Dict[str, float]:
+    """
+    Measure the startup of parsing `content` with `backend` in fresh
+    interpreters.
+
+    The times are the best of `repeat` runs: `interpreter` is the wall time
+    of an empty interpreter, `import` the time to import the parser,
+    `first_parse` and `second_parse` the times of two parses of `content`
+    in the same interpreter, whose difference is mostly the time to build
+    the grammar, and `process` the wall time of the whole interpreter.
+    """
+    best = {name: float("inf") for name in MEASUREMENTS}
+    for _ in range(repeat):
+        interpreter, _ = _run_python(["-c", "pass"])
+        process, output = _run_python(["-c", _CHILD_CODE, backend], content)
+        times = dict(json.loads(output),
+                     interpreter=interpreter,
+                     process=process)
+        for name in MEASUREMENTS:
+            best[name] = min(best[name], times[name])
+    return best
+
+
+def run_startup_benchmark(backends: List[str],
+                          repeat: int = 3,
+                          num_classes: int = 2) -> Dict[str, Any]:
+    """
+    Measure the startup with each of the parser `backends`, parsing an
+    interface with `num_classes` classes.
+
+    Returns the results along with the environment they were measured in.
+    """
+    content = generate_interface(num_classes)
+    results = []
+    for backend in backends:
+        results.append({
+            "config": {
+                "backend": backend,
+                "classes": num_classes,
+            },
+            "times": measure_startup(content, backend, repeat),
+        })
+
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def format_results(report: Dict[str, Any], baseline: Dict[str, Any] = None):
+    """
+    Format the results as a table.
+
+    If a `baseline` report is given, the import and first parse times are
+    also shown relative to the baseline for the same backend.
+    """
+    baseline_times = {}
+    if baseline:
+        for result in baseline["results"]:
+            key = json.dumps(result["config"], sort_keys=True)
+            baseline_times[key] = result["times"]
+
+    def ratio(new, old):
+        return f"{new / old:.2f}x" if old else ""
+
+    lines = [
+        f"{'backend':<20} " +
+        " ".join(f"{name + ' [ms]':>17}" for name in MEASUREMENTS) +
+        f" {'import vs':>10} {'first vs':>10}"
+    ]
+    for result in report["results"]:
+        key = json.dumps(result["config"], sort_keys=True)
+        times = result["times"]
+        import_ratio, first_ratio = "", ""
+        old_times = baseline_times.get(key)
+        if old_times:
+            import_ratio = ratio(times["import"], old_times["import"])
+            first_ratio = ratio(times["first_parse"],
+                                old_times["first_parse"])
+        lines.append(f"{result['config']['backend']:<20} " +
+                     " ".join(f"{times[name] * 1000:>17.1f}"
+                              for name in MEASUREMENTS) +
+                     f" {import_ratio:>10} {first_ratio:>10}")
+    return "\n".join(lines)
+
+
+def main():
+    """Main runner."""
+    arg_parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    arg_parser.add_argument("--backends",
+                            nargs="+",
+                            default=["pyparsing", "recursive_descent"],
+                            help="The parser backends to measure")
+    arg_parser.add_argument("--classes",
+                            type=int,
+                            default=2,
+                            help="Number of classes of the parsed interface")
+    arg_parser.add_argument("--repeat",
+                            type=int,
+                            default=3,
+                            help="Number of fresh interpreters per backend")
+    arg_parser.add_argument("--output",
+                            type=str,
+                            default="",
+                            help="JSON file to write the results to")
+    arg_parser.add_argument("--baseline",
+                            type=str,
+                            default="",
+                            help="JSON results of an earlier run to compare to")
+    args = arg_parser.parse_args()
+
+    report = run_startup_benchmark(args.backends, args.repeat, args.classes)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="UTF-8") as f:
+            baseline = json.load(f)
+
+    print(format_results(report, baseline))
+
+    if args.output:
+        os.makedirs(osp.dirname(osp.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="UTF-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -104,6 +104,56 @@ macro(gtwrap_get_python_version)
 
 endmacro()
 
+# Run the wrapping scripts in a long-lived wrap server (see gtwrap/server.py),
+# which keeps the interface grammar and the caches of the parsed files warm
+# across the wrapping commands. The first command starts the server in the
+# background, and the commands run the scripts directly whenever the server is
+# not available, e.g. on Windows.
+option(GTWRAP_USE_WRAP_SERVER
+       "Run the wrapping scripts in a long-lived wrap server" OFF)
+# The path of the Unix socket of the server, which must be shorter than about
+# 100 characters.
+if(NOT DEFINED GTWRAP_WRAP_SERVER_SOCKET)
+  set(GTWRAP_WRAP_SERVER_SOCKET "${CMAKE_BINARY_DIR}/gtwrap_server.sock")
+endif()
+
+# The size and eviction mode of the packrat cache of the interface parser,
+# which trade the parsing speed against the memory used, see
+# gtwrap/interface_parser/packrat.py. Empty for the defaults.
+set(GTWRAP_PACKRAT_CACHE_SIZE
+    ""
+    CACHE STRING "Maximum number of entries of the packrat cache of the parser")
+set(GTWRAP_PACKRAT_MODE
+    ""
+    CACHE STRING "Eviction mode of the packrat cache: fifo, lru, unbounded or off")
+
+# Get the command which runs a wrapping script, through the wrap server if
+# GTWRAP_USE_WRAP_SERVER is on, with the options of the parser.
+#
+# Arguments:
+# ~~~
+# script: The wrapping script, e.g. PYBIND_WRAP_SCRIPT.
+# command: The variable to set to the command.
+function(gtwrap_script_command script command)
+  if(GTWRAP_USE_WRAP_SERVER)
+    # The client is installed next to the wrapping scripts.
+    get_filename_component(script_dir "${script}" DIRECTORY)
+    set(_command
+        ${PYTHON_EXECUTABLE} "${script_dir}/wrap_client.py" --socket
+        "${GTWRAP_WRAP_SERVER_SOCKET}" --spawn ${script})
+  else()
+    set(_command ${PYTHON_EXECUTABLE} ${script})
+  endif()
+
+  if(NOT "${GTWRAP_PACKRAT_CACHE_SIZE}" STREQUAL "")
+    list(APPEND _command --packrat_cache_size ${GTWRAP_PACKRAT_CACHE_SIZE})
+  endif()
+  if(NOT "${GTWRAP_PACKRAT_MODE}" STREQUAL "")
+    list(APPEND _command --packrat_mode ${GTWRAP_PACKRAT_MODE})
+  endif()
+  set(${command} ${_command} PARENT_SCOPE)
+endfunction()
+
 # Concatenate multiple wrapper interface headers into one.
 # The concatenation will be (re)performed if and only if any interface files
 # change.
@@ -5,6 +5,14 @@ else()
   set(GTWRAP_PACKAGE_DIR ${CMAKE_CURRENT_LIST_DIR}/..)
 endif()
 
+include(GtwrapUtils)
+
+# Directory in the build tree where the parsed interface files are cached, so
+# that regenerating the wrapper for an unchanged interface file skips parsing.
+if(NOT DEFINED GTWRAP_PARSE_CACHE_DIR)
+  set(GTWRAP_PARSE_CACHE_DIR "${CMAKE_BINARY_DIR}/gtwrap_parse_cache")
+endif()
+
 # Macro which finds and configure Matlab before we do any wrapping.
 macro(find_and_configure_matlab)
   find_package(
@@ -232,6 +240,8 @@ function(wrap_library_internal interfaceHeader moduleName linkLibraries extraInc
     set(GTWRAP_PATH_SEPARATOR ";")
   endif()
 
+  gtwrap_script_command(${MATLAB_WRAP_SCRIPT} _WRAP_SCRIPT_COMMAND)
+
   # Set boost serialization flag for the python script call below.
   if(use_boost_serialization)
     set(_BOOST_SERIALIZATION "--use-boost-serialization")
@@ -239,16 +249,22 @@ function(wrap_library_internal interfaceHeader moduleName linkLibraries extraInc
     set(_BOOST_SERIALIZATION "")
   endif(use_boost_serialization)
 
+  # The script leaves the unchanged files untouched, so that they are not
+  # recompiled, and the stamp file records that the command ran.
+  set(stamp_file "${generated_cpp_file}.stamp")
   add_custom_command(
-    OUTPUT ${generated_cpp_file}
+    OUTPUT ${stamp_file}
+    BYPRODUCTS ${generated_cpp_file}
     DEPENDS ${interfaceHeader} ${module_library_target} ${otherLibraryTargets}
             ${otherSourcesAndObjects}
     COMMAND
       ${CMAKE_COMMAND} -E env
       "PYTHONPATH=${GTWRAP_PACKAGE_DIR}${GTWRAP_PATH_SEPARATOR}$ENV{PYTHONPATH}"
-      ${PYTHON_EXECUTABLE} ${MATLAB_WRAP_SCRIPT} --src "${interfaceHeader}"
+      ${_WRAP_SCRIPT_COMMAND} --src "${interfaceHeader}"
       --module_name ${moduleName} --out ${generated_files_path}
       --top_module_namespaces ${moduleName} --ignore ${ignore_classes} ${_BOOST_SERIALIZATION}
+      --cache_dir "${GTWRAP_PARSE_CACHE_DIR}"
+    COMMAND ${CMAKE_COMMAND} -E touch ${stamp_file}
     VERBATIM
     WORKING_DIRECTORY ${generated_files_path})
 
@@ -257,7 +273,8 @@ function(wrap_library_internal interfaceHeader moduleName linkLibraries extraInc
   string(REPLACE ";" " " mexFlagsSpaced "${WRAP_BUILD_MEX_BINARY_FLAGS}")
   add_library(
     ${moduleName}_matlab_wrapper MODULE
-    ${generated_cpp_file} ${interfaceHeader} ${otherSourcesAndObjects})
+    ${generated_cpp_file} ${stamp_file} ${interfaceHeader}
+    ${otherSourcesAndObjects})
   target_link_libraries(${moduleName}_matlab_wrapper ${correctedOtherLibraries})
   target_link_libraries(${moduleName}_matlab_wrapper ${moduleName})
   set_target_properties(
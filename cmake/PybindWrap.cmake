@@ -21,6 +21,69 @@ else()
   set(GTWRAP_PYTHON_DOCS_SOURCE "")
 endif()
 
+# Directory in the build tree where the parsed interface files are cached, so
+# that regenerating the wrapper for an unchanged interface file skips parsing.
+if(NOT DEFINED GTWRAP_PARSE_CACHE_DIR)
+  set(GTWRAP_PARSE_CACHE_DIR "${CMAKE_BINARY_DIR}/gtwrap_parse_cache")
+endif()
+
+# Wrap all the submodule interface files with a single invocation of the
+# wrapping script, which parses and emits them concurrently, instead of with
+# one invocation per file. All the submodules are wrapped again whenever any of
+# them changes, but the unchanged files are not parsed again thanks to the
+# parse cache.
+option(GTWRAP_PYBIND_BATCH_SUBMODULES
+       "Wrap the Pybind11 submodules in a single batch of parallel processes" OFF)
+# The number of processes of the batch, 0 meaning one per CPU.
+if(NOT DEFINED GTWRAP_PYBIND_JOBS)
+  set(GTWRAP_PYBIND_JOBS 0)
+endif()
+
+# Split the classes of each wrapped module into this many extra .cpp files,
+# which are compiled in parallel and with less memory than a single file.
+if(NOT DEFINED GTWRAP_PYBIND_SHARDS)
+  set(GTWRAP_PYBIND_SHARDS 1)
+endif()
+
+# Also bind the functions with const reference arguments of Eigen types to
+# Eigen::Ref<const T> for the NumPy arrays with a matching memory layout, so
+# that these are not copied when the wrapped functions take Eigen::Ref
+# arguments. The other arrays are passed as before.
+option(GTWRAP_PYBIND_EIGEN_REF_ARGS
+       "Take the Eigen arguments of the Pybind11 bindings as Eigen::Ref" OFF)
+
+# Which references returned by the wrapped methods are returned to Python as
+# views into the objects instead of copies: none, eigen or all. A view
+# dangles if the referenced object is reallocated, so the default is none.
+if(NOT DEFINED GTWRAP_PYBIND_REFERENCE_RETURNS)
+  set(GTWRAP_PYBIND_REFERENCE_RETURNS none)
+endif()
+
+# The order in which pybind11 tries the overloads of a function: declaration,
+# or cost to try the overloads which copy fewer Eigen or STL arguments first.
+if(NOT DEFINED GTWRAP_PYBIND_OVERLOAD_ORDER)
+  set(GTWRAP_PYBIND_OVERLOAD_ORDER declaration)
+endif()
+
+# Get the names of the shards of the generated file cpp_file, i.e. the files
+# <name>_<k>.cpp written by the wrapping script with --shards.
+function(gtwrap_pybind_shard_files cpp_file shard_files)
+  set(files "")
+  if(GTWRAP_PYBIND_SHARDS GREATER 1)
+    get_filename_component(directory "${cpp_file}" DIRECTORY)
+    get_filename_component(name "${cpp_file}" NAME_WLE)
+    get_filename_component(extension "${cpp_file}" LAST_EXT)
+    if(directory)
+      set(name "${directory}/${name}")
+    endif()
+    math(EXPR last_shard "${GTWRAP_PYBIND_SHARDS} - 1")
+    foreach(shard RANGE ${last_shard})
+      list(APPEND files "${name}_${shard}${extension}")
+    endforeach()
+  endif()
+  set(${shard_files} ${files} PARENT_SCOPE)
+endfunction()
+
 # User-friendly Pybind11 wrapping and installing function. Builds a Pybind11
 # module from the provided interface_headers. For example, for the interface
 # header gtsam.h, this will build the wrap module 'gtsam_py.cc'.
@@ -56,6 +119,11 @@ function(
   else(USE_BOOST_SERIALIZATION)
     set(_WRAP_BOOST_ARG "")
   endif(USE_BOOST_SERIALIZATION)
+  if(GTWRAP_PYBIND_EIGEN_REF_ARGS)
+    set(_WRAP_EIGEN_REF_ARG "--eigen_ref_args")
+  else()
+    set(_WRAP_EIGEN_REF_ARG "")
+  endif()
 
   if(UNIX)
     set(GTWRAP_PATH_SEPARATOR ":")
@@ -63,6 +131,8 @@ function(
     set(GTWRAP_PATH_SEPARATOR ";")
   endif()
 
+  gtwrap_script_command(${PYBIND_WRAP_SCRIPT} _WRAP_SCRIPT_COMMAND)
+
   # Create a copy of interface_headers so we can freely manipulate it
   set(interface_files ${interface_headers})
 
@@ -74,46 +144,102 @@ function(
     # This block gets the interface file name and does the replacement
     get_filename_component(interface ${interface_file} NAME_WLE)
     set(cpp_file "${interface}.cpp")
-    list(APPEND cpp_files ${cpp_file})
+    gtwrap_pybind_shard_files(${cpp_file} shard_files)
+    list(APPEND cpp_files ${cpp_file} ${shard_files})
+    set(interface_dependencies "${module_name}/specializations/${interface}.h" "${module_name}/preamble/${interface}.h")
+    list(APPEND submodule_dependencies "${interface_file}" ${interface_dependencies})
+
+    if(GTWRAP_PYBIND_BATCH_SUBMODULES)
+      continue()
+    endif()
 
     # Wrap the specific interface header
     # This is done so that we can create CMake dependencies in such a way so that when changing a single .i file,
     # the others don't need to be regenerated.
     # NOTE: We have to use `add_custom_command` so set the dependencies correctly.
     # https://stackoverflow.com/questions/40032593/cmake-does-not-rebuild-dependent-after-prerequisite-changes
+    # The script leaves the unchanged files untouched, so that they are not
+    # recompiled, and the stamp file records that the command ran. Otherwise
+    # the Makefile generators would run it again on every build, since the
+    # untouched files stay older than the interface file.
+    set(stamp_file "${cpp_file}.stamp")
+    list(APPEND stamp_files ${stamp_file})
     add_custom_command(
-      OUTPUT ${cpp_file}
+      OUTPUT ${stamp_file}
+      BYPRODUCTS ${cpp_file} ${shard_files}
       COMMAND
         ${CMAKE_COMMAND} -E env
         "PYTHONPATH=${GTWRAP_PACKAGE_DIR}${GTWRAP_PATH_SEPARATOR}$ENV{PYTHONPATH}"
-        ${PYTHON_EXECUTABLE} ${PYBIND_WRAP_SCRIPT} --src "${interface_file}"
+        ${_WRAP_SCRIPT_COMMAND} --src "${interface_file}"
           --out "${cpp_file}"  --module_name ${module_name}
           --top_module_namespaces "${top_namespace}" --ignore ${ignore_classes}
           --template ${module_template} --is_submodule ${_WRAP_BOOST_ARG}
           --xml_source "${GTWRAP_PYTHON_DOCS_SOURCE}"
-      DEPENDS "${interface_file}" ${module_template} "${module_name}/specializations/${interface}.h" "${module_name}/preamble/${interface}.h"
+          --cache_dir "${GTWRAP_PARSE_CACHE_DIR}"
+          --shards ${GTWRAP_PYBIND_SHARDS}
+          --reference_returns ${GTWRAP_PYBIND_REFERENCE_RETURNS}
+          ${_WRAP_EIGEN_REF_ARG}
+          --overload_order ${GTWRAP_PYBIND_OVERLOAD_ORDER}
+      COMMAND ${CMAKE_COMMAND} -E touch ${stamp_file}
+      DEPENDS "${interface_file}" ${module_template} ${interface_dependencies}
       VERBATIM)
 
   endforeach()
 
+  if(GTWRAP_PYBIND_BATCH_SUBMODULES AND interface_files)
+    # Wrap all the submodules at once.
+    set(stamp_file "${module_name}_submodules.stamp")
+    list(APPEND stamp_files ${stamp_file})
+    add_custom_command(
+      OUTPUT ${stamp_file}
+      BYPRODUCTS ${cpp_files}
+      COMMAND
+        ${CMAKE_COMMAND} -E env
+        "PYTHONPATH=${GTWRAP_PACKAGE_DIR}${GTWRAP_PATH_SEPARATOR}$ENV{PYTHONPATH}"
+        ${_WRAP_SCRIPT_COMMAND} --src "${interface_files}"
+          --out "${cpp_files}"  --module_name ${module_name}
+          --top_module_namespaces "${top_namespace}" --ignore ${ignore_classes}
+          --template ${module_template} --is_submodule ${_WRAP_BOOST_ARG}
+          --xml_source "${GTWRAP_PYTHON_DOCS_SOURCE}"
+          --cache_dir "${GTWRAP_PARSE_CACHE_DIR}"
+          --jobs ${GTWRAP_PYBIND_JOBS}
+          --shards ${GTWRAP_PYBIND_SHARDS}
+          --reference_returns ${GTWRAP_PYBIND_REFERENCE_RETURNS}
+          ${_WRAP_EIGEN_REF_ARG}
+          --overload_order ${GTWRAP_PYBIND_OVERLOAD_ORDER}
+      COMMAND ${CMAKE_COMMAND} -E touch ${stamp_file}
+      DEPENDS ${module_template} ${submodule_dependencies}
+      VERBATIM)
+  endif()
+
   get_filename_component(main_interface_name ${main_interface} NAME_WLE)
   set(main_cpp_file "${main_interface_name}.cpp")
-  list(PREPEND cpp_files ${main_cpp_file})
+  gtwrap_pybind_shard_files(${generated_cpp} main_shard_files)
+  list(PREPEND cpp_files ${main_cpp_file} ${main_shard_files})
 
+  set(stamp_file "${main_cpp_file}.stamp")
+  list(APPEND stamp_files ${stamp_file})
   add_custom_command(
-    OUTPUT ${main_cpp_file}
+    OUTPUT ${stamp_file}
+    BYPRODUCTS ${main_cpp_file} ${main_shard_files}
     COMMAND
       ${CMAKE_COMMAND} -E env
       "PYTHONPATH=${GTWRAP_PACKAGE_DIR}${GTWRAP_PATH_SEPARATOR}$ENV{PYTHONPATH}"
-      ${PYTHON_EXECUTABLE} ${PYBIND_WRAP_SCRIPT} --src "${interface_headers}"
+      ${_WRAP_SCRIPT_COMMAND} --src "${interface_headers}"
       --out "${generated_cpp}" --module_name ${module_name}
       --top_module_namespaces "${top_namespace}" --ignore ${ignore_classes}
       --template ${module_template} ${_WRAP_BOOST_ARG}
       --xml_source "${GTWRAP_PYTHON_DOCS_SOURCE}"
+      --cache_dir "${GTWRAP_PARSE_CACHE_DIR}"
+      --shards ${GTWRAP_PYBIND_SHARDS}
+      --reference_returns ${GTWRAP_PYBIND_REFERENCE_RETURNS}
+      ${_WRAP_EIGEN_REF_ARG}
+      --overload_order ${GTWRAP_PYBIND_OVERLOAD_ORDER}
+    COMMAND ${CMAKE_COMMAND} -E touch ${stamp_file}
     DEPENDS "${main_interface}" ${module_template} "${module_name}/specializations/${main_interface_name}.h" "${module_name}/specializations/${main_interface_name}.h"
     VERBATIM)
 
-    add_custom_target(pybind_wrap_${module_name} DEPENDS ${cpp_files})
+    add_custom_target(pybind_wrap_${module_name} DEPENDS ${stamp_files})
 
   pybind11_add_module(${target} "${cpp_files}")
 
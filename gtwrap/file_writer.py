@@ -0,0 +1,95 @@
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Writing of the generated files which leaves the unchanged files untouched.
+"""
+
+import hashlib
+import os
+from typing import List, Sequence
+
+# The size of the blocks in which the existing files are read.
+_BLOCK_SIZE = 1 << 16
+
+
+def _content_digest(chunks: Sequence[str]) -> bytes:
+    """
+    Hash the content given as a sequence of chunks, as the bytes which are
+    written to the file, i.e. with the line endings of the platform.
+    """
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        if os.linesep != "\n":
+            chunk = chunk.replace("\n", os.linesep)
+        digest.update(chunk.encode("UTF-8"))
+    return digest.digest()
+
+
+def _file_digest(path: str) -> bytes:
+    """
+    Hash the raw bytes of the file at `path`, or return None if it cannot
+    be read.
+
+    The file is read in binary mode, so that a file which only differs in
+    its line endings is written again.
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(_BLOCK_SIZE), b""):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.digest()
+
+
+class FileWriter:
+    """
+    Write the generated files, skipping the ones whose content has not
+    changed.
+
+    A file which is not written keeps its modification time, so that the
+    build tools do not recompile the generated code when it is the same.
+
+    E.g.
+    ```
+    writer = FileWriter()
+    writer.write("gtsam.cpp", chunks)
+    print(writer.summary())
+    ```
+    """
+
+    def __init__(self):
+        # The paths of the files which were written and skipped.
+        self.written: List[str] = []
+        self.skipped: List[str] = []
+
+    def write(self, path: str, chunks: Sequence[str]) -> bool:
+        """
+        Write the `chunks` to the file at `path`, unless it already has
+        this content.
+
+        Returns whether the file was written.
+        """
+        if _file_digest(path) == _content_digest(chunks):
+            self.skipped.append(path)
+            return False
+
+        with open(path, "w", encoding="UTF-8") as f:
+            f.writelines(chunks)
+        self.written.append(path)
+        return True
+
+    def merge(self, other: "FileWriter"):
+        """Add the files written and skipped by the `other` writer."""
+        self.written.extend(other.written)
+        self.skipped.extend(other.skipped)
+
+    def summary(self) -> str:
+        """Summarize the numbers of files written and skipped."""
+        return "{} file(s) written, {} unchanged file(s) skipped".format(
+            len(self.written), len(self.skipped))
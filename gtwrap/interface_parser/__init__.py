@@ -20,6 +20,7 @@ from .enum import *
 from .function import *
 from .module import *
 from .namespace import *
+from .packrat import *
 from .template import *
 from .tokens import *
 from .type import *
@@ -41,5 +42,3 @@ if sys.version_info >= (3, 8):
 
     # apply the monkey-patch
     pyparsing.ParseResults.__getattr__ = fixed_get_attr
-
-pyparsing.ParserElement.enablePackrat()
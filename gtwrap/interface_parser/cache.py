@@ -0,0 +1,158 @@
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+On-disk cache for parsed interface files.
+"""
+
+import functools
+import hashlib
+import os
+import os.path as osp
+import pickle
+import tempfile
+from collections import OrderedDict
+from typing import Any
+
+import pyparsing  # type: ignore
+
+# Bump this if the layout of the cache entries changes.
+CACHE_FORMAT_VERSION = 1
+
+
+@functools.lru_cache(maxsize=None)
+def grammar_version() -> str:
+    """
+    Return a key which identifies the current interface grammar.
+
+    The key is a hash of the source of every module in the `interface_parser`
+    package (i.e. `tokens.py` and all the rule classes), along with the
+    pyparsing version and the cache format, so that any change to the
+    grammar or the AST classes invalidates previously cached parse results.
+    """
+    package_dir = osp.dirname(osp.abspath(__file__))
+    digest = hashlib.sha256()
+    digest.update(f"{CACHE_FORMAT_VERSION}:{pyparsing.__version__}:"
+                  f"{pickle.HIGHEST_PROTOCOL}".encode())
+
+    for filename in sorted(os.listdir(package_dir)):
+        if not filename.endswith(".py"):
+            continue
+        with open(osp.join(package_dir, filename), "rb") as f:
+            digest.update(filename.encode())
+            digest.update(f.read())
+
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """
+    Content-hash keyed cache of parsed interface files.
+
+    Each entry is the pickled `Namespace` tree of a parsed file, stored in
+    `cache_dir` under the hash of the grammar version and the file content.
+
+    A long-lived process like the wrap server can also keep the most
+    recent entries in memory with `enable_memory`, in which case the
+    `cache_dir` is optional.
+
+    Args:
+        cache_dir: The directory in which to store the cache entries,
+            usually somewhere in the build directory.
+    """
+
+    # The pickled entries kept in memory, most recently used last,
+    # or None if disabled.
+    memory: "OrderedDict[str, bytes]" = None
+    memory_size = 0
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    @classmethod
+    def enable_memory(cls, maxsize: int = 64):
+        """Keep the `maxsize` most recently used entries in memory."""
+        cls.memory = OrderedDict()
+        cls.memory_size = maxsize
+
+    @classmethod
+    def _remember(cls, key: str, data: bytes):
+        """Keep the pickled entry `data` in memory, if enabled."""
+        if cls.memory is None:
+            return
+        cls.memory[key] = data
+        cls.memory.move_to_end(key)
+        while len(cls.memory) > cls.memory_size:
+            cls.memory.popitem(last=False)
+
+    def key(self, content: str) -> str:
+        """Get the cache key for the interface `content`."""
+        digest = hashlib.sha256(grammar_version().encode())
+        digest.update(content.encode("UTF-8"))
+        return digest.hexdigest()
+
+    def path(self, content: str) -> str:
+        """Get the path of the cache entry for the interface `content`."""
+        return osp.join(self.cache_dir, self.key(content) + ".pickle")
+
+    def load(self, content: str) -> Any:
+        """
+        Load the parsed result for `content`.
+
+        Returns None if there is no (valid) entry in the cache.
+        """
+        key = self.key(content)
+        if ParseCache.memory is not None and key in ParseCache.memory:
+            ParseCache.memory.move_to_end(key)
+            # Unpickle a new copy, since the instantiation modifies it.
+            return pickle.loads(ParseCache.memory[key])
+        if not self.cache_dir:
+            return None
+
+        try:
+            with open(osp.join(self.cache_dir, key + ".pickle"), "rb") as f:
+                data = f.read()
+            parsed = pickle.loads(data)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError,
+                ImportError, IndexError, TypeError, ValueError):
+            # A missing, stale or corrupted entry is simply a cache miss.
+            return None
+        self._remember(key, data)
+        return parsed
+
+    def store(self, content: str, parsed: Any) -> bool:
+        """
+        Save the parsed result for `content` into the cache.
+
+        Caching is best-effort, so failures (e.g. a read-only build directory)
+        are not fatal and are only reported through the return value.
+        """
+        try:
+            data = pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, RecursionError):
+            return False
+        self._remember(self.key(content), data)
+        if not self.cache_dir:
+            return True
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temporary file first and then move it in place,
+            # so that concurrent wrap processes never see a partial entry.
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        except OSError:
+            return False
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path(content))
+        except OSError:
+            if osp.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+        return True
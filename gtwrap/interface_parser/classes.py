@@ -13,15 +13,14 @@ Author: Duy Nguyen Ta, Fan Jiang, Matthew Sklar, Varun Agrawal, and Frank Dellae
 from typing import Any, Iterable, List, Union
 
 from pyparsing import ZeroOrMore  # type: ignore
-from pyparsing import Literal, Optional, Word, alphas
+from pyparsing import Literal, Optional, ParseResults, Word, alphas
 
 from .enum import Enum
 from .function import ArgumentList, ReturnType
 from .template import Template
-from .tokens import (CLASS, COLON, CONST, DUNDER, IDENT, LBRACE, LPAREN,
-                     OPERATOR, RBRACE, RPAREN, SEMI_COLON, STATIC, VIRTUAL)
+from .tokens import Tokens
 from .type import TemplatedType, Typename
-from .utils import collect_namespaces
+from .utils import check_attributes, collect_namespaces, lazy_rule
 from .variable import Variable
 
 
@@ -33,20 +32,50 @@ class Method:
     ```
     class Hello {
         void sayHello() const;
+        [[release_gil]] void optimize();
     };
     ```
+
+    The attributes of a method are:
+        release_gil: Release the GIL while the method runs.
+        copy_return: Return a copy of the referenced object, instead of a
+            reference into the object of the method.
+        reference_return: Return a reference into the object of the
+            method, instead of a copy of the referenced object.
+        eigen_ref: Take the Eigen arguments as `Eigen::Ref`, for methods
+            whose C++ arguments are `Eigen::Ref`.
+        batch: Also wrap a vectorized `<name>_batch` variant, which calls
+            the method for all the elements of arrays of arguments.
+        prefer: Try this overload before the other overloads.
+        noconvert: Only call this overload with arguments of the exact types,
+            without implicit conversions.
     """
-    rule = (
-        Optional(Template.rule("template"))  #
-        + ReturnType.rule("return_type")  #
-        + IDENT("name")  #
-        + LPAREN  #
-        + ArgumentList.rule("args_list")  #
-        + RPAREN  #
-        + Optional(CONST("is_const"))  #
-        + SEMI_COLON  # BR
-    ).setParseAction(lambda t: Method(t.template, t.name, t.return_type, t.
-                                      args_list, t.is_const))
+    __slots__ = ("template", "name", "return_type", "args", "is_const",
+                 "parent", "attributes")
+
+    # The attributes which a method can have.
+    ALLOWED_ATTRIBUTES = ("release_gil", "copy_return", "reference_return",
+                          "eigen_ref", "batch", "prefer", "noconvert")
+
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a method."""
+        return (
+            Optional(Template.rule("template"))  #
+            + Optional(Tokens.ATTRIBUTES("attributes"))  #
+            + ReturnType.rule("return_type")  #
+            + Tokens.IDENT("name")  #
+            + Tokens.LPAREN  #
+            + ArgumentList.rule("args_list")  #
+            + Tokens.RPAREN  #
+            + Optional(Tokens.CONST("is_const"))  #
+            + Tokens.SEMI_COLON  # BR
+        ).setParseAction(lambda t: Method(t.template,
+                                          t.name,
+                                          t.return_type,
+                                          t.args_list,
+                                          t.is_const,
+                                          attributes=t.attributes))
 
     def __init__(self,
                  template: Union[Template, Any],
@@ -54,7 +83,8 @@ class Method:
                  return_type: ReturnType,
                  args: ArgumentList,
                  is_const: str,
-                 parent: Union["Class", Any] = ''):
+                 parent: Union["Class", Any] = '',
+                 attributes: Iterable[str] = ()):
         self.template = template
         self.name = name
         self.return_type = return_type
@@ -62,6 +92,8 @@ class Method:
         self.is_const = is_const
 
         self.parent = parent
+        self.attributes = tuple(attributes)
+        check_attributes(self.attributes, self.ALLOWED_ATTRIBUTES, name)
 
     def to_cpp(self) -> str:
         """Generate the C++ code for wrapping."""
@@ -85,33 +117,55 @@ class StaticMethod:
     ```
     class Hello {
         static void changeGreeting();
+        [[release_gil]] static Hello load(string filename);
     };
     ```
+
+    The attributes of a static method are:
+        release_gil: Release the GIL while the method runs.
+        eigen_ref: Take the Eigen arguments as `Eigen::Ref`, see `Method`.
+        batch: Also wrap a vectorized variant, see `Method`.
+        prefer: Try this overload first, see `Method`.
+        noconvert: Disallow implicit conversions, see `Method`.
     """
-    rule = (
-        Optional(Template.rule("template"))  #
-        + STATIC  #
-        + ReturnType.rule("return_type")  #
-        + IDENT("name")  #
-        + LPAREN  #
-        + ArgumentList.rule("args_list")  #
-        + RPAREN  #
-        + SEMI_COLON  # BR
-    ).setParseAction(
-        lambda t: StaticMethod(t.name, t.return_type, t.args_list, t.template))
+    # The attributes which a static method can have.
+    ALLOWED_ATTRIBUTES = ("release_gil", "eigen_ref", "batch", "prefer",
+                          "noconvert")
+
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a static method."""
+        return (
+            Optional(Template.rule("template"))  #
+            + Optional(Tokens.ATTRIBUTES("attributes"))  #
+            + Tokens.STATIC  #
+            + ReturnType.rule("return_type")  #
+            + Tokens.IDENT("name")  #
+            + Tokens.LPAREN  #
+            + ArgumentList.rule("args_list")  #
+            + Tokens.RPAREN  #
+            + Tokens.SEMI_COLON  # BR
+        ).setParseAction(lambda t: StaticMethod(t.name,
+                                                t.return_type,
+                                                t.args_list,
+                                                t.template,
+                                                attributes=t.attributes))
 
     def __init__(self,
                  name: str,
                  return_type: ReturnType,
                  args: ArgumentList,
                  template: Union[Template, Any] = None,
-                 parent: Union["Class", Any] = ''):
+                 parent: Union["Class", Any] = '',
+                 attributes: Iterable[str] = ()):
         self.name = name
         self.return_type = return_type
         self.args = args
         self.template = template
 
         self.parent = parent
+        self.attributes = tuple(attributes)
+        check_attributes(self.attributes, self.ALLOWED_ATTRIBUTES, name)
 
     def __repr__(self) -> str:
         return "static {} {}{}".format(self.return_type, self.name, self.args)
@@ -126,14 +180,18 @@ class Constructor:
     Rule to parse the class constructor.
     Can have 0 or more arguments.
     """
-    rule = (
-        Optional(Template.rule("template"))  #
-        + IDENT("name")  #
-        + LPAREN  #
-        + ArgumentList.rule("args_list")  #
-        + RPAREN  #
-        + SEMI_COLON  # BR
-    ).setParseAction(lambda t: Constructor(t.name, t.args_list, t.template))
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a constructor."""
+        return (
+            Optional(Template.rule("template"))  #
+            + Tokens.IDENT("name")  #
+            + Tokens.LPAREN  #
+            + ArgumentList.rule("args_list")  #
+            + Tokens.RPAREN  #
+            + Tokens.SEMI_COLON  # BR
+        ).setParseAction(
+            lambda t: Constructor(t.name, t.args_list, t.template))
 
     def __init__(self,
                  name: str,
@@ -160,17 +218,20 @@ class Operator:
         Vector2 operator+(const Vector2 &v) const;
     };
     """
-    rule = (
-        ReturnType.rule("return_type")  #
-        + Literal("operator")("name")  #
-        + OPERATOR("operator")  #
-        + LPAREN  #
-        + ArgumentList.rule("args_list")  #
-        + RPAREN  #
-        + CONST("is_const")  #
-        + SEMI_COLON  # BR
-    ).setParseAction(lambda t: Operator(t.name, t.operator, t.return_type, t.
-                                        args_list, t.is_const))
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for an operator overload."""
+        return (
+            ReturnType.rule("return_type")  #
+            + Literal("operator")("name")  #
+            + Tokens.OPERATOR("operator")  #
+            + Tokens.LPAREN  #
+            + ArgumentList.rule("args_list")  #
+            + Tokens.RPAREN  #
+            + Tokens.CONST("is_const")  #
+            + Tokens.SEMI_COLON  # BR
+        ).setParseAction(lambda t: Operator(t.name, t.operator, t.return_type,
+                                            t.args_list, t.is_const))
 
     def __init__(self,
                  name: str,
@@ -215,15 +276,19 @@ class Operator:
 
 class DunderMethod:
     """Special Python double-underscore (dunder) methods, e.g. __iter__, __contains__"""
-    rule = (
-        DUNDER  #
-        + (Word(alphas))("name")  #
-        + DUNDER  #
-        + LPAREN  #
-        + ArgumentList.rule("args_list")  #
-        + RPAREN  #
-        + SEMI_COLON  # BR
-    ).setParseAction(lambda t: DunderMethod(t.name, t.args_list))
+
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a dunder method."""
+        return (
+            Tokens.DUNDER  #
+            + (Word(alphas))("name")  #
+            + Tokens.DUNDER  #
+            + Tokens.LPAREN  #
+            + ArgumentList.rule("args_list")  #
+            + Tokens.RPAREN  #
+            + Tokens.SEMI_COLON  # BR
+        ).setParseAction(lambda t: DunderMethod(t.name, t.args_list))
 
     def __init__(self, name: str, args: ArgumentList):
         self.name = name
@@ -242,21 +307,61 @@ class Class:
     class Hello {
         ...
     };
+
+    class [[release_gil]] Optimizer {
+        ...
+    };
     ```
+
+    The attributes of a class are:
+        release_gil: Release the GIL while any method or static method of
+            the class runs.
+        copy_return: Return copies from all the methods of the class, see
+            `Method`.
+        reference_return: Return references from all the methods of the
+            class, see `Method`.
+        eigen_ref: Take the Eigen arguments of all the methods and static
+            methods of the class as `Eigen::Ref`, see `Method`.
     """
+    # The attributes which a class can have.
+    ALLOWED_ATTRIBUTES = ("release_gil", "copy_return", "reference_return",
+                          "eigen_ref")
 
     class Members:
         """
         Rule for all the members within a class.
         """
-        rule = ZeroOrMore(DunderMethod.rule  #
-                          ^ Constructor.rule  #
-                          ^ Method.rule  #
-                          ^ StaticMethod.rule  #
-                          ^ Variable.rule  #
-                          ^ Operator.rule  #
-                          ^ Enum.rule  #
-                          ).setParseAction(lambda t: Class.Members(t.asList()))
+        @lazy_rule
+        def rule(cls):  # pylint: disable=no-self-argument
+            """The rule for the members of a class."""
+            return ZeroOrMore(DunderMethod.rule  #
+                              ^ Constructor.rule  #
+                              ^ Method.rule  #
+                              ^ StaticMethod.rule  #
+                              ^ Variable.rule  #
+                              ^ Operator.rule  #
+                              ^ Enum.rule  #
+                              ).setParseAction(
+                                  lambda t: Class.Members(t.asList()))
+
+        @lazy_rule
+        def ordered_rule(cls):  # pylint: disable=no-self-argument
+            """
+            Same as `rule`, but the alternatives are tried in order instead of
+            all of them, the ones led by a keyword or token first.
+            No two alternatives match the same text, except for a dunder
+            method which also matches as a constructor, so the first match is
+            the same as the longest match.
+            """
+            return ZeroOrMore(DunderMethod.rule  #
+                              | Enum.rule  #
+                              | StaticMethod.rule  #
+                              | Method.rule  #
+                              | Constructor.rule  #
+                              | Operator.rule  #
+                              | Variable.rule  #
+                              ).setParseAction(
+                                  lambda t: Class.Members(t.asList()))
 
         def __init__(self, members: List[Union[Constructor, Method,
                                                StaticMethod, Variable,
@@ -284,21 +389,40 @@ class Class:
                 elif isinstance(m, Enum):
                     self.enums.append(m)
 
-    _parent = COLON + (TemplatedType.rule ^ Typename.rule)("parent_class")
-    rule = (
-        Optional(Template.rule("template"))  #
-        + Optional(VIRTUAL("is_virtual"))  #
-        + CLASS  #
-        + IDENT("name")  #
-        + Optional(_parent)  #
-        + LBRACE  #
-        + Members.rule("members")  #
-        + RBRACE  #
-        + SEMI_COLON  # BR
-    ).setParseAction(lambda t: Class(
-        t.template, t.is_virtual, t.name, t.parent_class, t.members.ctors, t.
-        members.methods, t.members.static_methods, t.members.dunder_methods, t.
-        members.properties, t.members.operators, t.members.enums))
+    @lazy_rule
+    def _head(cls):  # pylint: disable=no-self-argument
+        """The rule for the head of a class, up to its members."""
+        parent = Tokens.COLON + (TemplatedType.rule
+                                 ^ Typename.rule)("parent_class")
+        return (
+            Optional(Template.rule("template"))  #
+            + Optional(Tokens.VIRTUAL("is_virtual"))  #
+            + Tokens.CLASS  #
+            + Optional(Tokens.ATTRIBUTES("attributes"))  #
+            + Tokens.IDENT("name")  #
+            + Optional(parent)  #
+            + Tokens.LBRACE  #
+        )
+
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a class."""
+        return (
+            cls._head  #
+            + cls.Members.rule("members")  #
+            + Tokens.RBRACE  #
+            + Tokens.SEMI_COLON  # BR
+        ).setParseAction(lambda t: Class.from_parse_result(t))
+
+    @lazy_rule
+    def ordered_rule(cls):  # pylint: disable=no-self-argument
+        """Same as `rule`, but with the members' alternatives tried in order."""
+        return (
+            cls._head  #
+            + cls.Members.ordered_rule("members")  #
+            + Tokens.RBRACE  #
+            + Tokens.SEMI_COLON  # BR
+        ).setParseAction(lambda t: Class.from_parse_result(t))
 
     def __init__(
         self,
@@ -314,6 +438,7 @@ class Class:
         operators: List[Operator],
         enums: List[Enum],
         parent: Any = '',
+        attributes: Iterable[str] = (),
     ):
         self.template = template
         self.is_virtual = is_virtual
@@ -341,6 +466,8 @@ class Class:
         self.enums = enums
 
         self.parent = parent
+        self.attributes = tuple(attributes)
+        check_attributes(self.attributes, self.ALLOWED_ATTRIBUTES, name)
 
         # Make sure ctors' names and class name are the same.
         for ctor in self.ctors:
@@ -359,6 +486,16 @@ class Class:
         for _property in self.properties:
             _property.parent = self
 
+    @staticmethod
+    def from_parse_result(t: ParseResults):
+        """Return the result of parsing."""
+        return Class(t.template, t.is_virtual, t.name, t.parent_class,
+                     t.members.ctors, t.members.methods,
+                     t.members.static_methods, t.members.dunder_methods,
+                     t.members.properties, t.members.operators,
+                     t.members.enums,
+                     attributes=t.attributes)
+
     def namespaces(self) -> list:
         """Get the namespaces which this class is nested under as a list."""
         return collect_namespaces(self)
@@ -12,18 +12,20 @@ Author: Duy Nguyen Ta, Fan Jiang, Matthew Sklar, Varun Agrawal, and Frank Dellae
 
 from pyparsing import CharsNotIn, Optional  # type: ignore
 
-from .tokens import (CLASS, COLON, INCLUDE, LOPBRACK, ROPBRACK, SEMI_COLON,
-                     VIRTUAL)
+from .tokens import Tokens
 from .type import Typename
-from .utils import collect_namespaces
+from .utils import collect_namespaces, lazy_rule
 
 
 class Include:
     """
     Rule to parse #include directives.
     """
-    rule = (INCLUDE + LOPBRACK + CharsNotIn('>')("header") +
-            ROPBRACK).setParseAction(lambda t: Include(t.header))
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for an include."""
+        return (Tokens.INCLUDE + Tokens.LOPBRACK + CharsNotIn('>')("header") +
+                Tokens.ROPBRACK).setParseAction(lambda t: Include(t.header))
 
     def __init__(self, header: CharsNotIn, parent: str = ''):
         self.header = header
@@ -37,10 +39,14 @@ class ForwardDeclaration:
     """
     Rule to parse forward declarations in the interface file.
     """
-    rule = (Optional(VIRTUAL("is_virtual")) + CLASS + Typename.rule("name") +
-            Optional(COLON + Typename.rule("parent_type")) +
-            SEMI_COLON).setParseAction(lambda t: ForwardDeclaration(
-                t.name, t.parent_type, t.is_virtual))
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a forward declaration."""
+        return (Optional(Tokens.VIRTUAL("is_virtual")) + Tokens.CLASS +
+                Typename.rule("name") +
+                Optional(Tokens.COLON + Typename.rule("parent_type")) +
+                Tokens.SEMI_COLON).setParseAction(lambda t: ForwardDeclaration(
+                    t.name, t.parent_type, t.is_virtual))
 
     def __init__(self,
                  typename: Typename,
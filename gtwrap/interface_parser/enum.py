@@ -12,17 +12,20 @@ Author: Varun Agrawal
 
 from pyparsing import delimitedList  # type: ignore
 
-from .tokens import ENUM, IDENT, LBRACE, RBRACE, SEMI_COLON
+from .tokens import Tokens
 from .type import Typename
-from .utils import collect_namespaces
+from .utils import collect_namespaces, lazy_rule
 
 
 class Enumerator:
     """
     Rule to parse an enumerator inside an enum.
     """
-    rule = (
-        IDENT("enumerator")).setParseAction(lambda t: Enumerator(t.enumerator))
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for an enumerator."""
+        return (Tokens.IDENT("enumerator")).setParseAction(
+            lambda t: Enumerator(t.enumerator))
 
     def __init__(self, name):
         self.name = name
@@ -44,9 +47,13 @@ class Enum:
     ```
     """
 
-    rule = (ENUM + IDENT("name") + LBRACE +
-            delimitedList(Enumerator.rule)("enumerators") + RBRACE +
-            SEMI_COLON).setParseAction(lambda t: Enum(t.name, t.enumerators))
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for an enum."""
+        return (Tokens.ENUM + Tokens.IDENT("name") + Tokens.LBRACE +
+                delimitedList(Enumerator.rule)("enumerators") +
+                Tokens.RBRACE + Tokens.SEMI_COLON).setParseAction(
+                    lambda t: Enum(t.name, t.enumerators))
 
     def __init__(self, name, enumerators, parent=''):
         self.name = name
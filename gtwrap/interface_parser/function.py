@@ -15,9 +15,9 @@ from typing import Any, Iterable, List, Union
 from pyparsing import Literal, Optional, ParseResults, delimitedList
 
 from .template import Template
-from .tokens import (COMMA, DEFAULT_ARG, EQUAL, IDENT, LOPBRACK, LPAREN, PAIR,
-                     ROPBRACK, RPAREN, SEMI_COLON)
+from .tokens import Tokens
 from .type import TemplatedType, Type
+from .utils import check_attributes, lazy_rule
 
 
 class Argument:
@@ -29,13 +29,19 @@ class Argument:
     void sayHello(/*`s` is the method argument with type `const string&`*/ const string& s);
     ```
     """
-    rule = ((Type.rule ^ TemplatedType.rule)("ctype")  #
-            + IDENT("name")  #
-            + Optional(EQUAL + DEFAULT_ARG)("default")
-            ).setParseAction(lambda t: Argument(
-                t.ctype,  #
-                t.name,  #
-                t.default[0] if isinstance(t.default, ParseResults) else None))
+    __slots__ = ("ctype", "name", "default", "parent")
+
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for an argument."""
+        return ((Type.rule ^ TemplatedType.rule)("ctype")  #
+                + Tokens.IDENT("name")  #
+                + Optional(Tokens.EQUAL + Tokens.DEFAULT_ARG)("default")
+                ).setParseAction(lambda t: Argument(
+                    t.ctype,  #
+                    t.name,  #
+                    t.default[0]
+                    if isinstance(t.default, ParseResults) else None))
 
     def __init__(self,
                  ctype: Union[Type, TemplatedType],
@@ -61,8 +67,15 @@ class ArgumentList:
     """
     List of Argument objects for all arguments in a function.
     """
-    rule = Optional(delimitedList(Argument.rule)("args_list")).setParseAction(
-        lambda t: ArgumentList.from_parse_result(t.args_list))
+    # `backup` holds the arguments with their defaults in the MATLAB wrapper.
+    __slots__ = ("args_list", "parent", "backup")
+
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for an argument list."""
+        return Optional(
+            delimitedList(Argument.rule)("args_list")).setParseAction(
+                lambda t: ArgumentList.from_parse_result(t.args_list))
 
     def __init__(self, args_list: List[Argument]):
         self.args_list = args_list
@@ -105,19 +118,24 @@ class ReturnType:
 
     The return type can either be a single type or a pair such as <type1, type2>.
     """
-    # rule to parse optional std:: in front of `pair`
-    optional_std = Optional(Literal('std::')).suppress()
-    _pair = (
-        optional_std + PAIR.suppress()  #
-        + LOPBRACK  #
-        + Type.rule("type1")  #
-        + COMMA  #
-        + Type.rule("type2")  #
-        + ROPBRACK  #
-    )
-    rule = (_pair ^
-            (Type.rule ^ TemplatedType.rule)("type1")).setParseAction(  # BR
-                lambda t: ReturnType(t.type1, t.type2))
+    __slots__ = ("type1", "type2", "parent")
+
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a return type."""
+        # rule to parse optional std:: in front of `pair`
+        optional_std = Optional(Literal('std::')).suppress()
+        pair = (
+            optional_std + Tokens.PAIR.suppress()  #
+            + Tokens.LOPBRACK  #
+            + Type.rule("type1")  #
+            + Tokens.COMMA  #
+            + Type.rule("type2")  #
+            + Tokens.ROPBRACK  #
+        )
+        return (pair ^
+                (Type.rule ^ TemplatedType.rule)("type1")).setParseAction(  # BR
+                    lambda t: ReturnType(t.type1, t.type2))
 
     def __init__(self, type1: Union[Type, TemplatedType], type2: Type):
         # If a TemplatedType, the return is a ParseResults, so we extract out the type.
@@ -154,29 +172,59 @@ class ReturnType:
 class GlobalFunction:
     """
     Rule to parse functions defined in the global scope.
+
+    E.g.
+    ```
+    [[release_gil]] Values optimize(const Graph& graph);
+    ```
+
+    The attributes of a function are:
+        release_gil: Release the GIL while the function runs.
+        eigen_ref: Take the Eigen arguments as `Eigen::Ref`, for functions
+            whose C++ arguments are `Eigen::Ref`.
+        batch: Also wrap a vectorized `<name>_batch` variant, which calls
+            the function for all the elements of arrays of arguments.
+        prefer: Try this overload before the other overloads.
+        noconvert: Only call this overload with arguments of the exact types,
+            without implicit conversions.
     """
-    rule = (
-        Optional(Template.rule("template")) + ReturnType.rule("return_type")  #
-        + IDENT("name")  #
-        + LPAREN  #
-        + ArgumentList.rule("args_list")  #
-        + RPAREN  #
-        + SEMI_COLON  #
-    ).setParseAction(lambda t: GlobalFunction(t.name, t.return_type, t.
-                                              args_list, t.template))
+    # The attributes which a function can have.
+    ALLOWED_ATTRIBUTES = ("release_gil", "eigen_ref", "batch", "prefer",
+                          "noconvert")
+
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a global function."""
+        return (
+            Optional(Template.rule("template"))  #
+            + Optional(Tokens.ATTRIBUTES("attributes"))  #
+            + ReturnType.rule("return_type")  #
+            + Tokens.IDENT("name")  #
+            + Tokens.LPAREN  #
+            + ArgumentList.rule("args_list")  #
+            + Tokens.RPAREN  #
+            + Tokens.SEMI_COLON  #
+        ).setParseAction(lambda t: GlobalFunction(t.name,
+                                                  t.return_type,
+                                                  t.args_list,
+                                                  t.template,
+                                                  attributes=t.attributes))
 
     def __init__(self,
                  name: str,
                  return_type: ReturnType,
                  args_list: ArgumentList,
                  template: Template,
-                 parent: Any = ''):
+                 parent: Any = '',
+                 attributes: Iterable[str] = ()):
         self.name = name
         self.return_type = return_type
         self.args = args_list
         self.template = template
 
         self.parent = parent
+        self.attributes = tuple(attributes)
+        check_attributes(self.attributes, self.ALLOWED_ATTRIBUTES, name)
         self.return_type.parent = self
         self.args.parent = self
 
@@ -12,18 +12,47 @@ Author: Duy Nguyen Ta, Fan Jiang, Matthew Sklar, Varun Agrawal, and Frank Dellae
 
 # pylint: disable=unnecessary-lambda, unused-import, expression-not-assigned, no-else-return, protected-access, too-few-public-methods, too-many-arguments
 
-from pyparsing import (ParseResults, ZeroOrMore,  # type: ignore
-                       cppStyleComment, stringEnd)
+from pyparsing import (ParseElementEnhance,  # type: ignore
+                       ParseException, ParseExpression, ParserElement,
+                       ParseResults, ZeroOrMore, stringEnd)
 
+from . import packrat, preprocess, recursive_descent
+from .cache import ParseCache
 from .classes import Class
 from .declaration import ForwardDeclaration, Include
 from .enum import Enum
 from .function import GlobalFunction
 from .namespace import Namespace
+from .packrat import PackratStats
 from .template import TypedefTemplateInstantiation
+from .utils import lazy_rule
 from .variable import Variable
 
 
+def _without_ignored(element: ParserElement, memo=None) -> ParserElement:
+    """
+    Copy the grammar `element` and all the elements nested in it, without
+    the expressions they ignore, e.g. comments.
+    The other attributes, e.g. the parse actions, are shared with `element`.
+    """
+    if memo is None:
+        memo = {}
+    if id(element) in memo:
+        # Already copied, e.g. a recursive Forward.
+        return memo[id(element)]
+
+    element_copy = element.copy()
+    memo[id(element)] = element_copy
+    element_copy.ignoreExprs = []
+    if isinstance(element, ParseExpression):
+        element_copy.exprs = [
+            _without_ignored(expr, memo) for expr in element.exprs
+        ]
+    elif isinstance(element, ParseElementEnhance) and element.expr is not None:
+        element_copy.expr = _without_ignored(element.expr, memo)
+    return element_copy
+
+
 class Module:
     """
     Module is just a global namespace.
@@ -36,21 +65,144 @@ class Module:
     ```
     """
 
-    rule = (
-        ZeroOrMore(ForwardDeclaration.rule  #
-                   ^ Include.rule  #
-                   ^ Class.rule  #
-                   ^ TypedefTemplateInstantiation.rule  #
-                   ^ GlobalFunction.rule  #
-                   ^ Enum.rule  #
-                   ^ Variable.rule  #
-                   ^ Namespace.rule  #
-                   ).setParseAction(lambda t: Namespace('', t.asList())) +
-        stringEnd)
+    # The rules for the whole file are built when they are first used, since
+    # combining and copying the rules of all the declarations is slow and
+    # not needed by the recursive descent parser.
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for an interface file."""
+        return (
+            ZeroOrMore(ForwardDeclaration.rule  #
+                       ^ Include.rule  #
+                       ^ Class.rule  #
+                       ^ TypedefTemplateInstantiation.rule  #
+                       ^ GlobalFunction.rule  #
+                       ^ Enum.rule  #
+                       ^ Variable.rule  #
+                       ^ Namespace.rule  #
+                       ).setParseAction(lambda t: Namespace('', t.asList())) +
+            stringEnd)
+
+    @lazy_rule
+    def ordered_rule(cls):  # pylint: disable=no-self-argument
+        """
+        Same as `rule`, but the alternatives are tried in order instead of
+        all of them, the ones led by a keyword or token first.
+        """
+        return (
+            ZeroOrMore(Include.rule  #
+                       | Namespace.ordered_rule  #
+                       | TypedefTemplateInstantiation.rule  #
+                       | Enum.rule  #
+                       | Class.ordered_rule  #
+                       | ForwardDeclaration.rule  #
+                       | GlobalFunction.rule  #
+                       | Variable.rule  #
+                       ).setParseAction(lambda t: Namespace('', t.asList())) +
+            stringEnd)
+
+    # Copies of the rules for text which has no comments left, so that the
+    # comments are not looked for between all the tokens.
+    @lazy_rule.uncommented
+    def uncommented_rule(cls):  # pylint: disable=no-self-argument
+        """`rule` for text without comments."""
+        return _without_ignored(cls.rule)
+
+    @lazy_rule.uncommented
+    def uncommented_ordered_rule(cls):  # pylint: disable=no-self-argument
+        """`ordered_rule` for text without comments."""
+        return _without_ignored(cls.ordered_rule)
+
+    # The available parsers, the pyparsing rules being the reference.
+    BACKENDS = ("pyparsing", "pyparsing_ordered", "recursive_descent")
+
+    @staticmethod
+    def parseString(s: str,
+                    cache_dir: str = "",
+                    backend: str = "pyparsing",
+                    strip_comments: bool = False,
+                    packrat_cache_size: int = None,
+                    packrat_mode: str = None,
+                    packrat_stats: PackratStats = None) -> ParseResults:
+        """
+        Parse the source string and apply the rules.
+
+        Args:
+            s: The contents of the interface file.
+            cache_dir: Optional directory for caching the parsed result.
+                If the same content has been parsed before with the same
+                version of the grammar, the cached result is loaded instead.
+            backend: The parser to use, either "pyparsing" for the grammar
+                rules, "pyparsing_ordered" for the grammar rules with the
+                alternatives tried in order, or "recursive_descent" for the
+                faster hand-written parser. All give the same result.
+            strip_comments: Remove the comments and normalize the whitespace
+                in a single pass before parsing, so that the grammar rules
+                need not look for comments between all the tokens.
+                Errors still refer to the locations in `s`.
+            packrat_cache_size: If given, the maximum number of entries of
+                the packrat cache of the pyparsing rules, see
+                `configure_packrat`. The setting stays for later parses.
+                If neither this nor `packrat_mode` is ever given, the first
+                parse with the pyparsing rules configures the defaults.
+            packrat_mode: If given, how the packrat cache evicts entries,
+                one of `PACKRAT_MODES`. The setting stays for later parses.
+            packrat_stats: If given, the hits, misses and peak size of the
+                packrat cache of this parse are added to it.
+        """
+        if backend not in Module.BACKENDS:
+            raise ValueError(f"Unknown parser backend {backend}, "
+                             f"expected one of {Module.BACKENDS}")
+        if packrat_cache_size is not None or packrat_mode is not None:
+            packrat.configure_packrat(
+                packrat.DEFAULT_PACKRAT_CACHE_SIZE
+                if packrat_cache_size is None else packrat_cache_size,
+                packrat_mode or "fifo")
+
+        if not cache_dir and ParseCache.memory is None:
+            return Module._parse(s, backend, strip_comments, packrat_stats)
+
+        cache = ParseCache(cache_dir)
+        module = cache.load(s)
+        if module is None:
+            module = Module._parse(s, backend, strip_comments, packrat_stats)
+            cache.store(s, module)
+        return module
+
+    @staticmethod
+    def _parse(s: str, backend: str, strip_comments: bool,
+               stats: PackratStats) -> Namespace:
+        """Parse the source string with the given backend."""
+        if not strip_comments:
+            return Module._parse_with(s, backend, "rule", "ordered_rule",
+                                      stats)
 
-    rule.ignore(cppStyleComment)
+        stripped, source_map = preprocess.strip_comments(s)
+        try:
+            return Module._parse_with(stripped, backend, "uncommented_rule",
+                                      "uncommented_ordered_rule", stats)
+        except ParseException as e:
+            # Point at the location of the error in the original source.
+            raise ParseException(s, source_map.source_offset(e.loc), e.msg,
+                                 e.parser_element) from None
 
     @staticmethod
-    def parseString(s: str) -> ParseResults:
-        """Parse the source string and apply the rules."""
-        return Module.rule.parseString(s)[0]
+    def _parse_with(s: str, backend: str, rule_name: str,
+                    ordered_rule_name: str, stats: PackratStats) -> Namespace:
+        """
+        Parse the source string with the backend, given the names of the
+        rules to use, which are only built for the pyparsing backends.
+        """
+        if backend == "recursive_descent":
+            return recursive_descent.parse(s)
+        rule = getattr(
+            Module, ordered_rule_name
+            if backend == "pyparsing_ordered" else rule_name)
+        packrat.ensure_packrat()
+        try:
+            return rule.parseString(s)[0]
+        finally:
+            if stats is not None:
+                stats.merge(packrat.packrat_stats())
+            # Release the intermediate results of this parse.
+            ParserElement.reset_cache()
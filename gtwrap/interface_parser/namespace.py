@@ -12,7 +12,8 @@ Author: Duy Nguyen Ta, Fan Jiang, Matthew Sklar, Varun Agrawal, and Frank Dellae
 
 # pylint: disable=unnecessary-lambda, expression-not-assigned
 
-from typing import List, Union
+import functools
+from typing import Dict, List, Tuple, Union
 
 from pyparsing import Forward, ParseResults, ZeroOrMore  # type: ignore
 
@@ -21,8 +22,9 @@ from .declaration import ForwardDeclaration, Include
 from .enum import Enum
 from .function import GlobalFunction
 from .template import TypedefTemplateInstantiation
-from .tokens import IDENT, LBRACE, NAMESPACE, RBRACE
+from .tokens import Tokens
 from .type import Typename
+from .utils import lazy_rule
 from .variable import Variable
 
 
@@ -38,43 +40,88 @@ def find_sub_namespace(namespace: "Namespace",
     if not str_namespaces:
         return [namespace]
 
-    sub_namespaces = (ns for ns in namespace.content
-                      if isinstance(ns, Namespace))
+    sub_namespaces, _ = namespace.symbols()
+    return list(sub_namespaces.get(tuple(str_namespaces), []))
 
-    found_namespaces = [
-        ns for ns in sub_namespaces if ns.name == str_namespaces[0]
-    ]
-    if not found_namespaces:
-        return []
 
-    res = []
-    for found_namespace in found_namespaces:
-        ns = find_sub_namespace(found_namespace, str_namespaces[1:])
-        if ns:
-            res += ns
-    return res
+class _Content(list):
+    """
+    The content of a namespace, a list which counts the changes made to the
+    content of all the namespaces, so that the indices of the namespaces
+    are built again after them, see `Namespace.symbols`.
+    """
+    # The number of changes so far.
+    version = 0
+
+
+def _counting(method):
+    """Wrap the list `method` to count the change it makes."""
+
+    @functools.wraps(method)
+    def counting(self, *args, **kwargs):
+        _Content.version += 1
+        return method(self, *args, **kwargs)
+
+    return counting
+
+
+for _method in ("__setitem__", "__delitem__", "__iadd__", "__imul__",
+                "append", "extend", "insert", "pop", "remove", "clear",
+                "sort", "reverse"):
+    setattr(_Content, _method, _counting(getattr(list, _method)))
 
 
 class Namespace:
     """Rule for parsing a namespace in the interface file."""
 
-    rule = Forward()
-    rule << (
-        NAMESPACE  #
-        + IDENT("name")  #
-        + LBRACE  #
-        + ZeroOrMore(  # BR
-            ForwardDeclaration.rule  #
-            ^ Include.rule  #
-            ^ Class.rule  #
-            ^ TypedefTemplateInstantiation.rule  #
-            ^ GlobalFunction.rule  #
-            ^ Enum.rule  #
-            ^ Variable.rule  #
-            ^ rule  #
-        )("content")  # BR
-        + RBRACE  #
-    ).setParseAction(lambda t: Namespace.from_parse_result(t))
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a namespace, which may contain namespaces."""
+        rule = Forward()
+        rule << (
+            Tokens.NAMESPACE  #
+            + Tokens.IDENT("name")  #
+            + Tokens.LBRACE  #
+            + ZeroOrMore(  # BR
+                ForwardDeclaration.rule  #
+                ^ Include.rule  #
+                ^ Class.rule  #
+                ^ TypedefTemplateInstantiation.rule  #
+                ^ GlobalFunction.rule  #
+                ^ Enum.rule  #
+                ^ Variable.rule  #
+                ^ rule  #
+            )("content")  # BR
+            + Tokens.RBRACE  #
+        ).setParseAction(lambda t: Namespace.from_parse_result(t))
+        return rule
+
+    @lazy_rule
+    def ordered_rule(cls):  # pylint: disable=no-self-argument
+        """
+        Same as `rule`, but the alternatives are tried in order instead of
+        all of them, the ones led by a keyword or token first.
+        No two alternatives match the same text, so the first match is the
+        same as the longest match.
+        """
+        rule = Forward()
+        rule << (
+            Tokens.NAMESPACE  #
+            + Tokens.IDENT("name")  #
+            + Tokens.LBRACE  #
+            + ZeroOrMore(  # BR
+                Include.rule  #
+                | rule  #
+                | TypedefTemplateInstantiation.rule  #
+                | Enum.rule  #
+                | Class.ordered_rule  #
+                | ForwardDeclaration.rule  #
+                | GlobalFunction.rule  #
+                | Variable.rule  #
+            )("content")  # BR
+            + Tokens.RBRACE  #
+        ).setParseAction(lambda t: Namespace.from_parse_result(t))
+        return rule
 
     def __init__(self, name: str, content: ZeroOrMore, parent=''):
         self.name = name
@@ -83,6 +130,59 @@ class Namespace:
         for child in self.content:
             child.parent = self
 
+        # The index of the namespaces and the declarations nested in this
+        # namespace by their qualified names, along with the version of the
+        # content it was built from, see `symbols`.
+        self._symbols = None
+
+    @property
+    def content(self) -> list:
+        """The declarations and the namespaces in this namespace."""
+        return self._content
+
+    @content.setter
+    def content(self, content: list):
+        _Content.version += 1
+        self._content = _Content(content)
+
+    def __getstate__(self):
+        # The index is built again when needed.
+        state = self.__dict__.copy()
+        state["_symbols"] = None
+        return state
+
+    def symbols(self) -> Tuple[Dict[Tuple[str, ...], List["Namespace"]], Dict[
+            Tuple[str, ...],
+            List[Union[Class, GlobalFunction, ForwardDeclaration]]]]:
+        """
+        Get the index of the namespaces and of the classes, functions and
+        forward declarations nested in this namespace, by their names
+        qualified with the namespaces in between, e.g. `("gtsam", "Pose3")`.
+        A name may have several namespaces, i.e. a reopened namespace, or
+        several declarations.
+
+        The index is built when first needed, and again after the content
+        of any namespace changes, e.g. when the namespaces are instantiated.
+        """
+        if self._symbols is None or self._symbols[0] != _Content.version:
+            namespaces: Dict[Tuple[str, ...], List[Namespace]] = {}
+            members: Dict[Tuple[str, ...], list] = {}
+
+            def add(prefix: Tuple[str, ...], namespace: Namespace):
+                for element in namespace.content:
+                    if isinstance(element, Namespace):
+                        name = prefix + (element.name, )
+                        namespaces.setdefault(name, []).append(element)
+                        add(name, element)
+                    elif isinstance(element,
+                                    (Class, GlobalFunction, ForwardDeclaration)):
+                        members.setdefault(prefix + (element.name, ),
+                                           []).append(element)
+
+            add((), self)
+            self._symbols = (_Content.version, namespaces, members)
+        return self._symbols[1], self._symbols[2]
+
     @staticmethod
     def from_parse_result(t: ParseResults):
         """Return the result of parsing."""
@@ -95,15 +195,12 @@ class Namespace:
     def find_class_or_function(
             self, typename: Typename) -> Union[Class, GlobalFunction, ForwardDeclaration]:
         """
-        Find the Class or GlobalFunction object given its typename.
-        We have to traverse the tree of namespaces.
+        Find the Class or GlobalFunction object given its typename,
+        qualified with the namespaces nested in this namespace, in the
+        index of `symbols`.
         """
-        found_namespaces = find_sub_namespace(self, typename.namespaces)
-        res = []
-        for namespace in found_namespaces:
-            classes_and_funcs = (c for c in namespace.content
-                                 if isinstance(c, (Class, GlobalFunction, ForwardDeclaration)))
-            res += [c for c in classes_and_funcs if c.name == typename.name]
+        _, members = self.symbols()
+        res = members.get(tuple(typename.namespaces) + (typename.name, ), [])
         if not res:
             raise ValueError("Cannot find class {} in module!".format(
                 typename.name))
@@ -0,0 +1,162 @@
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Configuration and statistics of the packrat cache of the pyparsing rules.
+"""
+
+from collections import OrderedDict
+
+from pyparsing import ParserElement  # type: ignore
+
+# The ways of evicting entries when the cache is full, see
+# `configure_packrat`, "unbounded" for a cache which is never full and "off"
+# for no cache.
+PACKRAT_MODES = ("fifo", "lru", "unbounded", "off")
+
+# The default size of the packrat cache, the same as pyparsing's.
+DEFAULT_PACKRAT_CACHE_SIZE = 128
+
+
+class PackratStats:
+    """
+    Statistics of the packrat cache, accumulated over parses.
+
+    Args:
+        hits: Number of lookups which found an entry.
+        misses: Number of lookups which did not find an entry.
+        peak_size: Largest number of entries in the cache.
+    """
+
+    def __init__(self, hits: int = 0, misses: int = 0, peak_size: int = 0):
+        self.hits = hits
+        self.misses = misses
+        self.peak_size = peak_size
+
+    def merge(self, other: "PackratStats"):
+        """Add the statistics of the `other` parses."""
+        self.hits += other.hits
+        self.misses += other.misses
+        self.peak_size = max(self.peak_size, other.peak_size)
+
+    def summary(self) -> str:
+        """Summarize the statistics."""
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups if lookups else 0.0
+        return (f"packrat cache: {self.hits} hits, {self.misses} misses "
+                f"({hit_rate:.1%} hit rate), peak {self.peak_size} entries")
+
+    def __repr__(self) -> str:
+        return (f"PackratStats(hits={self.hits}, misses={self.misses}, "
+                f"peak_size={self.peak_size})")
+
+
+class _LruCache:
+    """
+    Packrat cache for pyparsing which evicts the least recently used entry
+    when it has more than `size` entries, with the interface of pyparsing's
+    own caches.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.not_in_cache = not_in_cache = object()
+        cache = OrderedDict()
+        cache_get = cache.get
+        move_to_end = cache.move_to_end
+        popitem = cache.popitem
+
+        # Closures instead of methods, since the lookups are the hot loop
+        # of the pyparsing rules.
+        def get(key):
+            value = cache_get(key, not_in_cache)
+            if value is not not_in_cache:
+                move_to_end(key)
+            return value
+
+        def set_(key, value):
+            cache[key] = value
+            if len(cache) > size:
+                popitem(last=False)
+
+        self.get = get
+        self.set = set_
+        self.clear = cache.clear
+
+
+# The current size and mode of the packrat cache, None until configured.
+_config = None
+
+
+def configure_packrat(size: int = DEFAULT_PACKRAT_CACHE_SIZE,
+                      mode: str = "fifo"):
+    """
+    Configure the packrat cache of the pyparsing rules, which is shared by
+    all the parses in this process.
+
+    The cache trades memory for speed: the pyparsing rules of the interface
+    grammar backtrack a lot, so without the cache large interface files take
+    far longer to parse, while a large cache holds many intermediate results.
+    When the cache is full, the oldest entry is evicted in the "fifo" mode,
+    like pyparsing does by default, and the least recently used one in the
+    "lru" mode.
+
+    Args:
+        size: The maximum number of entries, ignored in the "unbounded" and
+            "off" modes.
+        mode: One of `PACKRAT_MODES`.
+    """
+    global _config  # pylint: disable=global-statement
+    if mode not in PACKRAT_MODES:
+        raise ValueError(f"Unknown packrat mode {mode}, "
+                         f"expected one of {PACKRAT_MODES}")
+    if size is None or size < 0:
+        raise ValueError(f"Invalid packrat cache size {size}")
+    if (size, mode) == _config:
+        return
+
+    ParserElement.disable_memoization()
+    if mode == "unbounded":
+        ParserElement.enable_packrat(None)
+    elif mode != "off":
+        ParserElement.enable_packrat(size)
+        if mode == "lru":
+            ParserElement.packrat_cache = _LruCache(size)
+    _config = (size, mode)
+
+
+def ensure_packrat():
+    """
+    Configure the packrat cache with the defaults, unless it is configured
+    already. Called before parsing with the pyparsing rules, so that
+    importing the parser does not change the settings of pyparsing.
+    """
+    if _config is None:
+        configure_packrat()
+
+
+def reset_packrat():
+    """
+    Disable the packrat cache and forget its configuration, so that the next
+    parse with the pyparsing rules configures the defaults again.
+    """
+    global _config  # pylint: disable=global-statement
+    ParserElement.disable_memoization()
+    _config = None
+
+
+def packrat_stats() -> PackratStats:
+    """
+    Get the statistics of the packrat cache for the current or last parse,
+    since pyparsing resets them at the start of every parse.
+    """
+    size, mode = _config or (0, "off")
+    if mode == "off":
+        return PackratStats()
+    hits, misses = ParserElement.packrat_cache_stats[:2]
+    # Every miss adds an entry, until the cache is full.
+    peak_size = misses if mode == "unbounded" else min(misses, size)
+    return PackratStats(hits, misses, peak_size)
@@ -0,0 +1,78 @@
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Preprocessing of interface files before parsing.
+"""
+
+import bisect
+import re
+from typing import List, Tuple
+
+# Whitespace and comments, or text which is kept verbatim: quoted strings
+# (e.g. in default arguments) and include headers may contain `//` or `/*`.
+_SOURCE_RE = re.compile(
+    r"""
+    (?P<verbatim>"[^"\n\r]*"|'[^'\n\r]*'|\#include[ \t]*<[^>\n]*>)
+    |(?P<space>(?:\s+|//(?:\\\n|[^\n])*|/\*(?:[^*]|\*(?!/))*\*/)+)
+    |(?P<text>[^"'\#/\s]+|.)
+    """, re.VERBOSE | re.DOTALL)
+
+
+class SourceMap:
+    """
+    Map offsets in the preprocessed text back to the original source.
+
+    The map stores the offsets at which the preprocessed text and the
+    source start to differ by a different amount.
+
+    Args:
+        breakpoints: The list of (preprocessed offset, source offset) pairs,
+            sorted by the preprocessed offset.
+    """
+
+    def __init__(self, breakpoints: List[Tuple[int, int]]):
+        self.breakpoints = breakpoints
+        self._offsets = [offset for offset, _ in breakpoints]
+
+    def source_offset(self, offset: int) -> int:
+        """Get the offset in the source of `offset` in the preprocessed text."""
+        i = bisect.bisect_right(self._offsets, offset) - 1
+        if i < 0:
+            return offset
+        stripped_offset, source_offset = self.breakpoints[i]
+        return source_offset + offset - stripped_offset
+
+
+def strip_comments(s: str) -> Tuple[str, SourceMap]:
+    """
+    Remove the comments from the interface file content `s` and
+    normalize the whitespace, in a single pass.
+
+    Each run of whitespace and comments becomes a single newline if it spans
+    several lines, or a single space if it contains a comment. Other spaces
+    are kept as they are, since they can be significant, e.g. in the header
+    of an `#include` or in the value of a default argument.
+
+    Returns the preprocessed text and the map of its offsets to `s`.
+    """
+    pieces = []
+    breakpoints = [(0, 0)]
+    length = 0
+    for match in _SOURCE_RE.finditer(s):
+        piece = match.group()
+        if match.lastgroup == "space":
+            if "\n" in piece:
+                piece = "\n"
+            elif "/" in piece:
+                piece = " "
+            if len(piece) != match.end() - match.start():
+                # The shift changes after the normalized whitespace.
+                breakpoints.append((length + len(piece), match.end()))
+        pieces.append(piece)
+        length += len(piece)
+
+    return "".join(pieces), SourceMap(breakpoints)
@@ -0,0 +1,653 @@
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Hand-written lexer and recursive-descent parser for the interface grammar.
+
+The pyparsing rules defined on each class remain the reference implementation
+of the grammar. This parser accepts the same language in a single pass over a
+token stream and builds exactly the same objects, but without trying every
+alternative at every position, which makes it much faster on large inputs.
+"""
+
+import re
+from typing import Callable, List, NamedTuple, Union
+
+from pyparsing import ParseException  # type: ignore
+
+from .classes import (Class, Constructor, DunderMethod, Method, Operator,
+                      StaticMethod)
+from .declaration import ForwardDeclaration, Include
+from .enum import Enum, Enumerator
+from .function import Argument, ArgumentList, GlobalFunction, ReturnType
+from .namespace import Namespace
+from .template import Template, TypedefTemplateInstantiation
+from .type import TemplatedType, Type, Typename
+from .variable import Variable
+
+# Characters which cannot follow a keyword, same as pyparsing's `Keyword`.
+_IDENT_CHARS = frozenset(
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$")
+
+_COMMENT = r"//(?:\\\n|[^\n])*|/\*(?:[^*]|\*(?!/))*\*/"
+
+_TOKEN_RE = re.compile(
+    rf"""
+    (?P<skip>\s+|{_COMMENT})
+    |(?P<ident>[A-Za-z_][A-Za-z0-9_]*|[0-9]+)
+    |(?P<scope>::)
+    |(?P<include>\#include(?![A-Za-z0-9_$]))
+    |(?P<string>"[^"\n\r]*"|'[^'\n\r]*')
+    |(?P<punct>.)
+    """, re.VERBOSE | re.DOTALL)
+
+_SKIP_RE = re.compile(rf"(?:\s+|{_COMMENT})*")
+_COMMENT_RE = re.compile(_COMMENT)
+
+# Quoted strings in a default argument, same as `QuotedString` in `tokens.py`.
+_DEFAULT_ARG_QUOTED_RE = re.compile(r"\"[^\"\n\r]*\"|'[^'\n\r]*'")
+# Quoted strings inside nested expressions, same as pyparsing's `quotedString`.
+_NESTED_QUOTED_RE = re.compile(
+    r"\"(?:[^\"\n\r\\]|(?:\"\")|(?:\\(?:[^x]|x[0-9a-fA-F]+)))*\""
+    r"|'(?:[^'\n\r\\]|(?:'')|(?:\\(?:[^x]|x[0-9a-fA-F]+)))*'")
+# Arbitrary words in a default argument, i.e. printables except "(){}[]<>,;".
+_DEFAULT_ARG_WORD_RE = re.compile(r"[!-'*+\-./0-:=?-Z\\^-z|~]+")
+_NESTED_CLOSERS = {'(': ')', '[': ']', '{': '}', '<': '>'}
+
+_DUNDER_RE = re.compile(r"__([A-Za-z]+)__")
+
+_BASIC_TYPES = frozenset(
+    ["void", "bool", "char", "int", "size_t", "double", "float"])
+
+# All the overloadable operators, longest first so that e.g. `<<=` wins over `<`.
+_OPERATORS = sorted([
+    '+', '-', '*', '/', '%', '^', '&', '|', '+=', '-=', '*=', '/=', '%=', '^=',
+    '&=', '|=', '<<', '<<=', '>>', '>>=', '==', '!=', '<', '>', '<=', '>=',
+    '()', '[]'
+],
+                    key=len,
+                    reverse=True)
+
+
+class Token(NamedTuple):
+    """
+    A single token of the interface file.
+
+    `kind` is one of `ident`, `scope`, `include`, `string`, `punct` or `eof`,
+    and `start`/`end` are the offsets of the token in the source string.
+    """
+    kind: str
+    value: str
+    start: int
+    end: int
+
+
+def tokenize(s: str, pos: int = 0) -> List[Token]:
+    """
+    Split the source string into tokens, starting at offset `pos`.
+
+    Whitespace and comments are dropped, and the list always ends with an
+    `eof` token.
+    """
+    tokens = [
+        Token(m.lastgroup, m.group(), m.start(), m.end())
+        for m in _TOKEN_RE.finditer(s, pos) if m.lastgroup != "skip"
+    ]
+    tokens.append(Token("eof", "", len(s), len(s)))
+    return tokens
+
+
+def _scan_nested(s: str, pos: int) -> int:
+    """
+    Scan the bracketed expression starting at `pos`.
+
+    Only brackets of the same kind are balanced, skipping over quoted strings
+    and comments, like pyparsing's `nestedExpr`.
+    Returns the offset after the closing bracket, or -1 if it is not closed.
+    """
+    opener = s[pos]
+    closer = _NESTED_CLOSERS[opener]
+    depth = 0
+    while pos < len(s):
+        char = s[pos]
+        if char == opener:
+            depth += 1
+        elif char == closer:
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        elif char in "\"'":
+            match = _NESTED_QUOTED_RE.match(s, pos)
+            if match:
+                pos = match.end()
+                continue
+        elif char == '/':
+            match = _COMMENT_RE.match(s, pos)
+            if match:
+                pos = match.end()
+                continue
+        pos += 1
+    return -1
+
+
+def _scan_default_arg(s: str, pos: int) -> int:
+    """
+    Scan a default argument starting at `pos`, as matched by `DEFAULT_ARG`.
+
+    Returns the offset after the last character of the default argument,
+    which is `pos` itself if there is no default argument at `pos`.
+    """
+    end = pos
+    while True:
+        pos = _SKIP_RE.match(s, pos).end()
+        if pos >= len(s):
+            return end
+
+        char = s[pos]
+        if char in _NESTED_CLOSERS:
+            next_pos = _scan_nested(s, pos)
+            if next_pos < 0:
+                return end
+        else:
+            word = _DEFAULT_ARG_WORD_RE.match(s, pos)
+            next_pos = word.end() if word else -1
+            if char in "\"'":
+                # Like pyparsing's `Or`, take the longest alternative.
+                quoted = _DEFAULT_ARG_QUOTED_RE.match(s, pos)
+                if quoted and quoted.end() >= next_pos:
+                    next_pos = quoted.end()
+            if next_pos < 0:
+                return end
+
+        end = pos = next_pos
+
+
+class Parser:
+    """
+    Recursive-descent parser for an interface file.
+
+    Each `_parse_*` method consumes the tokens for one grammar rule and
+    returns the same object as the corresponding pyparsing rule, or raises a
+    `ParseException`.
+
+    Args:
+        s: The contents of the interface file.
+    """
+
+    def __init__(self, s: str):
+        self.s = s
+        self.tokens = tokenize(s)
+        self.index = 0
+
+    def parse(self) -> Namespace:
+        """Parse the whole interface file into the global namespace."""
+        content = self._parse_declarations()
+        if self._peek().kind != "eof":
+            self._fail("Expected end of text")
+        return Namespace('', content)
+
+    # Token stream helpers.
+
+    def _peek(self, offset: int = 0) -> Token:
+        return self.tokens[min(self.index + offset, len(self.tokens) - 1)]
+
+    def _fail(self, msg: str):
+        raise ParseException(self.s, self._peek().start, msg)
+
+    def _accept(self, value: str) -> bool:
+        if self.tokens[self.index].value == value:
+            self.index += 1
+            return True
+        return False
+
+    def _expect(self, value: str):
+        if not self._accept(value):
+            self._fail(f"Expected {value!r}")
+
+    def _expect_ident(self) -> str:
+        token = self.tokens[self.index]
+        if token.kind != "ident":
+            self._fail("Expected identifier")
+        self.index += 1
+        return token.value
+
+    def _is_keyword_followed_by(self, word: str) -> bool:
+        """
+        Check if the current token starts a two-word keyword like
+        `enum class`, i.e. is followed by exactly one space and `word`.
+        """
+        end = self._peek().end + len(word) + 1
+        return (self.s.startswith(" " + word, self._peek().end)
+                and (end >= len(self.s) or self.s[end] not in _IDENT_CHARS))
+
+    def _seek(self, pos: int):
+        """Move to the first token at or after the offset `pos`."""
+        while self.tokens[self.index].start < pos:
+            self.index += 1
+        previous = self.tokens[self.index - 1]
+        if previous.start < pos < previous.end or (
+                previous.end < pos and not self.s[previous.end:pos].isspace()):
+            # A token or a comment straddles `pos`, e.g. a string or `//` in
+            # a header name, so lex the rest of the source again from `pos`.
+            self.tokens[self.index - 1:] = tokenize(self.s, pos)
+            self.index -= 1
+
+    def _alternatives(self, *parsers: Callable):
+        """
+        Return the result of the first parser which succeeds.
+
+        Since the alternatives of the grammar do not overlap, this is
+        equivalent to the longest match of pyparsing's `Or`.
+        If none of them succeed, the error which got furthest is raised.
+        """
+        start = self.index
+        error = None
+        for parser in parsers:
+            try:
+                return parser()
+            except ParseException as e:
+                self.index = start
+                if error is None or e.loc > error.loc:
+                    error = e
+        raise error
+
+    # Types.
+
+    def _parse_typename(self) -> Typename:
+        names = [self._expect_ident()]
+        while self._peek().kind == "scope" and self._peek(1).kind == "ident":
+            names.append(self._peek(1).value)
+            self.index += 2
+        return Typename(names[-1], names[:-1])
+
+    def _parse_basic_type(self) -> str:
+        """Consume a basic type and return its name, else return ''."""
+        token = self._peek()
+        if token.kind != "ident":
+            return ''
+        if token.value in _BASIC_TYPES:
+            self.index += 1
+            return token.value
+        if token.value == "unsigned" and self._is_keyword_followed_by("char"):
+            self.index += 2
+            return "unsigned char"
+        return ''
+
+    def _parse_pointer_or_ref(self):
+        """Return the `is_shared_ptr`, `is_ptr` and `is_ref` qualifiers."""
+        value = self._peek().value
+        if value in ('*', '@', '&'):
+            self.index += 1
+        return tuple(value if value == qualifier else ''
+                     for qualifier in ('*', '@', '&'))
+
+    def _parse_type(self,
+                    allow_templated: bool = True
+                    ) -> Union[Type, TemplatedType]:
+        """Parse a `Type`, or a `TemplatedType` if `allow_templated`."""
+        is_const = 'const' if self._accept('const') else ''
+        basic = self._parse_basic_type()
+        if basic:
+            typename = Typename(basic, [])
+        else:
+            typename = self._parse_typename()
+
+        if (allow_templated and self._peek().value == '<'
+                and ' ' not in basic):
+            return self._parse_template_params(typename, is_const)
+
+        return Type(typename, is_const, *self._parse_pointer_or_ref(),
+                    is_basic=bool(basic))
+
+    def _parse_template_params(self, typename: Typename,
+                               is_const: str) -> TemplatedType:
+        """Parse the `<...>` part of a `TemplatedType` and its qualifiers."""
+        self._expect('<')
+        template_params = [self._parse_type()]
+        while self._accept(','):
+            template_params.append(self._parse_type())
+        self._expect('>')
+        return TemplatedType(typename, template_params, is_const,
+                             *self._parse_pointer_or_ref())
+
+    def _parse_templated_type(self) -> TemplatedType:
+        is_const = 'const' if self._accept('const') else ''
+        return self._parse_template_params(self._parse_typename(), is_const)
+
+    def _parse_templated_type_or_typename(
+            self) -> Union[TemplatedType, Typename]:
+        if self._peek().value == 'const':
+            return self._parse_templated_type()
+        typename = self._parse_typename()
+        if self._peek().value == '<':
+            return self._parse_template_params(typename, '')
+        return typename
+
+    def _parse_return_type(self) -> ReturnType:
+        token = self._peek()
+        next_token = self._peek(1)
+        is_std_pair = (token.value == "std" and next_token.kind == "scope"
+                       and next_token.start == token.end
+                       and self._peek(2).value == "pair")
+        if token.value == "pair" or is_std_pair:
+            start = self.index
+            try:
+                return self._parse_pair(is_std_pair)
+            except ParseException:
+                # E.g. `pair<vector<int>, int>` is a TemplatedType.
+                self.index = start
+
+        return ReturnType(self._parse_type(), '')
+
+    def _parse_pair(self, is_std_pair: bool) -> ReturnType:
+        self.index += 3 if is_std_pair else 1
+        self._expect('<')
+        type1 = self._parse_type(allow_templated=False)
+        self._expect(',')
+        type2 = self._parse_type(allow_templated=False)
+        self._expect('>')
+        return ReturnType(type1, type2)
+
+    # Functions and arguments.
+
+    def _parse_default_arg(self) -> str:
+        start = self._peek().start
+        end = _scan_default_arg(self.s, start)
+        if end == start:
+            self._fail("Expected default argument")
+        self._seek(end)
+        return self.s[start:end]
+
+    def _parse_argument(self) -> Argument:
+        ctype = self._parse_type()
+        name = self._expect_ident()
+        default = self._parse_default_arg() if self._accept('=') else None
+        return Argument(ctype, name, default)
+
+    def _parse_args_list(self) -> ArgumentList:
+        """Parse the arguments between parentheses."""
+        self._expect('(')
+        args = []
+        if self._peek().value != ')':
+            args.append(self._parse_argument())
+            while self._accept(','):
+                args.append(self._parse_argument())
+        self._expect(')')
+        return ArgumentList(args)
+
+    def _parse_template(self) -> Union[Template, str]:
+        """Parse an optional template, returning '' if there is none."""
+        if not self._accept('template'):
+            return ''
+        self._expect('<')
+        typename_and_instantiations_list = [
+            self._parse_typename_and_instantiations()
+        ]
+        while self._accept(','):
+            typename_and_instantiations_list.append(
+                self._parse_typename_and_instantiations())
+        self._expect('>')
+        return Template(typename_and_instantiations_list)
+
+    def _parse_typename_and_instantiations(
+            self) -> Template.TypenameAndInstantiations:
+        typename = self._expect_ident()
+        instantiations = []
+        if self._accept('='):
+            self._expect('{')
+            instantiations.append(self._parse_templated_type_or_typename())
+            while self._accept(','):
+                instantiations.append(
+                    self._parse_templated_type_or_typename())
+            self._expect('}')
+        return Template.TypenameAndInstantiations(typename, instantiations)
+
+    def _accept_double(self, char: str) -> bool:
+        """Consume the token `char` twice in a row, e.g. `[[`."""
+        token, next_token = self._peek(), self._peek(1)
+        if (token.value == char and next_token.value == char
+                and next_token.start == token.end):
+            self.index += 2
+            return True
+        return False
+
+    def _parse_attributes(self) -> List[str]:
+        """Parse optional attributes like `[[release_gil]]`."""
+        if not self._accept_double('['):
+            return []
+        attributes = [self._expect_ident()]
+        while self._accept(','):
+            attributes.append(self._expect_ident())
+        if not self._accept_double(']'):
+            self._fail("Expected ']]'")
+        return attributes
+
+    def _parse_global_function(self, template) -> GlobalFunction:
+        attributes = self._parse_attributes()
+        return_type = self._parse_return_type()
+        name = self._expect_ident()
+        args = self._parse_args_list()
+        self._expect(';')
+        return GlobalFunction(name,
+                              return_type,
+                              args,
+                              template,
+                              attributes=attributes)
+
+    def _parse_variable(self) -> Variable:
+        ctype = self._parse_type()
+        name = self._expect_ident()
+        default = self._parse_default_arg() if self._accept('=') else None
+        self._expect(';')
+        return Variable([ctype], name, default)
+
+    # Class members.
+
+    def _parse_method(self, template) -> Method:
+        attributes = self._parse_attributes()
+        return_type = self._parse_return_type()
+        name = self._expect_ident()
+        args = self._parse_args_list()
+        is_const = 'const' if self._accept('const') else ''
+        self._expect(';')
+        return Method(template,
+                      name,
+                      return_type,
+                      args,
+                      is_const,
+                      attributes=attributes)
+
+    def _parse_static_method(self, template) -> StaticMethod:
+        attributes = self._parse_attributes()
+        self._expect('static')
+        return_type = self._parse_return_type()
+        name = self._expect_ident()
+        args = self._parse_args_list()
+        self._expect(';')
+        return StaticMethod(name,
+                            return_type,
+                            args,
+                            template,
+                            attributes=attributes)
+
+    def _parse_constructor(self, template) -> Constructor:
+        name = self._expect_ident()
+        args = self._parse_args_list()
+        self._expect(';')
+        return Constructor(name, args, template)
+
+    def _parse_operator(self) -> Operator:
+        return_type = self._parse_return_type()
+        self._expect('operator')
+        start = self._peek().start
+        for operator in _OPERATORS:
+            if self.s.startswith(operator, start):
+                break
+        else:
+            self._fail("Expected operator")
+        self._seek(start + len(operator))
+        args = self._parse_args_list()
+        self._expect('const')
+        self._expect(';')
+        return Operator('operator', operator, return_type, args, 'const')
+
+    def _parse_dunder_method(self) -> DunderMethod:
+        match = _DUNDER_RE.fullmatch(self._peek().value)
+        if not match:
+            self._fail("Expected dunder method")
+        self.index += 1
+        args = self._parse_args_list()
+        self._expect(';')
+        return DunderMethod(match.group(1), args)
+
+    def _parse_member(self):
+        token = self._peek()
+        if token.value == 'enum':
+            return self._alternatives(self._parse_enum,
+                                      self._parse_function_or_property)
+        if _DUNDER_RE.fullmatch(token.value):
+            return self._alternatives(self._parse_dunder_method,
+                                      self._parse_function_or_property)
+        return self._parse_function_or_property()
+
+    def _parse_function_or_property(self):
+        """Parse a constructor, (static) method, operator or property."""
+        template = self._parse_template()
+        alternatives = [
+            lambda: self._parse_constructor(template),
+            lambda: self._parse_method(template),
+            lambda: self._parse_static_method(template),
+        ]
+        if self._peek().value == 'static':
+            alternatives.reverse()
+        if not template:
+            alternatives += [self._parse_operator, self._parse_variable]
+        return self._alternatives(*alternatives)
+
+    # Declarations.
+
+    def _parse_class(self, template) -> Class:
+        is_virtual = 'virtual' if self._accept('virtual') else ''
+        self._expect('class')
+        attributes = self._parse_attributes()
+        name = self._expect_ident()
+        parent_class = ''
+        if self._accept(':'):
+            parent_class = self._parse_templated_type_or_typename()
+        self._expect('{')
+        members = []
+        while self._peek().value != '}' and self._peek().kind != "eof":
+            members.append(self._parse_member())
+        self._expect('}')
+        self._expect(';')
+
+        m = Class.Members(members)
+        return Class(template,
+                     is_virtual,
+                     name,
+                     parent_class,
+                     m.ctors,
+                     m.methods,
+                     m.static_methods,
+                     m.dunder_methods,
+                     m.properties,
+                     m.operators,
+                     m.enums,
+                     attributes=attributes)
+
+    def _parse_forward_declaration(self) -> ForwardDeclaration:
+        is_virtual = 'virtual' if self._accept('virtual') else ''
+        self._expect('class')
+        typename = self._parse_typename()
+        parent_type = self._parse_typename() if self._accept(':') else ''
+        self._expect(';')
+        return ForwardDeclaration(typename, parent_type, is_virtual)
+
+    def _parse_include(self) -> Include:
+        self._expect('#include')
+        self._expect('<')
+        # The header name is taken verbatim, including any whitespace.
+        start = self.tokens[self.index - 1].end
+        end = self.s.find('>', start)
+        if end <= start:
+            self._fail("Expected header name")
+        self._seek(end)
+        self._expect('>')
+        return Include(self.s[start:end])
+
+    def _parse_enum(self) -> Enum:
+        # `enum class` and `enum struct` are keywords on their own.
+        is_scoped = (self._is_keyword_followed_by("class")
+                     or self._is_keyword_followed_by("struct"))
+        self._expect('enum')
+        if is_scoped:
+            self.index += 1
+        name = self._expect_ident()
+        self._expect('{')
+        enumerators = [Enumerator(self._expect_ident())]
+        while self._accept(','):
+            enumerators.append(Enumerator(self._expect_ident()))
+        self._expect('}')
+        self._expect(';')
+        return Enum(name, enumerators)
+
+    def _parse_typedef(self) -> TypedefTemplateInstantiation:
+        self._expect('typedef')
+        templated_type = self._parse_templated_type()
+        new_name = self._expect_ident()
+        self._expect(';')
+        return TypedefTemplateInstantiation(templated_type, new_name)
+
+    def _parse_namespace(self) -> Namespace:
+        self._expect('namespace')
+        name = self._expect_ident()
+        self._expect('{')
+        content = self._parse_declarations()
+        self._expect('}')
+        return Namespace(name, content)
+
+    def _parse_templated_declaration(self):
+        template = self._parse_template()
+        return self._alternatives(lambda: self._parse_class(template),
+                                  lambda: self._parse_global_function(template))
+
+    def _parse_declarations(self) -> list:
+        """Parse the contents of a namespace, up to the closing brace."""
+        content = []
+        while self._peek().value != '}' and self._peek().kind != "eof":
+            content.append(self._parse_declaration())
+        return content
+
+    def _parse_declaration(self):
+        token = self._peek()
+        if token.kind == "include":
+            return self._parse_include()
+
+        # Dispatch on the keyword, but still allow the keyword to be
+        # the name of a type, which the pyparsing grammar accepts as well.
+        alternatives: List[Callable] = []
+        if token.value == 'namespace':
+            alternatives = [self._parse_namespace]
+        elif token.value == 'typedef':
+            alternatives = [self._parse_typedef]
+        elif token.value == 'enum':
+            alternatives = [self._parse_enum]
+        elif token.value in ('class', 'virtual'):
+            alternatives = [
+                lambda: self._parse_class(''), self._parse_forward_declaration
+            ]
+        elif token.value == 'template':
+            alternatives = [self._parse_templated_declaration]
+
+        alternatives += [
+            lambda: self._parse_global_function(''), self._parse_variable
+        ]
+        return self._alternatives(*alternatives)
+
+
+def parse(s: str) -> Namespace:
+    """Parse the contents of an interface file into the global namespace."""
+    return Parser(s).parse()
@@ -14,9 +14,9 @@ from typing import List
 
 from pyparsing import Optional, ParseResults, delimitedList  # type: ignore
 
-from .tokens import (EQUAL, IDENT, LBRACE, LOPBRACK, RBRACE, ROPBRACK,
-                     SEMI_COLON, TEMPLATE, TYPEDEF)
+from .tokens import Tokens
 from .type import TemplatedType, Typename
+from .utils import lazy_rule
 
 
 class Template:
@@ -33,16 +33,20 @@ class Template:
 
         template<typename POSE = {Pose2, Pose3}>  // Pos2 and Pose3 are the `Instantiation`s.
         """
-        rule = (
-            IDENT("typename")  #
-            + Optional(  #
-                EQUAL  #
-                + LBRACE  #
-                + ((delimitedList(TemplatedType.rule ^ Typename.rule)
-                    ("instantiations")))  #
-                + RBRACE  #
-            )).setParseAction(lambda t: Template.TypenameAndInstantiations(
-                t.typename, t.instantiations))
+        @lazy_rule
+        def rule(cls):  # pylint: disable=no-self-argument
+            """The rule for a template parameter."""
+            return (
+                Tokens.IDENT("typename")  #
+                + Optional(  #
+                    Tokens.EQUAL  #
+                    + Tokens.LBRACE  #
+                    + ((delimitedList(TemplatedType.rule ^ Typename.rule)
+                        ("instantiations")))  #
+                    + Tokens.RBRACE  #
+                )).setParseAction(
+                    lambda t: Template.TypenameAndInstantiations(
+                        t.typename, t.instantiations))
 
         def __init__(self, typename: str, instantiations: ParseResults):
             self.typename = typename
@@ -54,14 +58,17 @@ class Template:
                                                     TemplatedType) else inst
                     self.instantiations.append(x)
 
-    rule = (  # BR
-        TEMPLATE  #
-        + LOPBRACK  #
-        + delimitedList(TypenameAndInstantiations.rule)(
-            "typename_and_instantiations_list")  #
-        + ROPBRACK  # BR
-    ).setParseAction(
-        lambda t: Template(t.typename_and_instantiations_list.asList()))
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a template."""
+        return (  # BR
+            Tokens.TEMPLATE  #
+            + Tokens.LOPBRACK  #
+            + delimitedList(cls.TypenameAndInstantiations.rule)(
+                "typename_and_instantiations_list")  #
+            + Tokens.ROPBRACK  # BR
+        ).setParseAction(
+            lambda t: Template(t.typename_and_instantiations_list.asList()))
 
     def __init__(
             self,
@@ -83,10 +90,13 @@ class TypedefTemplateInstantiation:
     typedef SuperComplexName<Arg1, Arg2, Arg3> EasierName;
     ```
     """
-    rule = (TYPEDEF + TemplatedType.rule("templated_type") +
-            IDENT("new_name") +
-            SEMI_COLON).setParseAction(lambda t: TypedefTemplateInstantiation(
-                t.templated_type[0], t.new_name))
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a typedef."""
+        return (Tokens.TYPEDEF + TemplatedType.rule("templated_type") +
+                Tokens.IDENT("new_name") + Tokens.SEMI_COLON).setParseAction(
+                    lambda t: TypedefTemplateInstantiation(
+                        t.templated_type[0], t.new_name))
 
     def __init__(self,
                  templated_type: TemplatedType,
@@ -10,99 +10,160 @@ All the token definitions.
 Author: Duy Nguyen Ta, Fan Jiang, Matthew Sklar, Varun Agrawal, and Frank Dellaert
 """
 
+# pylint: disable=invalid-name, no-self-argument, too-few-public-methods
+
 from pyparsing import Or  # type: ignore
-from pyparsing import (Keyword, Literal, OneOrMore, QuotedString, Suppress,
-                       Word, alphanums, alphas, nestedExpr, nums,
-                       originalTextFor, printables)
-
-# rule for identifiers (e.g. variable names)
-IDENT = Word(alphas + '_', alphanums + '_') ^ Word(nums)
-
-RAW_POINTER, SHARED_POINTER, REF = map(Literal, "@*&")
-
-LPAREN, RPAREN, LBRACE, RBRACE, COLON, SEMI_COLON = map(Suppress, "(){}:;")
-LOPBRACK, ROPBRACK, COMMA, EQUAL = map(Suppress, "<>,=")
-DUNDER = Suppress(Literal("__"))
-
-# Default argument passed to functions/methods.
-# Allow anything up to ',' or ';' except when they
-# appear inside matched expressions such as
-# (a, b) {c, b} "hello, world", templates, initializer lists, etc.
-DEFAULT_ARG = originalTextFor(
-    OneOrMore(
-        QuotedString('"') ^  # parse double quoted strings
-        QuotedString("'") ^  # parse single quoted strings
-        Word(printables, excludeChars="(){}[]<>,;") ^  # parse arbitrary words
-        nestedExpr(opener='(', closer=')') ^  # parse expression in parentheses
-        nestedExpr(opener='[', closer=']') ^  # parse expression in brackets
-        nestedExpr(opener='{', closer='}') ^  # parse expression in braces
-        nestedExpr(opener='<', closer='>')  # parse template expressions
-    ))
-
-CONST, VIRTUAL, CLASS, STATIC, PAIR, TEMPLATE, TYPEDEF, INCLUDE = map(
-    Keyword,
-    [
-        "const",
-        "virtual",
-        "class",
-        "static",
-        "pair",
-        "template",
-        "typedef",
-        "#include",
-    ],
-)
-ENUM = Keyword("enum") ^ Keyword("enum class") ^ Keyword("enum struct")
-NAMESPACE = Keyword("namespace")
-BASIC_TYPES = map(
-    Keyword,
-    [
-        "void",
-        "bool",
-        "unsigned char",
-        "char",
-        "int",
-        "size_t",
-        "double",
-        "float",
-    ],
-)
-
-OPERATOR = Or(
-    map(
-        Literal,
-        [
-            '+',  # __add__, __pos__
-            '-',  # __sub__, __neg__
-            '*',  # __mul__
-            '/',  # __truediv__
-            '%',  # __mod__
-            '^',  # __xor__
-            '&',  # __and__
-            '|',  # __or__
-            # '~',  # __invert__
-            '+=',  # __iadd__
-            '-=',  # __isub__
-            '*=',  # __imul__
-            '/=',  # __itruediv__
-            '%=',  # __imod__
-            '^=',  # __ixor__
-            '&=',  # __iand__
-            '|=',  # __ior__
-            '<<',  # __lshift__
-            '<<=',  # __ilshift__
-            '>>',  # __rshift__
-            '>>=',  # __irshift__
-            '==',  # __eq__
-            '!=',  # __ne__
-            '<',  # __lt__
-            '>',  # __gt__
-            '<=',  # __le__
-            '>=',  # __ge__
-            # '!',  # Use `not` in python
-            # '&&',  # Use `and` in python
-            # '||',  # Use `or` in python
-            '()',  # __call__
-            '[]',  # __getitem__
-        ],
-    ))
+from pyparsing import (Group, Keyword, Literal, OneOrMore, QuotedString,
+                       Suppress, Word, alphanums, alphas, delimitedList,
+                       nestedExpr, nums, originalTextFor, printables)
+
+from .utils import lazy_rule
+
+
+def _literal(text: str) -> lazy_rule:
+    """Token for the literal `text`."""
+    return lazy_rule(lambda cls: Literal(text))
+
+
+def _suppress(text: str) -> lazy_rule:
+    """Token for the literal `text`, which is left out of the results."""
+    return lazy_rule(lambda cls: Suppress(text))
+
+
+def _keyword(text: str) -> lazy_rule:
+    """Token for the keyword `text`."""
+    return lazy_rule(lambda cls: Keyword(text))
+
+
+class Tokens:
+    """
+    All the tokens of the grammar, e.g. `Tokens.IDENT`.
+
+    Like the rules of the declarations, each token is built when it is
+    first used instead of when the module is imported.
+    """
+    # rule for identifiers (e.g. variable names)
+    IDENT = lazy_rule(
+        lambda cls: Word(alphas + '_', alphanums + '_') ^ Word(nums))
+
+    RAW_POINTER = _literal("@")
+    SHARED_POINTER = _literal("*")
+    REF = _literal("&")
+
+    LPAREN = _suppress("(")
+    RPAREN = _suppress(")")
+    LBRACE = _suppress("{")
+    RBRACE = _suppress("}")
+    COLON = _suppress(":")
+    SEMI_COLON = _suppress(";")
+    LOPBRACK = _suppress("<")
+    ROPBRACK = _suppress(">")
+    COMMA = _suppress(",")
+    EQUAL = _suppress("=")
+    DUNDER = _suppress("__")
+
+    @lazy_rule
+    def DEFAULT_ARG(cls):
+        """
+        Default argument passed to functions/methods.
+        Allow anything up to ',' or ';' except when they
+        appear inside matched expressions such as
+        (a, b) {c, b} "hello, world", templates, initializer lists, etc.
+        """
+        return originalTextFor(
+            OneOrMore(
+                QuotedString('"') ^  # parse double quoted strings
+                QuotedString("'") ^  # parse single quoted strings
+                # parse arbitrary words
+                Word(printables, excludeChars="(){}[]<>,;") ^
+                # parse expression in parentheses
+                nestedExpr(opener='(', closer=')') ^
+                # parse expression in brackets
+                nestedExpr(opener='[', closer=']') ^
+                # parse expression in braces
+                nestedExpr(opener='{', closer='}') ^
+                # parse template expressions
+                nestedExpr(opener='<', closer='>')
+            ))
+
+    @lazy_rule
+    def ATTRIBUTES(cls):
+        """
+        C++11 style attributes, which tell the wrappers how to wrap a
+        declaration. E.g. `[[release_gil]]`
+        """
+        return Group(
+            Suppress(Literal("[[")) + delimitedList(cls.IDENT) +
+            Suppress(Literal("]]")))
+
+    CONST = _keyword("const")
+    VIRTUAL = _keyword("virtual")
+    CLASS = _keyword("class")
+    STATIC = _keyword("static")
+    PAIR = _keyword("pair")
+    TEMPLATE = _keyword("template")
+    TYPEDEF = _keyword("typedef")
+    INCLUDE = _keyword("#include")
+    ENUM = lazy_rule(lambda cls: Keyword("enum") ^ Keyword("enum class") ^
+                     Keyword("enum struct"))
+    NAMESPACE = _keyword("namespace")
+
+    @lazy_rule
+    def BASIC_TYPES(cls):
+        """Any of the basic types."""
+        return Or(
+            map(
+                Keyword,
+                [
+                    "void",
+                    "bool",
+                    "unsigned char",
+                    "char",
+                    "int",
+                    "size_t",
+                    "double",
+                    "float",
+                ],
+            ))
+
+    @lazy_rule
+    def OPERATOR(cls):
+        """Any of the operators which can be wrapped."""
+        return Or(
+            map(
+                Literal,
+                [
+                    '+',  # __add__, __pos__
+                    '-',  # __sub__, __neg__
+                    '*',  # __mul__
+                    '/',  # __truediv__
+                    '%',  # __mod__
+                    '^',  # __xor__
+                    '&',  # __and__
+                    '|',  # __or__
+                    # '~',  # __invert__
+                    '+=',  # __iadd__
+                    '-=',  # __isub__
+                    '*=',  # __imul__
+                    '/=',  # __itruediv__
+                    '%=',  # __imod__
+                    '^=',  # __ixor__
+                    '&=',  # __iand__
+                    '|=',  # __ior__
+                    '<<',  # __lshift__
+                    '<<=',  # __ilshift__
+                    '>>',  # __rshift__
+                    '>>=',  # __irshift__
+                    '==',  # __eq__
+                    '!=',  # __ne__
+                    '<',  # __lt__
+                    '>',  # __gt__
+                    '<=',  # __le__
+                    '>=',  # __ge__
+                    # '!',  # Use `not` in python
+                    # '&&',  # Use `and` in python
+                    # '||',  # Use `or` in python
+                    '()',  # __call__
+                    '[]',  # __getitem__
+                ],
+            ))
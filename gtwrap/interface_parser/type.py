@@ -12,16 +12,37 @@ Author: Duy Nguyen Ta, Fan Jiang, Matthew Sklar, Varun Agrawal, and Frank Dellae
 
 # pylint: disable=unnecessary-lambda, expression-not-assigned
 
+import weakref
 from typing import List, Sequence, Union
 
 from pyparsing import ParseResults  # type: ignore
-from pyparsing import Forward, Optional, Or, delimitedList
+from pyparsing import Forward, Optional, delimitedList
 
-from .tokens import (BASIC_TYPES, CONST, IDENT, LOPBRACK, RAW_POINTER, REF,
-                     ROPBRACK, SHARED_POINTER)
+from .tokens import Tokens
+from .utils import lazy_rule
 
 
-class Typename:
+class _Immutable:
+    """
+    Base of the interned syntax tree nodes, whose attributes cannot be set
+    after they are created, so that equal nodes can share the same object.
+    """
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class Typename(_Immutable):
     """
     Class which holds a type's name, full namespace, and template arguments.
 
@@ -33,35 +54,67 @@ class Typename:
     will give the name as `PinholeCamera`, namespace as `gtsam`,
     and template instantiations as `[gtsam::Cal3S2]`.
 
+    Typenames are immutable and interned, i.e. creating a typename equal to
+    an existing one returns the existing object. The `namespaces` and
+    `instantiations` lists are shared and must not be modified.
+
     Args:
         namespaces_and_name: A list representing the namespaces of the type
             with the type being the last element.
         instantiations: Template parameters to the type.
     """
-
-    namespaces_name_rule = delimitedList(IDENT, "::")
-    rule = (
-        namespaces_name_rule("namespaces_and_name")  #
-    ).setParseAction(lambda t: Typename.from_parse_result(t))
-
-    def __init__(self,
-                 name: str,
-                 namespaces: list[str],
-                 instantiations: Sequence[ParseResults] = ()):
-        self.name = name
-        self.namespaces = namespaces
-
+    __slots__ = ("name", "namespaces", "instantiations", "_str", "__weakref__")
+
+    # The existing typenames, keyed by their attributes.
+    _interned: "weakref.WeakValueDictionary[tuple, Typename]" = \
+        weakref.WeakValueDictionary()
+
+    @lazy_rule
+    def namespaces_name_rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a name with its namespaces, e.g. `gtsam::Pose3`."""
+        return delimitedList(Tokens.IDENT, "::")
+
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a typename."""
+        return (
+            cls.namespaces_name_rule("namespaces_and_name")  #
+        ).setParseAction(lambda t: Typename.from_parse_result(t))
+
+    def __new__(cls,
+                name: str,
+                namespaces: list[str],
+                instantiations: Sequence[ParseResults] = ()):
+        namespaces = list(namespaces)
         # If the first namespace is empty string, just get rid of it.
-        if self.namespaces and self.namespaces[0] == '':
-            self.namespaces.pop(0)
+        if namespaces and namespaces[0] == '':
+            namespaces.pop(0)
 
         if instantiations:
             if isinstance(instantiations, Sequence):
-                self.instantiations = instantiations  # type: ignore
+                instantiations = list(instantiations)  # type: ignore
             else:
-                self.instantiations = instantiations.asList()
+                instantiations = instantiations.asList()
         else:
-            self.instantiations = []
+            instantiations = []
+
+        # The nested typenames are interned, so they are keyed by identity,
+        # which is stable since this typename keeps them alive.
+        key = (name if isinstance(name, str) else id(name),
+               tuple(namespaces), tuple(map(id, instantiations)))
+        typename = cls._interned.get(key)
+        if typename is None:
+            typename = super().__new__(cls)
+            object.__setattr__(typename, "name", name)
+            object.__setattr__(typename, "namespaces", namespaces)
+            object.__setattr__(typename, "instantiations", instantiations)
+            object.__setattr__(typename, "_str", None)
+            cls._interned[key] = typename
+        return typename
+
+    def __reduce__(self):
+        # Intern the typename again when unpickling.
+        return (Typename, (self.name, self.namespaces, self.instantiations))
 
     @staticmethod
     def from_parse_result(parse_result: list):
@@ -71,6 +124,12 @@ class Typename:
         return Typename(name, namespaces)
 
     def __repr__(self) -> str:
+        if self._str is None:
+            object.__setattr__(self, "_str", self._to_str())
+        return self._str
+
+    def _to_str(self) -> str:
+        """Get the string of the typename, which `__repr__` caches."""
         if self.get_template_args():
             templates = f"<{self.get_template_args()}>"
         else:
@@ -121,11 +180,18 @@ class Typename:
         )
 
     def __eq__(self, other) -> bool:
+        if self is other:
+            return True
         if isinstance(other, Typename):
+            # Typenames with different attributes can have the same string,
+            # e.g. if the name includes a namespace.
             return str(self) == str(other)
         else:
             return False
 
+    def __hash__(self) -> int:
+        return hash(str(self))
+
     def __ne__(self, other) -> bool:
         res = self.__eq__(other)
         return not res
@@ -151,8 +217,13 @@ class BasicType:
     }, py::arg("x"));
     ```
     """
+    __slots__ = ("typename",)
 
-    rule = (Or(BASIC_TYPES)("typename")).setParseAction(lambda t: BasicType(t))
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a basic type."""
+        return Tokens.BASIC_TYPES("typename").setParseAction(
+            lambda t: BasicType(t))
 
     def __init__(self, t: ParseResults):
         self.typename = Typename.from_parse_result(t)
@@ -170,14 +241,19 @@ class CustomType:
 
     Here `gtsam::Matrix` is a custom type.
     """
+    __slots__ = ("typename",)
 
-    rule = (Typename.rule("typename")).setParseAction(lambda t: CustomType(t))
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a custom type."""
+        return (Typename.rule("typename")).setParseAction(
+            lambda t: CustomType(t))
 
     def __init__(self, t: ParseResults):
         self.typename = Typename.from_parse_result(t)
 
 
-class Type:
+class Type(_Immutable):
     """
     Parsed datatype, can be either a fundamental/basic type or a custom datatype.
     E.g. void, double, size_t, Matrix.
@@ -186,23 +262,47 @@ class Type:
 
     The type can optionally be a raw pointer, shared pointer or reference.
     Can also be optionally qualified with a `const`, e.g. `const int`.
+
+    Like typenames, types are immutable and interned.
     """
-    rule = (
-        Optional(CONST("is_const"))  #
-        + (BasicType.rule("basic") | CustomType.rule("custom"))  # BR
-        + Optional(
-            SHARED_POINTER("is_shared_ptr") | RAW_POINTER("is_ptr")
-            | REF("is_ref"))  #
-    ).setParseAction(lambda t: Type.from_parse_result(t))
-
-    def __init__(self, typename: Typename, is_const: str, is_shared_ptr: str,
-                 is_ptr: str, is_ref: str, is_basic: bool):
-        self.typename = typename
-        self.is_const = is_const
-        self.is_shared_ptr = is_shared_ptr
-        self.is_ptr = is_ptr
-        self.is_ref = is_ref
-        self.is_basic = is_basic
+    __slots__ = ("typename", "is_const", "is_shared_ptr", "is_ptr", "is_ref",
+                 "is_basic", "__weakref__")
+
+    # The existing types, keyed by their attributes.
+    _interned: "weakref.WeakValueDictionary[tuple, Type]" = \
+        weakref.WeakValueDictionary()
+
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a type."""
+        return (
+            Optional(Tokens.CONST("is_const"))  #
+            + (BasicType.rule("basic") | CustomType.rule("custom"))  # BR
+            + Optional(
+                Tokens.SHARED_POINTER("is_shared_ptr")
+                | Tokens.RAW_POINTER("is_ptr") | Tokens.REF("is_ref"))  #
+        ).setParseAction(lambda t: Type.from_parse_result(t))
+
+    def __new__(cls, typename: Typename, is_const: str, is_shared_ptr: str,
+                is_ptr: str, is_ref: str, is_basic: bool):
+        key = (id(typename), is_const, is_shared_ptr, is_ptr, is_ref,
+               is_basic)
+        ctype = cls._interned.get(key)
+        if ctype is None:
+            ctype = super().__new__(cls)
+            object.__setattr__(ctype, "typename", typename)
+            object.__setattr__(ctype, "is_const", is_const)
+            object.__setattr__(ctype, "is_shared_ptr", is_shared_ptr)
+            object.__setattr__(ctype, "is_ptr", is_ptr)
+            object.__setattr__(ctype, "is_ref", is_ref)
+            object.__setattr__(ctype, "is_basic", is_basic)
+            cls._interned[key] = ctype
+        return ctype
+
+    def __reduce__(self):
+        # Intern the type again when unpickling.
+        return (Type, (self.typename, self.is_const, self.is_shared_ptr,
+                       self.is_ptr, self.is_ref, self.is_basic))
 
     @staticmethod
     def from_parse_result(t: ParseResults):
@@ -271,19 +371,25 @@ class TemplatedType:
 
     E.g. std::vector<double>, BearingRange<Pose3, Point3>
     """
-
-    rule = Forward()
-    rule << (
-        Optional(CONST("is_const"))  #
-        + Typename.rule("typename")  #
-        + (
-            LOPBRACK  #
-            + delimitedList(Type.rule ^ rule, ",")("template_params")  #
-            + ROPBRACK)  #
-        + Optional(
-            SHARED_POINTER("is_shared_ptr") | RAW_POINTER("is_ptr")
-            | REF("is_ref"))  #
-    ).setParseAction(lambda t: TemplatedType.from_parse_result(t))
+    __slots__ = ("typename", "template_params", "is_const", "is_shared_ptr",
+                 "is_ptr", "is_ref")
+
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a templated type, whose parameters may be templated."""
+        rule = Forward()
+        rule << (
+            Optional(Tokens.CONST("is_const"))  #
+            + Typename.rule("typename")  #
+            + (
+                Tokens.LOPBRACK  #
+                + delimitedList(Type.rule ^ rule, ",")("template_params")  #
+                + Tokens.ROPBRACK)  #
+            + Optional(
+                Tokens.SHARED_POINTER("is_shared_ptr")
+                | Tokens.RAW_POINTER("is_ptr") | Tokens.REF("is_ref"))  #
+        ).setParseAction(lambda t: TemplatedType.from_parse_result(t))
+        return rule
 
     def __init__(self, typename: Typename, template_params: List[Type],
                  is_const: str, is_shared_ptr: str, is_ptr: str, is_ref: str):
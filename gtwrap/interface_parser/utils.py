@@ -10,6 +10,13 @@ Various common utilities.
 Author: Varun Agrawal
 """
 
+import threading
+
+from pyparsing import Suppress, cppStyleComment  # type: ignore
+
+# The comments skipped between the tokens of all the rules.
+COMMENT = Suppress(cppStyleComment)
+
 
 def collect_namespaces(obj):
     """
@@ -24,3 +31,67 @@ def collect_namespaces(obj):
         namespaces = [ancestor.name] + namespaces
         ancestor = ancestor.parent
     return [''] + namespaces
+
+
+def check_attributes(attributes, allowed, declaration):
+    """
+    Check that the attributes of a declaration, e.g. `[[release_gil]]`,
+    are among the `allowed` ones.
+
+    Args:
+        attributes: The names of the attributes of the declaration.
+        allowed: The names of the attributes which the declaration may have.
+        declaration: The name of the declaration, for the error message.
+    """
+    for attribute in attributes:
+        if attribute not in allowed:
+            raise ValueError(
+                "Unknown attribute [[{}]] of {}, expected one of {}".format(
+                    attribute, declaration, list(allowed)))
+
+
+class lazy_rule:  # pylint: disable=invalid-name
+    """
+    Decorator for a class attribute holding a grammar rule which is built
+    when it is first accessed, instead of when the module is imported.
+
+    The rule is built once per process and then replaces the attribute.
+    Like when the whole grammar was built on import, the rule skips the
+    C++ comments between its tokens, unless it is declared with
+    `lazy_rule.uncommented`.
+
+    E.g.
+    ```
+    class Module:
+        @lazy_rule
+        def rule(cls):
+            return ZeroOrMore(...)
+    ```
+    """
+
+    def __init__(self, build, ignore=COMMENT):
+        self.build = build
+        self.ignore = ignore
+        self.owner = None
+        self.name = build.__name__
+        self.lock = threading.RLock()
+        self.__doc__ = build.__doc__
+
+    @classmethod
+    def uncommented(cls, build):
+        """Same as `lazy_rule`, for a rule which does not skip comments."""
+        return cls(build, ignore=None)
+
+    def __set_name__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __get__(self, instance, owner):
+        with self.lock:
+            rule = self.owner.__dict__[self.name]
+            if rule is self:
+                rule = self.build(self.owner)
+                if self.ignore is not None:
+                    rule.ignore(self.ignore)
+                setattr(self.owner, self.name, rule)
+        return rule
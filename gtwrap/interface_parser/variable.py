@@ -14,8 +14,9 @@ from typing import List
 
 from pyparsing import Optional, ParseResults  # type: ignore
 
-from .tokens import DEFAULT_ARG, EQUAL, IDENT, SEMI_COLON
+from .tokens import Tokens
 from .type import TemplatedType, Type
+from .utils import lazy_rule
 
 
 class Variable:
@@ -32,14 +33,18 @@ class Variable:
     Vector3 kGravity;  // This is a global variable.
     ````
     """
-    rule = ((Type.rule ^ TemplatedType.rule)("ctype")  #
-            + IDENT("name")  #
-            + Optional(EQUAL + DEFAULT_ARG)("default")  #
-            + SEMI_COLON  #
-            ).setParseAction(lambda t: Variable(
-                t.ctype,  #
-                t.name,  #
-                t.default[0] if isinstance(t.default, ParseResults) else None))
+    @lazy_rule
+    def rule(cls):  # pylint: disable=no-self-argument
+        """The rule for a variable."""
+        return ((Type.rule ^ TemplatedType.rule)("ctype")  #
+                + Tokens.IDENT("name")  #
+                + Optional(Tokens.EQUAL + Tokens.DEFAULT_ARG)("default")  #
+                + Tokens.SEMI_COLON  #
+                ).setParseAction(lambda t: Variable(
+                    t.ctype,  #
+                    t.name,  #
+                    t.default[0]
+                    if isinstance(t.default, ParseResults) else None))
 
     def __init__(self,
                  ctype: List[Type],
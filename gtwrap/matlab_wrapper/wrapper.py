@@ -14,9 +14,11 @@ from typing import Dict, Iterable, List, Union
 
 import gtwrap.interface_parser as parser
 import gtwrap.template_instantiator as instantiator
+from gtwrap.file_writer import FileWriter
 from gtwrap.interface_parser.function import ArgumentList
 from gtwrap.matlab_wrapper.mixins import CheckMixin, FormatMixin
 from gtwrap.matlab_wrapper.templates import WrapperTemplate
+from gtwrap.profiling import PhaseTimer
 from gtwrap.template_instantiator.classes import InstantiatedClass
 
 
@@ -28,13 +30,28 @@ class MatlabWrapper(CheckMixin, FormatMixin):
         module_name: name of the C++ module being wrapped
         top_module_namespace: C++ namespace for the top module (default '')
         ignore_classes: A list of classes to ignore (default [])
+        cache_dir: Directory in which to cache the parsed interface files (default '')
+        timer: Timer for the wrapping phases (default disabled)
+        packrat_cache_size: Size of the packrat cache of the parser (default pyparsing's)
+        packrat_mode: How the packrat cache evicts entries (default 'fifo')
+        writer: Writer of the generated files, which skips the unchanged files
+        packrat_stats: Statistics of the packrat cache over the parsed files
     """
 
+    # The headers of the wrapper file, which CMake generates next to this
+    # file from templates/matlab_wrapper.tpl.in.
+    TEMPLATE_FILE = osp.join(osp.dirname(osp.realpath(__file__)),
+                             "matlab_wrapper.tpl")
+
     def __init__(self,
                  module_name,
                  top_module_namespace='',
                  ignore_classes=(),
-                 use_boost_serialization=False):
+                 use_boost_serialization=False,
+                 cache_dir='',
+                 timer=None,
+                 packrat_cache_size=None,
+                 packrat_mode=None):
         super().__init__()
 
         self.module_name = module_name
@@ -42,6 +59,12 @@ class MatlabWrapper(CheckMixin, FormatMixin):
         self.ignore_classes = ignore_classes
         self.verbose = False
         self.use_boost_serialization = use_boost_serialization
+        self.cache_dir = cache_dir
+        self.timer = timer if timer is not None else PhaseTimer()
+        self.packrat_cache_size = packrat_cache_size
+        self.packrat_mode = packrat_mode
+        self.writer = FileWriter()
+        self.packrat_stats = parser.PackratStats()
 
         # Map the data type to its Matlab class.
         # Found in Argument.cpp in old wrapper
@@ -89,9 +112,7 @@ class MatlabWrapper(CheckMixin, FormatMixin):
         # Files and their content
         self.content: List[str] = []
 
-        # Ensure the template file is always picked up from the correct directory.
-        dir_path = osp.dirname(osp.realpath(__file__))
-        with open(osp.join(dir_path, "matlab_wrapper.tpl")) as f:
+        with open(self.TEMPLATE_FILE) as f:
             self.wrapper_file_headers = f.read()
 
     def add_class(self, instantiated_class):
@@ -1863,6 +1884,19 @@ class MatlabWrapper(CheckMixin, FormatMixin):
                 (folder_name, [(file_name, file_content)])
             path: The path to the files parent folder within the main folder
         """
+        # A file can occur several times, e.g. the headers of the wrapper
+        # file before the complete file, so only write its final content.
+        files = {}
+        self._collect_content(cc_content, path, files)
+        for path_to_file, file_content in files.items():
+            self.writer.write(path_to_file, (file_content, ))
+
+    def _collect_content(self, cc_content, path, files):
+        """
+        Collect the files of the matlab wrapper content `cc_content`, see
+        `generate_content`, into the `files` dict from their path to their
+        content, and create their folders.
+        """
         for c in cc_content:
             if isinstance(c, list):
                 # c is a namespace
@@ -1878,7 +1912,8 @@ class MatlabWrapper(CheckMixin, FormatMixin):
                         pass
 
                 for sub_content in c:
-                    self.generate_content(sub_content[1], path_to_folder)
+                    self._collect_content(sub_content[1], path_to_folder,
+                                          files)
 
             elif isinstance(c[1], list):
                 # c is a wrapped function
@@ -1892,8 +1927,7 @@ class MatlabWrapper(CheckMixin, FormatMixin):
 
                 for sub_content in c[1]:
                     path_to_file = osp.join(path_to_folder, sub_content[0])
-                    with open(path_to_file, 'w') as f:
-                        f.write(sub_content[1])
+                    files[path_to_file] = sub_content[1]
             else:
                 # c is a wrapped class
                 path_to_file = osp.join(path, c[0])
@@ -1904,8 +1938,7 @@ class MatlabWrapper(CheckMixin, FormatMixin):
                     except OSError:
                         pass
 
-                with open(path_to_file, 'w') as f:
-                    f.write(c[1])
+                files[path_to_file] = c[1]
 
     def wrap(self, files, path):
         """High level function to wrap the project."""
@@ -1915,26 +1948,36 @@ class MatlabWrapper(CheckMixin, FormatMixin):
             with open(file, 'r') as f:
                 content += f.read()
 
-        # Parse the contents of the interface file
-        parsed_result = parser.Module.parseString(content)
-
-        # Instantiate the module
-        module = instantiator.instantiate_namespace(parsed_result)
-
-        if module.name in modules:
-            modules[
-                module.name].content[0].content += module.content[0].content
-        else:
-            modules[module.name] = module
+        with self.timer.phase(";".join(osp.basename(f) for f in files)):
+            # Parse the contents of the interface file
+            with self.timer.phase("parse"):
+                parsed_result = parser.Module.parseString(
+                    content,
+                    cache_dir=self.cache_dir,
+                    packrat_cache_size=self.packrat_cache_size,
+                    packrat_mode=self.packrat_mode,
+                    packrat_stats=self.packrat_stats)
+
+            # Instantiate the module
+            with self.timer.phase("instantiate"):
+                module = instantiator.instantiate_namespace(parsed_result)
+
+            if module.name in modules:
+                modules[module.name].content[0].content += module.content[
+                    0].content
+            else:
+                modules[module.name] = module
 
-        for module in modules.values():
-            # Wrap the full namespace
-            self.wrap_namespace(module)
+            for module in modules.values():
+                with self.timer.phase("emit"):
+                    # Wrap the full namespace
+                    self.wrap_namespace(module)
 
-            # Generate the wrapping code (both C++ and .m files)
-            self.generate_wrapper(module)
+                    # Generate the wrapping code (both C++ and .m files)
+                    self.generate_wrapper(module)
 
-            # Generate the corresponding .m and .cpp files
-            self.generate_content(self.content, path)
+                # Generate the corresponding .m and .cpp files
+                with self.timer.phase("write"):
+                    self.generate_content(self.content, path)
 
         return self.content
@@ -0,0 +1,128 @@
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Timing and memory instrumentation of the wrapping phases.
+"""
+
+import contextlib
+import json
+import time
+import tracemalloc
+from typing import Dict, Iterator, List, Tuple
+
+
+def _empty_record() -> Dict[str, float]:
+    """The measurements of a phase which has not been entered yet."""
+    return {"wall_time": 0.0, "cpu_time": 0.0, "peak_memory": 0, "calls": 0}
+
+
+class PhaseTimer:
+    """
+    Measure the wall time, CPU time and peak traced memory of named phases.
+
+    Phases can be nested, e.g. the docstring extraction is a phase within the
+    code emission, which in turn is a phase within an interface file, and a
+    phase which is entered several times accumulates its measurements.
+    When disabled, entering a phase does nothing.
+
+    E.g.
+    ```
+    timer = PhaseTimer(enabled=True)
+    with timer.phase("gtsam.i"):
+        with timer.phase("parse"):
+            ...
+    print(timer.report())
+    ```
+
+    Args:
+        enabled: Whether to take any measurements.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        # The measurements of each phase, keyed by the path of phase names.
+        self.records: Dict[Tuple[str, ...], Dict[str, float]] = {}
+        # The names and the peak memory so far of the phases being measured.
+        self._stack: List[List] = []
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Measure the code run within this context as the phase `name`."""
+        if not self.enabled:
+            yield
+            return
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        elif self._stack:
+            # The peak is reset for this phase, so save the parent's first.
+            _, peak = tracemalloc.get_traced_memory()
+            self._stack[-1][1] = max(self._stack[-1][1], peak)
+        tracemalloc.reset_peak()
+
+        self._stack.append([name, 0])
+        # Add the record on entry so that the phases are in execution order.
+        record = self.records.setdefault(
+            tuple(entry[0] for entry in self._stack), _empty_record())
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - wall_start
+            cpu_time = time.process_time() - cpu_start
+            _, peak = tracemalloc.get_traced_memory()
+            _, nested_peak = self._stack.pop()
+            peak = max(peak, nested_peak)
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], peak)
+            if started_tracing:
+                tracemalloc.stop()
+
+            record["wall_time"] += wall_time
+            record["cpu_time"] += cpu_time
+            record["peak_memory"] = max(record["peak_memory"], peak)
+            record["calls"] += 1
+
+    def merge(self, records: Dict[Tuple[str, ...], Dict[str, float]]):
+        """
+        Accumulate the measurements `records` of another timer,
+        e.g. of a worker process.
+        """
+        for path, other in records.items():
+            record = self.records.setdefault(path, _empty_record())
+            record["wall_time"] += other["wall_time"]
+            record["cpu_time"] += other["cpu_time"]
+            record["peak_memory"] = max(record["peak_memory"],
+                                        other["peak_memory"])
+            record["calls"] += other["calls"]
+
+    def to_json(self) -> List[Dict]:
+        """Get the measurements as a list of JSON serializable dicts."""
+        return [{
+            "phase": list(path),
+            **record
+        } for path, record in self.records.items()]
+
+    def write_json(self, filename: str):
+        """Write the measurements to the JSON file `filename`."""
+        with open(filename, "w", encoding="UTF-8") as f:
+            json.dump({"phases": self.to_json()}, f, indent=2)
+
+    def report(self) -> str:
+        """Format the measurements as a table, nesting the phase names."""
+        lines = [
+            f"{'phase':<40} {'wall [s]':>10} {'cpu [s]':>10} "
+            f"{'peak [MB]':>10} {'calls':>6}"
+        ]
+        for path, record in self.records.items():
+            name = "  " * (len(path) - 1) + path[-1]
+            lines.append(f"{name:<40} {record['wall_time']:>10.3f} "
+                         f"{record['cpu_time']:>10.3f} "
+                         f"{record['peak_memory'] / 2**20:>10.1f} "
+                         f"{record['calls']:>6}")
+        return "\n".join(lines)
@@ -12,19 +12,174 @@ Author: Duy Nguyen Ta, Fan Jiang, Matthew Sklar, Varun Agrawal, and Frank Dellae
 
 # pylint: disable=too-many-arguments, too-many-instance-attributes, no-self-use, no-else-return, too-many-arguments, unused-format-string-argument, line-too-long, consider-using-f-string
 
+import os
 import re
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List
 
 import gtwrap.interface_parser as parser
 import gtwrap.template_instantiator as instantiator
+from gtwrap.file_writer import FileWriter
 from gtwrap.interface_parser.function import ArgumentList
+from gtwrap.profiling import PhaseTimer
 from gtwrap.xml_parser.xml_parser import XMLDocParser
 
+# Placeholder for the wrapped namespace in the formatted module template,
+# which cannot occur in the template or the generated code.
+_WRAPPED_NAMESPACE = "\0wrapped_namespace\0"
+
+# The code of a namespace element, which is wrapped in one of the shards of a
+# module. `namespaces` are the full namespaces of the element.
+_WrapUnit = namedtuple("_WrapUnit", ["namespaces", "element", "chunks"])
+
+# The spaces around the punctuation of a C++ name, see `_canonical_name`.
+_NAME_SPACES = re.compile(r"\s*([<>,:*&])\s*")
+
+
+def _canonical_name(name: str) -> str:
+    """
+    Get the canonical form of the qualified C++ `name` of a class, without
+    the spaces around its punctuation and the leading `::`, e.g.
+    `gtsam::Base<double,int>` for `::gtsam::Base<double, int>`.
+    """
+    return _NAME_SPACES.sub(r"\1", name.strip()).lstrip(":")
+
+
+# The methods returning references whose bindings return the referenced
+# objects without copying them, see `PybindWrapper`.
+REFERENCE_RETURNS = ("none", "eigen", "all")
+
+# The names of the Eigen matrix and vector types, e.g. gtsam::Matrix3.
+_EIGEN_TYPE_NAME = re.compile(r"(Matrix|Vector|RowVector)(\d+|X[df]?)?$")
+_EIGEN_NAMESPACES = ([], ["gtsam"], ["Eigen"])
+
+
+def _is_eigen_type(ctype) -> bool:
+    """Check if `ctype` is an Eigen matrix or vector type."""
+    return (isinstance(ctype, parser.Type)
+            and _EIGEN_TYPE_NAME.match(ctype.typename.name) is not None
+            and ctype.typename.namespaces in _EIGEN_NAMESPACES)
+
+
+def _is_eigen_ref_arg(arg) -> bool:
+    """Check if `arg` is a `const` reference to an Eigen type."""
+    return arg.ctype.is_const and arg.ctype.is_ref and _is_eigen_type(
+        arg.ctype)
+
+
+# The orders of the overloads of a function in the bindings, see
+# `PybindWrapper`.
+OVERLOAD_ORDERS = ("declaration", "cost")
+
+
+def _conversion_cost(function) -> int:
+    """
+    Estimate the cost of a failed call of the overload `function`, by the
+    number of its arguments which pybind11 copies while it tries to convert
+    them, i.e. Eigen types and STL containers, before it can find that
+    another argument does not match.
+    """
+    return sum(1 for arg in function.args.list()
+               if _is_eigen_type(arg.ctype)
+               or isinstance(arg.ctype, parser.TemplatedType))
+
+
+def _arity(function):
+    """
+    Get the smallest and largest numbers of arguments of a call of the
+    overload `function`, which differ if it has default arguments.
+    """
+    args = function.args.list()
+    return sum(1 for arg in args if arg.default is None), len(args)
+
+
+def _compete(function1, function2) -> bool:
+    """
+    Check if pybind11 may try both of the overloads `function1` and
+    `function2` for a call, i.e. if they take the same numbers of arguments,
+    since pybind11 skips the overloads of other arities without converting
+    any argument.
+    """
+    min1, max1 = _arity(function1)
+    min2, max2 = _arity(function2)
+    return min1 <= max2 and min2 <= max1
+
+
+# The basic types which the batch bindings take and return as NumPy vectors.
+_BATCH_SCALARS = ("bool", "int", "size_t", "double", "float")
+# The fixed size Eigen vectors, e.g. gtsam::Vector3, which the batch bindings
+# take and return as NumPy arrays with a row per element.
+_FIXED_EIGEN_VECTOR = re.compile(r"Vector([2-9])$")
+
+
+def _batch_kind(ctype):
+    """
+    Get how the batch bindings pass the values of `ctype`: "scalar" as a
+    NumPy vector, ("vector", N) as a NumPy array of N columns, or "object"
+    as a sequence of Python objects.
+    """
+    if isinstance(ctype, parser.Type) and not (ctype.is_shared_ptr
+                                               or ctype.is_ptr):
+        if ctype.is_basic and ctype.typename.name in _BATCH_SCALARS:
+            return "scalar"
+        match = _FIXED_EIGEN_VECTOR.match(ctype.typename.name)
+        if match and ctype.typename.namespaces in _EIGEN_NAMESPACES:
+            return ("vector", int(match.group(1)))
+    return "object"
+
+
+def _value_type(ctype) -> str:
+    """Get the C++ type of the values of `ctype`, i.e. without const or &."""
+    if ctype.is_shared_ptr:
+        return f"std::shared_ptr<{ctype.get_typename()}>"
+    if ctype.is_ptr:
+        return f"{ctype.get_typename()}*"
+    return ctype.get_typename()
+
+
+def shard_filename(filename, index):
+    """Get the name of the file of the shard `index` of the wrapper file."""
+    path = Path(filename)
+    return str(path.with_name("{}_{}{}".format(path.stem, index,
+                                               path.suffix)))
+
 
 class PybindWrapper:
     """
     Class to generate binding code for Pybind11 specifically.
+
+    The bindings of the methods which return references copy the referenced
+    objects by default. The methods or classes with the `[[reference_return]]`
+    attribute, and the methods returning references to Eigen types if
+    `reference_returns` is "eigen", or to any type if it is "all", return a
+    view into the object of the method instead, which the view keeps alive.
+    The view dangles if the referenced object is reallocated, e.g. resized.
+    The `[[copy_return]]` attribute of a method or class opts out of it, and
+    the methods with an argument of the returned type are not affected since
+    they may return a reference to the argument.
+
+    pybind11 tries the overloads of a function in the order of the bindings,
+    first without and then with implicit conversions, and a failed attempt
+    may have copied arguments, e.g. Eigen matrices. The overloads of other
+    arities are skipped without converting any argument. If `overload_order`
+    is "cost", the overloads of the same arity are wrapped in the order of
+    the cost of their failed attempts, see `_conversion_cost`, instead of in
+    the declaration order. This changes which overload is called if several
+    match. The `[[prefer]]` attribute puts an overload first with
+    `py::prepend()`, and `[[noconvert]]` restricts it to arguments of the
+    exact types. The overloads which convert arguments before others are
+    tried are reported in `overload_diagnostics`.
+
+    For the methods, functions and classes with the `[[eigen_ref]]`
+    attribute, whose callees take `Eigen::Ref` arguments, the `const`
+    reference arguments of Eigen types are taken as `Eigen::Ref<const T>` by
+    the bindings, so that NumPy arrays with the memory layout of `T` are
+    passed without a copy, while the others are still copied. With
+    `eigen_ref_args`, the other functions with such arguments get such a
+    binding for the arrays with a matching layout only, before their usual
+    binding, see `_arg_variants`.
     """
 
     def __init__(self,
@@ -33,7 +188,21 @@ class PybindWrapper:
                  use_boost_serialization=False,
                  ignore_classes=(),
                  module_template="",
-                 xml_source=""):
+                 xml_source="",
+                 cache_dir="",
+                 timer=None,
+                 shards=1,
+                 packrat_cache_size=None,
+                 packrat_mode=None,
+                 reference_returns="none",
+                 eigen_ref_args=False,
+                 overload_order="declaration"):
+        if reference_returns not in REFERENCE_RETURNS:
+            raise ValueError(f"Unknown reference returns {reference_returns}, "
+                             f"expected one of {REFERENCE_RETURNS}")
+        if overload_order not in OVERLOAD_ORDERS:
+            raise ValueError(f"Unknown overload order {overload_order}, "
+                             f"expected one of {OVERLOAD_ORDERS}")
         self.module_name = module_name
         self.top_module_namespaces = top_module_namespaces
         self.use_boost_serialization = use_boost_serialization
@@ -49,6 +218,28 @@ class PybindWrapper:
         ]
         self.xml_source = xml_source
         self.xml_parser = XMLDocParser()
+        # Directory in which to cache the parsed interface files.
+        self.cache_dir = cache_dir
+        # Timer for the wrapping phases, which is disabled by default.
+        self.timer = timer if timer is not None else PhaseTimer()
+        # Writer of the generated files, which skips the unchanged files.
+        self.writer = FileWriter()
+        # Size and mode of the packrat cache of the parser, see
+        # `configure_packrat`, and its statistics over the parsed files.
+        self.packrat_cache_size = packrat_cache_size
+        self.packrat_mode = packrat_mode
+        self.packrat_stats = parser.PackratStats()
+        # Number of files into which `wrap` and `wrap_submodule` split the
+        # classes of a module, so that they can be compiled in parallel.
+        self.shards = shards
+        # Which returned references are not copied, one of REFERENCE_RETURNS.
+        self.reference_returns = reference_returns
+        # Whether to take the Eigen arguments as Eigen::Ref.
+        self.eigen_ref_args = eigen_ref_args
+        # The order of the overloads, one of OVERLOAD_ORDERS, and the
+        # diagnostics of the overloads which convert arguments in vain.
+        self.overload_order = overload_order
+        self.overload_diagnostics = []
 
         self.dunder_methods = ('len', 'contains', 'iter')
 
@@ -60,8 +251,12 @@ class PybindWrapper:
             "svg", "png", "jpeg", "html", "javascript", "markdown", "latex"
         ]
 
-    def _py_args_names(self, args):
-        """Set the argument names in Pybind11 format."""
+    def _py_args_names(self, args, noconvert=False, noconvert_eigen=False):
+        """
+        Set the argument names in Pybind11 format, which disallow implicit
+        conversions of the arguments if `noconvert`, or of the `const`
+        reference Eigen arguments if `noconvert_eigen`.
+        """
         names = args.names()
         if names:
             py_args = []
@@ -70,16 +265,40 @@ class PybindWrapper:
                     default = ' = {arg.default}'.format(arg=arg)
                 else:
                     default = ''
-                argument = 'py::arg("{name}"){default}'.format(
-                    name=arg.name, default='{0}'.format(default))
+                argument = 'py::arg("{name}"){noconvert}{default}'.format(
+                    name=arg.name,
+                    noconvert='.noconvert()' if noconvert or
+                    (noconvert_eigen and _is_eigen_ref_arg(arg)) else '',
+                    default='{0}'.format(default))
                 py_args.append(argument)
             return ", " + ", ".join(py_args)
         else:
             return ''
 
-    def _method_args_signature(self, args: ArgumentList):
-        """Generate the argument types and names as per the method signature."""
+    @staticmethod
+    def _has_eigen_ref(*nodes):
+        """
+        Check if any of the `nodes` (e.g. a method and its class) has the
+        `[[eigen_ref]]` attribute, i.e. its callees take `Eigen::Ref`.
+        """
+        return any("eigen_ref" in getattr(node, "attributes", ())
+                   for node in nodes)
+
+    def _method_args_signature(self, args: ArgumentList, *nodes,
+                               eigen_ref=False):
+        """
+        Generate the argument types and names as per the method signature.
+
+        The Eigen arguments are taken as `Eigen::Ref` if `eigen_ref`, or if
+        any of the `nodes` has the `[[eigen_ref]]` attribute.
+        """
         cpp_types = args.to_cpp()
+        if eigen_ref or self._has_eigen_ref(*nodes):
+            cpp_types = [
+                f"const Eigen::Ref<const {arg.ctype.get_typename()}>&"
+                if _is_eigen_ref_arg(arg) else cpp_type
+                for arg, cpp_type in zip(args.list(), cpp_types)
+            ]
         names = args.names()
         types_names = [
             "{} {}".format(ctype, name)
@@ -88,16 +307,46 @@ class PybindWrapper:
 
         return ', '.join(types_names)
 
+    def _arg_variants(self, function, *nodes):
+        """
+        Get the argument signatures and names of the bindings of `function`,
+        in the order of the bindings, where `nodes` are its enclosing nodes.
+
+        With `eigen_ref_args`, the callees without the `[[eigen_ref]]`
+        attribute may take their Eigen arguments as `const T&`, so they get
+        an `Eigen::Ref` binding which only accepts the NumPy arrays with the
+        memory layout of `T` and is not copied, before the usual binding for
+        the other arrays. Converting these to an `Eigen::Ref` first would
+        copy them twice.
+        """
+        noconvert = "noconvert" in function.attributes
+        variants = [(self._method_args_signature(function.args, function,
+                                                 *nodes),
+                     self._py_args_names(function.args, noconvert))]
+        if (self.eigen_ref_args
+                and not self._has_eigen_ref(function, *nodes)
+                and any(_is_eigen_ref_arg(arg)
+                        for arg in function.args.list())):
+            ref_variant = (self._method_args_signature(function.args,
+                                                       eigen_ref=True),
+                           self._py_args_names(function.args,
+                                               noconvert,
+                                               noconvert_eigen=True))
+            # Each prepended binding goes before the ones bound before it.
+            if "prefer" in function.attributes:
+                variants.append(ref_variant)
+            else:
+                variants.insert(0, ref_variant)
+        return variants
+
     def wrap_ctors(self, my_class):
         """Wrap the constructors."""
-        res = ""
-        for ctor in my_class.ctors:
-            res += (self.method_indent + '.def(py::init<{args_cpp_types}>()'
-                    '{py_args_names})'.format(
-                        args_cpp_types=", ".join(ctor.args.to_cpp()),
-                        py_args_names=self._py_args_names(ctor.args),
-                    ))
-        return res
+        return "".join(
+            self.method_indent + '.def(py::init<{args_cpp_types}>()'
+            '{py_args_names})'.format(
+                args_cpp_types=", ".join(ctor.args.to_cpp()),
+                py_args_names=self._py_args_names(ctor.args),
+            ) for ctor in my_class.ctors)
 
     def _wrap_serialization(self, cpp_class):
         """Helper method to add serialize, deserialize and pickle methods to the wrapped class."""
@@ -205,6 +454,240 @@ class PybindWrapper:
 
         return ret
 
+    @staticmethod
+    def _call_guard(*nodes) -> str:
+        """
+        Get the extra argument of a binding which releases the GIL during the
+        C++ call, if any of the `nodes` (e.g. a method and its class) has the
+        `[[release_gil]]` attribute.
+        """
+        if any("release_gil" in getattr(node, "attributes", ())
+               for node in nodes):
+            return ", py::call_guard<py::gil_scoped_release>()"
+        return ""
+
+    def _order_overloads(self, functions, scope):
+        """
+        Order the overloads among the `functions` according to
+        `overload_order`, and add the diagnostics of their final order.
+
+        Args:
+            functions: The methods of a class or the functions of a namespace.
+            scope: The prefix of the names in the diagnostics, e.g. `gtsam::`.
+        """
+        functions = list(functions)
+        overloads = defaultdict(list)
+        for index, function in enumerate(functions):
+            overloads[function.name].append(index)
+
+        for name, indices in overloads.items():
+            if len(indices) < 2:
+                continue
+            if self.overload_order == "cost":
+                # Only the overloads which compete for the same calls are
+                # reordered, among the places they were declared in.
+                for group in self._competing_groups(
+                        [functions[index] for index in indices], indices):
+                    # Stable, so the declaration order breaks the ties.
+                    members = sorted((functions[index] for index in group),
+                                     key=_conversion_cost)
+                    for index, member in zip(group, members):
+                        functions[index] = member
+
+            # Each prepended overload goes before the ones wrapped before it.
+            members = [functions[index] for index in indices]
+            preferred = [x for x in members if "prefer" in x.attributes]
+            tried = preferred[::-1] + [
+                x for x in members if "prefer" not in x.attributes
+            ]
+            for position, member in enumerate(tried):
+                cost = _conversion_cost(member)
+                competitors = sum(1 for other in tried[position + 1:]
+                                  if _compete(member, other))
+                if cost and competitors:
+                    self.overload_diagnostics.append(
+                        f"{scope}{name}({', '.join(member.args.to_cpp())}) "
+                        f"copies {cost} "
+                        f"argument(s) before the {competitors} "
+                        "overload(s) after it are tried")
+        return functions
+
+    @staticmethod
+    def _competing_groups(members, indices):
+        """
+        Group the `indices` of the overloads `members` of a function into
+        the groups of overloads which compete for the same calls, directly
+        or through other overloads, see `_compete`.
+        """
+        groups = []
+        for index, member in zip(indices, members):
+            merged = [(index, member)]
+            for group in [
+                    group for group in groups
+                    if any(_compete(member, other) for _, other in group)
+            ]:
+                groups.remove(group)
+                merged = group + merged
+            groups.append(sorted(merged, key=lambda item: item[0]))
+        return [[index for index, _ in group] for group in groups]
+
+    def _return_policy(self, method):
+        """
+        Get the trailing return type of the lambda and the return value policy
+        of the binding of `method`, which return the object referenced by the
+        return type without copying it, or empty strings to copy it.
+        """
+        return_type = method.return_type
+        ctype = return_type.type1
+        attributes = method.attributes + getattr(method.parent, "attributes",
+                                                 ())
+        if (return_type.type2 or not ctype.is_ref
+                or getattr(ctype, "is_basic", False)
+                or "copy_return" in attributes):
+            return "", ""
+        if "reference_return" not in attributes and (
+                self.reference_returns == "none"
+                or self.reference_returns == "eigen"
+                and not _is_eigen_type(ctype)):
+            return "", ""
+        # The reference could be to an argument of the same type, which may
+        # be a temporary converted from a Python object.
+        if any(arg.ctype.typename == ctype.typename
+               for arg in method.args.args_list):
+            return "", ""
+        # Without the trailing return type the lambda returns a copy.
+        return (f" -> {return_type.to_cpp()} ",
+                ", py::return_value_policy::reference_internal")
+
+    @staticmethod
+    def _prepend(function) -> str:
+        """
+        Get the extra argument of the binding of an overload with the
+        `[[prefer]]` attribute, which pybind11 tries before the others.
+        """
+        return ", py::prepend()" if "prefer" in function.attributes else ""
+
+    def _wrap_batch(self, function, py_name, cpp_call, opt_self, cdef, prefix,
+                    suffix):
+        """
+        Wrap the vectorized variant `<py_name>_batch` of the `function` with
+        the `[[batch]]` attribute, which calls it for all the elements of its
+        arguments in a loop, without the GIL.
+
+        Args:
+            function: The method, static method or global function.
+            py_name: The Python name of the wrapped function.
+            cpp_call: The C++ expression which calls the function, e.g.
+                `self->f`.
+            opt_self: The self argument of the lambda, if any.
+            cdef: The pybind function which defines the binding.
+            prefix: Prefix to add to the wrapped function.
+            suffix: Suffix to add to the wrapped function.
+        """
+        if "batch" not in function.attributes:
+            return ""
+        args = function.args.list()
+        if not args:
+            raise ValueError(
+                f"The [[batch]] function {function.name} has no arguments")
+        # The elements are passed by value, so the changes to output
+        # arguments would be lost.
+        for arg in args:
+            ctype = arg.ctype
+            if not ctype.is_const and (ctype.is_ref or ctype.is_ptr
+                                       or ctype.is_shared_ptr):
+                raise ValueError(
+                    f"The [[batch]] function {function.name} has the non-const "
+                    f"reference or pointer argument {arg.name}")
+
+        # Indent the body of the lambda relative to the line of the binding.
+        line = prefix.rsplit('\n', 1)[-1]
+        base_indent = '\n' + ' ' * (len(line) - len(line.lstrip(' ')))
+        indent = base_indent + ' ' * 4
+        params = [opt_self] if opt_self else []
+        sizes, elements = [], []
+        body = []
+        for arg in args:
+            kind = _batch_kind(arg.ctype)
+            value_type = _value_type(arg.ctype)
+            if kind == "scalar":
+                params.append(
+                    f"const Eigen::Ref<const Eigen::Matrix<{value_type}, "
+                    f"Eigen::Dynamic, 1>>& {arg.name}")
+                sizes.append(f"{arg.name}.size()")
+                elements.append(f"{arg.name}(i)")
+            elif kind != "object":
+                params.append(
+                    f"const Eigen::Ref<const Eigen::Matrix<double, "
+                    f"Eigen::Dynamic, {kind[1]}, Eigen::RowMajor>>& {arg.name}")
+                sizes.append(f"{arg.name}.rows()")
+                elements.append(f"{arg.name}.row(i).transpose()")
+            else:
+                # Convert the Python objects before releasing the GIL.
+                params.append(f"const py::sequence& {arg.name}")
+                sizes.append(f"py::len({arg.name})")
+                elements.append(f"{arg.name}_values[i]")
+                body += [
+                    f"std::vector<{value_type}> {arg.name}_values;",
+                    f"{arg.name}_values.reserve(n);",
+                    f"for (const auto& item : {arg.name}) "
+                    f"{arg.name}_values.push_back(item.cast<{value_type}>());"
+                ]
+
+        body[:0] = [f"const size_t n = {sizes[0]};"] + [
+            f"if (static_cast<size_t>({size}) != n) "
+            f"throw std::invalid_argument(\"{py_name}_batch: the arguments "
+            f"have different lengths\");" for size in sizes[1:]
+        ]
+
+        call = f"{cpp_call}({', '.join(elements)})"
+        return_type = function.return_type
+        kind = "void" if return_type.is_void() else \
+            "object" if return_type.type2 else _batch_kind(return_type.type1)
+        if kind == "void":
+            store, result = f"{call};", []
+        elif kind == "scalar":
+            body.append(f"Eigen::Matrix<{_value_type(return_type.type1)}, "
+                        "Eigen::Dynamic, 1> result(n);")
+            store, result = f"result(i) = {call};", ["return result;"]
+        elif kind != "object":
+            body.append("Eigen::Matrix<double, Eigen::Dynamic, "
+                        f"{kind[1]}, Eigen::RowMajor> result(n, {kind[1]});")
+            store = f"result.row(i) = {call}.transpose();"
+            result = ["return result;"]
+        else:
+            value_type = _value_type(return_type.type1)
+            if return_type.type2:
+                value_type = (f"std::pair<{value_type}, "
+                              f"{_value_type(return_type.type2)}>")
+            body += [
+                f"std::vector<{value_type}> results;", "results.reserve(n);"
+            ]
+            store = f"results.push_back({call});"
+            result = [
+                "py::list result(n);",
+                "for (size_t i = 0; i < n; ++i) "
+                "result[i] = py::cast(std::move(results[i]));",
+                "return result;"
+            ]
+        body += [
+            "{", "    py::gil_scoped_release release;",
+            f"    for (size_t i = 0; i < n; ++i) {store}", "}"
+        ] + result
+
+        return ('{prefix}.{cdef}("{py_name}_batch",'
+                '[]({params}){{{body}{end}}}'
+                '{py_args_names}){suffix}'.format(
+                    prefix=prefix,
+                    cdef=cdef,
+                    py_name=py_name,
+                    params=", ".join(params),
+                    body="".join(indent + line for line in body),
+                    end=base_indent,
+                    py_args_names="".join(f', py::arg("{arg.name}")'
+                                          for arg in args),
+                    suffix=suffix))
+
     def _wrap_method(self,
                      method,
                      cpp_class,
@@ -225,8 +708,7 @@ class PybindWrapper:
         cpp_method = method.to_cpp()
 
         args_names = method.args.names()
-        py_args_names = self._py_args_names(method.args)
-        args_signature_with_names = self._method_args_signature(method.args)
+        variants = self._arg_variants(method, method.parent)
 
         # Special handling for the serialize/serializable method
         if cpp_method in ["serialize", "serializable"]:
@@ -252,6 +734,19 @@ class PybindWrapper:
             (parser.StaticMethod, instantiator.InstantiatedStaticMethod))
         return_void = method.return_type.is_void()
 
+        # Try to get the function's docstring from the Doxygen XML.
+        # If extract_docstring errors or fails to find a docstring, it just prints a warning.
+        # The incantation repr(...)[1:-1].replace('"', r'\"') replaces newlines with \n
+        # and " with \" so that the docstring can be put into a C++ string on a single line.
+        docstring = ""
+        if self.xml_source != "":
+            with self.timer.phase("docstrings"):
+                docstring = self.xml_parser.extract_docstring(
+                    self.xml_source, cpp_class, cpp_method,
+                    method.args.names())
+            docstring = ', "' + repr(docstring)[1:-1].replace('"',
+                                                             r'\"') + '"'
+
         caller = cpp_class + "::" if not is_method else "self->"
         function_call = ('{opt_return} {caller}{method_name}'
                          '({args_names});'.format(
@@ -261,12 +756,18 @@ class PybindWrapper:
                              args_names=', '.join(args_names),
                          ))
 
-        result = (
+        # The print method writes to the Python stdout, which needs the GIL.
+        call_guard = self._call_guard(method, method.parent) \
+            if method.name != 'print' else ""
+        lambda_return, return_policy = self._return_policy(method) \
+            if is_method else ("", "")
+
+        result = "".join(
             '{prefix}.{cdef}("{py_method}",'
-            '[]({opt_self}{opt_comma}{args_signature_with_names}){{'
+            '[]({opt_self}{opt_comma}{args_signature_with_names}){lambda_return}{{'
             '{function_call}'
             '}}'
-            '{py_args_names}{docstring}){suffix}'.format(
+            '{call_guard}{return_policy}{prepend}{py_args_names}{docstring}){suffix}'.format(
                 prefix=prefix,
                 cdef="def_static" if is_static else "def",
                 py_method=py_method,
@@ -275,26 +776,30 @@ class PybindWrapper:
                 opt_comma=', '
                 if is_method and args_signature_with_names else '',
                 args_signature_with_names=args_signature_with_names,
+                lambda_return=lambda_return,
                 function_call=function_call,
+                call_guard=call_guard,
+                return_policy=return_policy,
+                prepend=self._prepend(method),
                 py_args_names=py_args_names,
                 suffix=suffix,
-                # Try to get the function's docstring from the Doxygen XML.
-                # If extract_docstring errors or fails to find a docstring, it just prints a warning.
-                # The incantation repr(...)[1:-1].replace('"', r'\"') replaces newlines with \n
-                # and " with \" so that the docstring can be put into a C++ string on a single line.
-                docstring=', "' + repr(
-                    self.xml_parser.extract_docstring(
-                        self.xml_source, cpp_class, cpp_method,
-                        method.args.names()))[1:-1].replace('"', r'\"') +
-                '"' if self.xml_source != "" else "",
-            ))
+                docstring=docstring,
+            ) for args_signature_with_names, py_args_names in variants)
 
         # Create __repr__ override
         # We allow all arguments to .print() and let the compiler handle type mismatches.
         if method.name == 'print':
-            result = self._wrap_print(result, method, cpp_class, args_names,
-                                      args_signature_with_names, py_args_names,
-                                      prefix, suffix)
+            result = self._wrap_print(
+                result, method, cpp_class, args_names,
+                self._method_args_signature(method.args, method,
+                                            method.parent),
+                self._py_args_names(method.args, "noconvert"
+                                    in method.attributes), prefix, suffix)
+
+        result += self._wrap_batch(
+            method, py_method, caller + cpp_method,
+            f"{cpp_class}* self" if is_method else "",
+            "def_static" if is_static else "def", prefix, suffix)
 
         return result
 
@@ -303,14 +808,11 @@ class PybindWrapper:
                             cpp_class,
                             prefix='\n' + ' ' * 8,
                             suffix=''):
-        res = ""
-        for method in methods:
-            res += self._wrap_dunder(method=method,
-                                     cpp_class=cpp_class,
-                                     prefix=prefix,
-                                     suffix=suffix)
-
-        return res
+        return "".join(
+            self._wrap_dunder(method=method,
+                              cpp_class=cpp_class,
+                              prefix=prefix,
+                              suffix=suffix) for method in methods)
 
     def wrap_methods(self,
                      methods,
@@ -320,8 +822,8 @@ class PybindWrapper:
         """
         Wrap all the methods in the `cpp_class`.
         """
-        res = ""
-        for method in methods:
+        res = []
+        for method in self._order_overloads(methods, cpp_class + "::"):
 
             # To avoid type confusion for insert
             if method.name == 'insert' and cpp_class == 'gtsam::Values':
@@ -330,20 +832,22 @@ class PybindWrapper:
                 # inserting non-wrapped value types
                 if type_list[0].strip() == 'size_t':
                     method_suffix = '_' + name_list[1].strip()
-                    res += self._wrap_method(method=method,
-                                             cpp_class=cpp_class,
-                                             prefix=prefix,
-                                             suffix=suffix,
-                                             method_suffix=method_suffix)
-
-            res += self._wrap_method(
-                method=method,
-                cpp_class=cpp_class,
-                prefix=prefix,
-                suffix=suffix,
-            )
+                    res.append(
+                        self._wrap_method(method=method,
+                                          cpp_class=cpp_class,
+                                          prefix=prefix,
+                                          suffix=suffix,
+                                          method_suffix=method_suffix))
+
+            res.append(
+                self._wrap_method(
+                    method=method,
+                    cpp_class=cpp_class,
+                    prefix=prefix,
+                    suffix=suffix,
+                ))
 
-        return res
+        return "".join(res)
 
     def wrap_variable(self,
                       namespace,
@@ -368,35 +872,33 @@ class PybindWrapper:
 
     def wrap_properties(self, properties, cpp_class, prefix='\n' + ' ' * 8):
         """Wrap all the properties in the `cpp_class`."""
-        res = ""
-        for prop in properties:
-            res += ('{prefix}.def_{property}("{property_name}", '
-                    '&{cpp_class}::{property_name})'.format(
-                        prefix=prefix,
-                        property="readonly"
-                        if prop.ctype.is_const else "readwrite",
-                        cpp_class=cpp_class,
-                        property_name=prop.name,
-                    ))
-        return res
+        return "".join('{prefix}.def_{property}("{property_name}", '
+                       '&{cpp_class}::{property_name})'.format(
+                           prefix=prefix,
+                           property="readonly"
+                           if prop.ctype.is_const else "readwrite",
+                           cpp_class=cpp_class,
+                           property_name=prop.name,
+                       ) for prop in properties)
 
     def wrap_operators(self, operators, cpp_class, prefix='\n' + ' ' * 8):
         """Wrap all the overloaded operators in the `cpp_class`."""
-        res = ""
+        res = []
         template = "{prefix}.def({{0}})".format(prefix=prefix)
         for op in operators:
             if op.operator == "[]":  # __getitem__
-                res += "{prefix}.def(\"__getitem__\", &{cpp_class}::operator[])".format(
-                    prefix=prefix, cpp_class=cpp_class)
+                res.append("{prefix}.def(\"__getitem__\", &{cpp_class}::operator[])".format(
+                    prefix=prefix, cpp_class=cpp_class))
             elif op.operator == "()":  # __call__
-                res += "{prefix}.def(\"__call__\", &{cpp_class}::operator())".format(
-                    prefix=prefix, cpp_class=cpp_class)
+                res.append("{prefix}.def(\"__call__\", &{cpp_class}::operator())".format(
+                    prefix=prefix, cpp_class=cpp_class))
             elif op.is_unary:
-                res += template.format("{0}py::self".format(op.operator))
+                res.append(template.format("{0}py::self".format(op.operator)))
             else:
-                res += template.format("py::self {0} py::self".format(
-                    op.operator))
-        return res
+                res.append(
+                    template.format("py::self {0} py::self".format(
+                        op.operator)))
+        return "".join(res)
 
     def wrap_enum(self, enum, class_name='', module=None, prefix=' ' * 4):
         """
@@ -415,32 +917,39 @@ class PybindWrapper:
             # If class_name is provided, add that as the namespace
             cpp_class = class_name + "::" + cpp_class
 
-        res = '{prefix}py::enum_<{cpp_class}>({module}, "{enum.name}", py::arithmetic())'.format(
-            prefix=prefix, module=module, enum=enum, cpp_class=cpp_class)
+        res = [
+            '{prefix}py::enum_<{cpp_class}>({module}, "{enum.name}", py::arithmetic())'.format(
+                prefix=prefix, module=module, enum=enum, cpp_class=cpp_class)
+        ]
         for enumerator in enum.enumerators:
-            res += '\n{prefix}    .value("{enumerator.name}", {cpp_class}::{enumerator.name})'.format(
-                prefix=prefix, enumerator=enumerator, cpp_class=cpp_class)
-        res += ";\n\n"
-        return res
+            res.append('\n{prefix}    .value("{enumerator.name}", {cpp_class}::{enumerator.name})'.format(
+                prefix=prefix, enumerator=enumerator, cpp_class=cpp_class))
+        res.append(";\n\n")
+        return "".join(res)
 
     def wrap_enums(self, enums, instantiated_class, prefix=' ' * 4):
         """Wrap multiple enums defined in a class."""
         cpp_class = instantiated_class.to_cpp()
         module_var = instantiated_class.name.lower()
-        res = ''
-
-        for enum in enums:
-            res += "\n" + self.wrap_enum(
-                enum, class_name=cpp_class, module=module_var, prefix=prefix)
-        return res
+        return "".join("\n" + self.wrap_enum(
+            enum, class_name=cpp_class, module=module_var, prefix=prefix)
+                       for enum in enums)
 
     def wrap_instantiated_class(
             self, instantiated_class: instantiator.InstantiatedClass):
         """Wrap the class."""
+        out = []
+        self._emit_instantiated_class(instantiated_class, out)
+        return "".join(out)
+
+    def _emit_instantiated_class(
+            self, instantiated_class: instantiator.InstantiatedClass,
+            out: List[str]):
+        """Wrap the class, appending the generated code to `out`."""
         module_var = self._gen_module_var(instantiated_class.namespaces())
         cpp_class = instantiated_class.to_cpp()
         if cpp_class in self.ignore_classes:
-            return ""
+            return
         if instantiated_class.parent_class:
             class_parent = "{instantiated_class.parent_class}, ".format(
                 instantiated_class=instantiated_class)
@@ -471,25 +980,19 @@ class PybindWrapper:
                      class_parent=class_parent,
                      module_var=module_var)
 
-        return ('{class_declaration}'
-                '{wrapped_ctors}'
-                '{wrapped_methods}'
-                '{wrapped_static_methods}'
-                '{wrapped_dunder_methods}'
-                '{wrapped_properties}'
-                '{wrapped_operators};\n'.format(
-                    class_declaration=class_declaration,
-                    wrapped_ctors=self.wrap_ctors(instantiated_class),
-                    wrapped_methods=self.wrap_methods(
-                        instantiated_class.methods, cpp_class),
-                    wrapped_static_methods=self.wrap_methods(
-                        instantiated_class.static_methods, cpp_class),
-                    wrapped_dunder_methods=self.wrap_dunder_methods(
-                        instantiated_class.dunder_methods, cpp_class),
-                    wrapped_properties=self.wrap_properties(
-                        instantiated_class.properties, cpp_class),
-                    wrapped_operators=self.wrap_operators(
-                        instantiated_class.operators, cpp_class)))
+        out.append(class_declaration)
+        out.append(self.wrap_ctors(instantiated_class))
+        out.append(self.wrap_methods(instantiated_class.methods, cpp_class))
+        out.append(
+            self.wrap_methods(instantiated_class.static_methods, cpp_class))
+        out.append(
+            self.wrap_dunder_methods(instantiated_class.dunder_methods,
+                                     cpp_class))
+        out.append(
+            self.wrap_properties(instantiated_class.properties, cpp_class))
+        out.append(
+            self.wrap_operators(instantiated_class.operators, cpp_class))
+        out.append(";\n")
 
     def wrap_instantiated_declaration(
             self, instantiated_decl: instantiator.InstantiatedDeclaration):
@@ -541,8 +1044,9 @@ class PybindWrapper:
         """
         Wrap all the global functions.
         """
-        res = ""
-        for function in functions:
+        res = []
+        scope = namespace + "::" if namespace else ""
+        for function in self._order_overloads(functions, scope):
 
             function_name = function.name
 
@@ -556,8 +1060,6 @@ class PybindWrapper:
             is_static = isinstance(function, parser.StaticMethod)
             return_void = function.return_type.is_void()
             args_names = function.args.names()
-            py_args_names = self._py_args_names(function.args)
-            args_signature = self._method_args_signature(function.args)
 
             caller = namespace + "::"
             function_call = ('{opt_return} {caller}{function_name}'
@@ -569,22 +1071,31 @@ class PybindWrapper:
                                  args_names=', '.join(args_names),
                              ))
 
-            ret = ('{prefix}.{cdef}("{function_name}",'
-                   '[]({args_signature}){{'
-                   '{function_call}'
-                   '}}'
-                   '{py_args_names}){suffix}'.format(
-                       prefix=prefix,
-                       cdef="def_static" if is_static else "def",
-                       function_name=function_name,
-                       args_signature=args_signature,
-                       function_call=function_call,
-                       py_args_names=py_args_names,
-                       suffix=suffix))
-
-            res += ret
-
-        return res
+            ret = "".join(
+                '{prefix}.{cdef}("{function_name}",'
+                '[]({args_signature}){{'
+                '{function_call}'
+                '}}'
+                '{call_guard}{prepend}{py_args_names}){suffix}'.format(
+                    prefix=prefix,
+                    cdef="def_static" if is_static else "def",
+                    function_name=function_name,
+                    args_signature=args_signature,
+                    function_call=function_call,
+                    call_guard=self._call_guard(function),
+                    prepend=self._prepend(function),
+                    py_args_names=py_args_names,
+                    suffix=suffix)
+                for args_signature, py_args_names in self._arg_variants(
+                    function))
+            ret += self._wrap_batch(function, function_name,
+                                    caller + cpp_method, "",
+                                    "def_static" if is_static else "def",
+                                    prefix, suffix)
+
+            res.append(ret)
+
+        return "".join(res)
 
     def _partial_match(self, namespaces1, namespaces2):
         for i in range(min(len(namespaces1), len(namespaces2))):
@@ -608,12 +1119,26 @@ class PybindWrapper:
 
     def wrap_namespace(self, namespace):
         """Wrap the complete `namespace`."""
-        wrapped = ""
-        includes = ""
+        wrapped, includes = [], []
+        self._emit_namespace(namespace, wrapped, includes)
+        return "".join(wrapped), "".join(includes)
+
+    def _emit_namespace(self,
+                        namespace,
+                        wrapped: List[str],
+                        includes: List[str],
+                        units: List[_WrapUnit] = None):
+        """
+        Wrap the complete `namespace`, appending the generated code to
+        `wrapped` and the include statements to `includes`.
 
+        If a list of `units` is given, the code of the namespace elements is
+        appended to a new unit per element instead, and only the definitions
+        of the submodules to `wrapped`.
+        """
         namespaces = namespace.full_namespaces()
         if not self._partial_match(namespaces, self.top_module_namespaces):
-            return "", ""
+            return
 
         if len(namespaces) < len(self.top_module_namespaces):
             for element in namespace.content:
@@ -621,20 +1146,14 @@ class PybindWrapper:
                     include = "{}\n".format(element)
                     # replace the angle brackets with quotes
                     include = include.replace('<', '"').replace('>', '"')
-                    includes += include
+                    includes.append(include)
                 if isinstance(element, parser.Namespace):
-                    (
-                        wrapped_namespace,
-                        includes_namespace,
-                    ) = self.wrap_namespace(  # noqa
-                        element)
-                    wrapped += wrapped_namespace
-                    includes += includes_namespace
+                    self._emit_namespace(element, wrapped, includes, units)
         else:
             module_var = self._gen_module_var(namespaces)
 
             if len(namespaces) > len(self.top_module_namespaces):
-                wrapped += (
+                wrapped.append(
                     ' ' * 4 + 'pybind11::module {module_var} = '
                     '{parent_module_var}.def_submodule("{namespace}", "'
                     '{namespace} submodule");\n'.format(
@@ -650,29 +1169,35 @@ class PybindWrapper:
                     include = "{}\n".format(element)
                     # replace the angle brackets with quotes
                     include = include.replace('<', '"').replace('>', '"')
-                    includes += include
+                    includes.append(include)
                 elif isinstance(element, parser.Namespace):
-                    wrapped_namespace, includes_namespace = self.wrap_namespace(
-                        element)
-                    wrapped += wrapped_namespace
-                    includes += includes_namespace
+                    self._emit_namespace(element, wrapped, includes, units)
 
                 elif isinstance(element, instantiator.InstantiatedClass):
-                    wrapped += self.wrap_instantiated_class(element)
-                    wrapped += self.wrap_enums(element.enums, element)
+                    out = self._unit_chunks(wrapped, units, namespaces,
+                                            element)
+                    self._emit_instantiated_class(element, out)
+                    out.append(self.wrap_enums(element.enums, element))
 
                 elif isinstance(element, instantiator.InstantiatedDeclaration):
-                    wrapped += self.wrap_instantiated_declaration(element)
+                    out = self._unit_chunks(wrapped, units, namespaces,
+                                            element)
+                    out.append(self.wrap_instantiated_declaration(element))
 
                 elif isinstance(element, parser.Variable):
                     variable_namespace = self._add_namespaces('', namespaces)
-                    wrapped += self.wrap_variable(namespace=variable_namespace,
-                                                  module_var=module_var,
-                                                  variable=element,
-                                                  prefix='\n' + ' ' * 4)
+                    out = self._unit_chunks(wrapped, units, namespaces,
+                                            element)
+                    out.append(
+                        self.wrap_variable(namespace=variable_namespace,
+                                           module_var=module_var,
+                                           variable=element,
+                                           prefix='\n' + ' ' * 4))
 
                 elif isinstance(element, parser.Enum):
-                    wrapped += self.wrap_enum(element)
+                    out = self._unit_chunks(wrapped, units, namespaces,
+                                            element)
+                    out.append(self.wrap_enum(element))
 
             # Global functions.
             all_funcs = [
@@ -680,14 +1205,111 @@ class PybindWrapper:
                 if isinstance(func, (parser.GlobalFunction,
                                      instantiator.InstantiatedGlobalFunction))
             ]
-            wrapped += self.wrap_functions(
-                all_funcs,
-                self._add_namespaces('', namespaces)[:-2],
-                prefix='\n' + ' ' * 4 + module_var,
-                suffix=';',
-            )
+            out = self._unit_chunks(wrapped, units, namespaces, None)
+            out.append(
+                self.wrap_functions(
+                    all_funcs,
+                    self._add_namespaces('', namespaces)[:-2],
+                    prefix='\n' + ' ' * 4 + module_var,
+                    suffix=';',
+                ))
+
+    def _unit_chunks(self, wrapped, units, namespaces, element):
+        """
+        Get the list to append the code of the namespace `element` to, which
+        is a new unit if the code of the module is split into `units`.
+        """
+        if units is None:
+            return wrapped
+        unit = _WrapUnit(namespaces, element, [])
+        units.append(unit)
+        return unit.chunks
 
-        return wrapped, includes
+    def _order_units(self, units):
+        """
+        Order the `units` so that the base classes are registered before the
+        classes derived from them, keeping the order of the other units.
+        """
+        indices = {}
+        for index, unit in enumerate(units):
+            if isinstance(unit.element,
+                          (instantiator.InstantiatedClass,
+                           instantiator.InstantiatedDeclaration)):
+                indices.setdefault(_canonical_name(unit.element.to_cpp()),
+                                   index)
+
+        def parent_index(element, parent_class):
+            # Look the base class up like C++ does, from the namespace of the
+            # derived class outwards, since its name may be relative to it.
+            namespaces = [
+                name for name in getattr(element, "namespaces", list)() if name
+            ]
+            parent_name = _canonical_name(str(parent_class))
+            for depth in range(len(namespaces), -1, -1):
+                name = "::".join(namespaces[:depth] + [parent_name])
+                if name in indices:
+                    return indices[name]
+            return None
+
+        ordered = []
+        visited = set()
+
+        def visit(index):
+            if index in visited:
+                return
+            visited.add(index)
+            element = units[index].element
+            parent_class = getattr(element, "parent_class", None)
+            if parent_class:
+                base_index = parent_index(element, parent_class)
+                if base_index is not None:
+                    visit(base_index)
+            ordered.append(units[index])
+
+        for index in range(len(units)):
+            visit(index)
+        return ordered
+
+    def _split_units(self, units, shards):
+        """
+        Split the ordered `units` into `shards` consecutive lists of
+        about the same amount of code.
+        """
+        sizes = [sum(map(len, unit.chunks)) for unit in units]
+        total = sum(sizes)
+        shard_units = [[] for _ in range(shards)]
+        offset = 0
+        for unit, size in zip(units, sizes):
+            index = min(shards - 1, offset * shards // total) if total else 0
+            shard_units[index].append(unit)
+            offset += size
+        return shard_units
+
+    def _module_handles(self, units):
+        """
+        Get the definitions of the submodules used by the `units` of a shard,
+        which are looked up in the module since they are defined by it.
+        """
+        handles = []
+        defined = set()
+        for unit in units:
+            for depth in range(
+                    len(self.top_module_namespaces) + 1,
+                    len(unit.namespaces) + 1):
+                namespaces = unit.namespaces[:depth]
+                module_var = self._gen_module_var(namespaces)
+                if module_var in defined:
+                    continue
+                defined.add(module_var)
+                handles.append(
+                    ' ' * 4 + 'pybind11::module {module_var} = '
+                    '{parent_module_var}.attr("{namespace}")'
+                    '.cast<pybind11::module>();\n'.format(
+                        module_var=module_var,
+                        parent_module_var=self._gen_module_var(
+                            namespaces[:-1]),
+                        namespace=namespaces[-1]))
+        return handles
 
     def wrap_file(self, content, module_name=None, submodules=None):
         """
@@ -698,12 +1320,70 @@ class PybindWrapper:
             module_name: The name of the module.
             submodules: List of other interface file names that should be linked to.
         """
+        return "".join(
+            self._wrap_module(content, module_name, submodules)[0])
+
+    def write_file(self, f, content, module_name=None, submodules=None):
+        """
+        Wrap the code in the interface file and write it to the file object
+        `f` chunk by chunk, without building the complete generated code as
+        a single string like `wrap_file`.
+
+        Args:
+            f: The file object to write the generated code to.
+            content: The contents of the interface file.
+            module_name: The name of the module.
+            submodules: List of other interface file names that should be linked to.
+        """
+        chunks = self._wrap_module(content, module_name, submodules)[0]
+        with self.timer.phase("write"):
+            f.writelines(chunks)
+
+    def _wrap_module(self, content, module_name, submodules, shards=1):
+        """
+        Wrap the code in the interface file into a list of the chunks of each
+        generated file, see `_emit_module`.
+        """
         # Parse the contents of the interface file
-        module = parser.Module.parseString(content)
+        with self.timer.phase("parse"):
+            module = parser.Module.parseString(
+                content,
+                cache_dir=self.cache_dir,
+                packrat_cache_size=self.packrat_cache_size,
+                packrat_mode=self.packrat_mode,
+                packrat_stats=self.packrat_stats)
         # Instantiate all templates
-        module = instantiator.instantiate_namespace(module)
+        with self.timer.phase("instantiate"):
+            module = instantiator.instantiate_namespace(module)
+
+        with self.timer.phase("emit"):
+            return self._emit_module(module, module_name, submodules,
+                                     shards)
 
-        wrapped_namespace, includes = self.wrap_namespace(module)
+    def _emit_module(self, module, module_name, submodules, shards=1):
+        """
+        Generate the code for the instantiated module of `wrap_file`.
+
+        Returns the code of each generated file as a list of chunks. The
+        wrapped namespace is not joined but spliced into the formatted module
+        template, since it is most of the generated code.
+
+        With several `shards`, the module file is followed by the files of
+        the shards, each defining a `init_<module_name>_<index>` function
+        which wraps a part of the classes. The module defines the submodules
+        and calls the functions of the shards in order, with the base classes
+        in earlier shards than the classes derived from them.
+        """
+        if shards > 1 and ("{module_def}" not in self.module_template
+                           or "{submodules}" not in self.module_template):
+            raise ValueError(
+                "The module template needs the {module_def} and {submodules} "
+                "fields to shard the module.")
+
+        wrapped_namespace, includes = [], []
+        units = [] if shards > 1 else None
+        self._emit_namespace(module, wrapped_namespace, includes, units)
+        includes = "".join(includes)
 
         if self.use_boost_serialization:
             includes += "#include <boost/serialization/export.hpp>"
@@ -739,15 +1419,55 @@ class PybindWrapper:
             module_def = "void {0}(py::module_ &m_)".format(module_name)
             submodules = []
 
-        return self.module_template.format(
+        shard_units = []
+        if units is not None:
+            units = [unit for unit in units if any(unit.chunks)]
+            shard_units = self._split_units(self._order_units(units), shards)
+            for index in range(shards):
+                init = "init_{0}_{1}".format(module_name, index)
+                submodules.append("void {0}(py::module_ &);".format(init))
+                wrapped_namespace.append(' ' * 4 + "{0}(m_);\n".format(init))
+
+        head, *tails = self.module_template.format(
             module_def=module_def,
             module_name=module_name,
             includes=includes,
-            wrapped_namespace=wrapped_namespace,
+            wrapped_namespace=_WRAPPED_NAMESPACE,
             boost_class_export=boost_class_export,
             submodules="\n".join(submodules),
             submodules_init="\n".join(submodules_init),
-        )
+        ).split(_WRAPPED_NAMESPACE)
+
+        chunks = [head]
+        for tail in tails:
+            chunks.extend(wrapped_namespace)
+            chunks.append(tail)
+        files = [chunks]
+
+        if shard_units:
+            # The shards have the includes and the preamble of the module,
+            # i.e. the part of the template before the module definition.
+            # The classes are exported for serialization only once, in the
+            # module.
+            template_head = self.module_template[:self.module_template.rfind(
+                "\n", 0, self.module_template.index("{module_def}")) + 1]
+            shard_head = template_head.format(module_name=module_name,
+                                              includes=includes,
+                                              boost_class_export="",
+                                              submodules="")
+            for index, units_of_shard in enumerate(shard_units):
+                chunks = [
+                    shard_head,
+                    "void init_{0}_{1}(py::module_ &m_) {{\n".format(
+                        module_name, index)
+                ]
+                chunks.extend(self._module_handles(units_of_shard))
+                for unit in units_of_shard:
+                    chunks.extend(unit.chunks)
+                chunks.append("\n}\n")
+                files.append(chunks)
+
+        return files
 
     def wrap_submodule(self, source):
         """
@@ -764,15 +1484,49 @@ class PybindWrapper:
         filename = Path(source).name
         module_name = Path(source).stem
 
-        # Read in the complete interface (.i) file
-        with open(source, "r", encoding="UTF-8") as f:
-            content = f.read()
-        # Wrap the read-in content
-        cc_content = self.wrap_file(content, module_name=module_name)
+        with self.timer.phase(filename):
+            # Read in the complete interface (.i) file
+            with open(source, "r", encoding="UTF-8") as f:
+                content = f.read()
+            # Wrap the read-in content
+            files = self._wrap_module(content, module_name, None,
+                                      self.shards)
+
+            # Generate the C++ code which Pybind11 will use.
+            self._write_files(filename.replace(".i", ".cpp"), files)
+
+    def wrap_submodules(self, sources, jobs=1):
+        """
+        Wrap several submodule files in a single invocation, see
+        `wrap_submodule`.
+
+        The submodules are parsed and emitted concurrently by a pool of
+        worker processes, and the generated files are identical to the ones
+        of wrapping each submodule on its own.
 
-        # Generate the C++ code which Pybind11 will use.
-        with open(filename.replace(".i", ".cpp"), "w", encoding="UTF-8") as f:
-            f.write(cc_content)
+        Args:
+            sources: List of interface files which form the submodules.
+            jobs: The number of worker processes, or None for one per CPU.
+                With a single job, the submodules are wrapped in this process.
+        """
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        jobs = min(jobs, len(sources))
+
+        if jobs <= 1:
+            for source in sources:
+                self.wrap_submodule(source)
+            return
+
+        # Start with the largest files, which take the longest to wrap.
+        sources = sorted(sources, key=os.path.getsize, reverse=True)
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            for records, writer, stats, diagnostics in executor.map(
+                    _wrap_submodule_worker, [self] * len(sources), sources):
+                self.timer.merge(records)
+                self.writer.merge(writer)
+                self.packrat_stats.merge(stats)
+                self.overload_diagnostics += diagnostics
 
     def wrap(self, sources, main_module_name):
         """
@@ -791,12 +1545,39 @@ class PybindWrapper:
             module_name = Path(source).stem
             submodules.append(module_name)
 
-        with open(main_module, "r", encoding="UTF-8") as f:
-            content = f.read()
-        cc_content = self.wrap_file(content,
-                                    module_name=self.module_name,
-                                    submodules=submodules)
+        with self.timer.phase(Path(main_module).name):
+            with open(main_module, "r", encoding="UTF-8") as f:
+                content = f.read()
+            files = self._wrap_module(content, self.module_name, submodules,
+                                      self.shards)
+
+            # Generate the C++ code which Pybind11 will use.
+            self._write_files(main_module_name, files)
+
+    def _write_files(self, filename, files):
+        """
+        Write the chunks of the generated `files` to `filename`
+        and the files of its shards.
+        """
+        with self.timer.phase("write"):
+            for index, chunks in enumerate(files):
+                path = filename if index == 0 else shard_filename(
+                    filename, index - 1)
+                self.writer.write(path, chunks)
+
 
-        # Generate the C++ code which Pybind11 will use.
-        with open(main_module_name, "w", encoding="UTF-8") as f:
-            f.write(cc_content)
+def _wrap_submodule_worker(wrapper, source):
+    """
+    Wrap the submodule `source` in a worker process of `wrap_submodules`.
+
+    Returns the measurements of the wrapping phases, the writer of the
+    generated files, the statistics of the packrat cache and the diagnostics
+    of the overloads.
+    """
+    wrapper.timer = PhaseTimer(enabled=wrapper.timer.enabled)
+    wrapper.writer = FileWriter()
+    wrapper.packrat_stats = parser.PackratStats()
+    wrapper.overload_diagnostics = []
+    wrapper.wrap_submodule(source)
+    return (wrapper.timer.records, wrapper.writer, wrapper.packrat_stats,
+            wrapper.overload_diagnostics)
@@ -0,0 +1,276 @@
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Long-lived server which runs the wrapping scripts for `scripts/wrap_client.py`,
+so that the interpreter startup, the imports, the interface grammar and the
+caches of the parsed interface files and Doxygen XML files are amortized over
+many wrapping commands.
+
+The server listens on a Unix socket. A request is a line with the JSON object
+`{"script": ..., "argv": [...], "cwd": ..., "env": {...}}`, and the server
+runs the script as if it were invoked in `cwd` with the arguments `argv` and
+the environment variables `env`, which are optional. The caches which depend
+on the settings of a run are cleared after it, while the parsed interface
+files and Doxygen XML files are kept for the next requests. The response is a
+line with the JSON object `{"returncode": ..., "stdout": ..., "stderr": ...}`,
+or `{"error": ...}` if the server refuses to run the script, in which case
+the client runs it by itself. The requests are handled one at a time.
+
+E.g.
+```
+python -m gtwrap.server --socket build/gtwrap.sock \
+    --script scripts/pybind_wrap.py
+```
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import os.path as osp
+import runpy
+import socketserver
+import sys
+import traceback
+from typing import Dict, Iterable, List, Tuple
+
+from pyparsing import ParserElement  # type: ignore
+
+from gtwrap.interface_parser.cache import ParseCache
+from gtwrap.interface_parser.packrat import reset_packrat
+from gtwrap.template_instantiator.helpers import clear_instantiation_caches
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+PACKAGE_DIR = osp.dirname(osp.abspath(__file__))
+
+
+def package_version() -> Tuple[Tuple[str, int], ...]:
+    """Get the modification times of the sources of the gtwrap package."""
+    version = []
+    for directory, _, filenames in os.walk(PACKAGE_DIR):
+        for filename in sorted(filenames):
+            if filename.endswith(".py"):
+                path = osp.join(directory, filename)
+                version.append((path, os.stat(path).st_mtime_ns))
+    return tuple(sorted(version))
+
+
+def _reset_caches():
+    """
+    Clear the caches of a run which would otherwise carry its settings over
+    to the next run or grow without bound, i.e. the packrat cache of the
+    parser, whose size and mode are set by the wrapping scripts, and the
+    instantiation caches.
+    """
+    ParserElement.reset_cache()
+    reset_packrat()
+    clear_instantiation_caches()
+
+
+def run_script(script: str,
+               argv: List[str],
+               cwd: str,
+               env: Dict[str, str] = None) -> Dict[str, object]:
+    """
+    Run the wrapping `script` in this process as if it were invoked in `cwd`
+    with the command line arguments `argv` and the environment variables
+    `env`, or the ones of this process if None.
+
+    Like the interpreter, the directories in the `PYTHONPATH` of `env` are
+    added to the module search path for the run. The modules which are
+    already imported, e.g. gtwrap, are not imported again.
+
+    Returns the exit code and the captured standard output and error.
+    """
+    stdout, stderr = io.StringIO(), io.StringIO()
+    returncode = 0
+    old_argv, old_cwd = sys.argv, os.getcwd()
+    old_path, old_environ = list(sys.path), dict(os.environ)
+    try:
+        os.chdir(cwd)
+        sys.argv = [script] + list(argv)
+        if env is not None:
+            os.environ.clear()
+            os.environ.update(env)
+            sys.path[:0] = [
+                osp.join(cwd, path)
+                for path in env.get("PYTHONPATH", "").split(os.pathsep)
+                if path
+            ]
+        with contextlib.redirect_stdout(stdout), \
+                contextlib.redirect_stderr(stderr):
+            try:
+                runpy.run_path(script, run_name="__main__")
+            except SystemExit as e:
+                if e.code is None or isinstance(e.code, int):
+                    returncode = e.code or 0
+                else:
+                    print(e.code, file=sys.stderr)
+                    returncode = 1
+            except Exception:  # pylint: disable=broad-except
+                traceback.print_exc()
+                returncode = 1
+    finally:
+        sys.argv = old_argv
+        os.chdir(old_cwd)
+        sys.path[:] = old_path
+        if env is not None:
+            os.environ.clear()
+            os.environ.update(old_environ)
+        _reset_caches()
+
+    return {
+        "returncode": returncode,
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+    }
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handle a single wrapping request, see the module documentation."""
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            # The client disconnected without a request.
+            return
+        try:
+            request = json.loads(line)
+            script = osp.realpath(request["script"])
+            argv = [str(arg) for arg in request["argv"]]
+            cwd = str(request["cwd"])
+            env = request.get("env")
+            if env is not None:
+                env = {str(name): str(value) for name, value in env.items()}
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            response = {"error": f"invalid request: {e}"}
+        else:
+            response = self.server.run(script, argv, cwd, env)
+        self.wfile.write(json.dumps(response).encode("UTF-8") + b"\n")
+
+
+class WrapServer(socketserver.UnixStreamServer):
+    """
+    Server which runs the wrapping `scripts` on request.
+
+    Only the given scripts are run, and the socket is only accessible to the
+    user running the server. The server stops after `idle_timeout` seconds
+    without requests, and when the sources of the gtwrap package change,
+    since it would keep running the old code.
+
+    Args:
+        socket_path: The path of the Unix socket to listen on.
+        scripts: The wrapping scripts which may be run.
+        idle_timeout: Seconds without requests after which the server stops,
+            or None to never stop.
+    """
+
+    def __init__(self,
+                 socket_path: str,
+                 scripts: Iterable[str],
+                 idle_timeout: float = None):
+        self.scripts = {osp.realpath(script) for script in scripts}
+        self.timeout = idle_timeout
+        self.version = package_version()
+        self.running = True
+
+        # Only allow the current user to connect, since the server runs code.
+        old_umask = os.umask(0o077)
+        try:
+            super().__init__(socket_path, _RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def run(self,
+            script: str,
+            argv: List[str],
+            cwd: str,
+            env: Dict[str, str] = None) -> Dict[str, object]:
+        """Run the wrapping `script` for a request, if allowed."""
+        if script not in self.scripts:
+            return {"error": f"the server does not run {script}"}
+        if package_version() != self.version:
+            self.running = False
+            return {"error": "the gtwrap package changed, restarting"}
+        return run_script(script, argv, cwd, env)
+
+    def handle_timeout(self):
+        self.running = False
+
+    def serve(self):
+        """Handle the requests until the server is stopped."""
+        while self.running:
+            self.handle_request()
+
+    def server_close(self):
+        super().server_close()
+        with contextlib.suppress(OSError):
+            os.remove(self.server_address)
+
+
+def serve(socket_path: str,
+          scripts: Iterable[str],
+          idle_timeout: float = None) -> bool:
+    """
+    Run a wrap server on `socket_path` until it is stopped.
+
+    Returns False without serving if another server is already running on
+    the same socket.
+    """
+    lock_file = open(socket_path + ".lock", "w", encoding="UTF-8")  # pylint: disable=consider-using-with
+    with lock_file:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return False
+
+        # Remove the socket of a server which did not stop cleanly.
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(socket_path)
+
+        # Keep the parsed interface files in memory across the requests.
+        ParseCache.enable_memory()
+
+        server = WrapServer(socket_path, scripts, idle_timeout)
+        try:
+            server.serve()
+        finally:
+            server.server_close()
+    return True
+
+
+def main():
+    """Main runner."""
+    arg_parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    arg_parser.add_argument("--socket",
+                            type=str,
+                            required=True,
+                            help="Path of the Unix socket to listen on")
+    arg_parser.add_argument("--script",
+                            type=str,
+                            action="append",
+                            required=True,
+                            help="A wrapping script which the server may run")
+    arg_parser.add_argument("--idle_timeout",
+                            type=float,
+                            default=1800,
+                            help="Seconds without requests after which the "
+                            "server stops, 0 to never stop")
+    args = arg_parser.parse_args()
+
+    serve(args.socket, args.script, args.idle_timeout or None)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,10 +12,47 @@ from gtwrap.template_instantiator.method import (InstantiatedMethod,
                                                  InstantiatedStaticMethod)
 
 
+def _lazy_members(name: str, doc: str):
+    """
+    Property for a list of members of an `InstantiatedClass`, which are
+    instantiated by its `instantiate_<name>` method when first accessed.
+    """
+
+    def getter(self):
+        members = self._members.get(name)
+        if members is None:
+            members = getattr(self, f"instantiate_{name}")(self._typenames)
+            for member in members:
+                member.parent = self
+            self._members[name] = members
+        return members
+
+    def setter(self, members):
+        self._members[name] = members
+
+    return property(getter, setter, doc=doc)
+
+
 class InstantiatedClass(parser.Class):
     """
     Instantiate the class defined in the interface file.
+
+    The constructors, methods, static methods, properties and operators are
+    only instantiated when they are first accessed, so that the classes
+    which are not wrapped, e.g. ignored classes or classes outside of the
+    wrapped namespaces, cost little.
     """
+    # The names of the members which are instantiated lazily.
+    LAZY_MEMBERS = ("ctors", "static_methods", "properties", "operators",
+                    "methods")
+
+    ctors = _lazy_members("ctors", "The instantiated constructors.")
+    static_methods = _lazy_members("static_methods",
+                                   "The instantiated static methods.")
+    properties = _lazy_members("properties", "The instantiated properties.")
+    operators = _lazy_members("operators",
+                              "The instantiated operator overloads.")
+    methods = _lazy_members("methods", "The instantiated instance methods.")
 
     def __init__(self, original: parser.Class, instantiations=(), new_name=''):
         """
@@ -28,6 +65,7 @@ class InstantiatedClass(parser.Class):
         self.template = None
         self.is_virtual = original.is_virtual
         self.parent = original.parent
+        self.attributes = original.attributes
 
         # If the class is templated, check if the number of provided instantiations
         # match the number of templates, else it's only a partial instantiation which is bad.
@@ -42,39 +80,35 @@ class InstantiatedClass(parser.Class):
         # Check for typenames if templated.
         # By passing in typenames, we can gracefully handle both templated and non-templated classes
         # This will allow the `This` keyword to be used in both templated and non-templated classes.
-        typenames = self.original.template.typenames if self.original.template else []
+        self._typenames = self.original.template.typenames if self.original.template else []
+
+        # The members which have been instantiated, by their attribute name.
+        self._members = {}
 
-        # Instantiate the parent class, constructors, static methods, properties, respectively.
-        self.parent_class = self.instantiate_parent_class(typenames)
-        self.ctors = self.instantiate_ctors(typenames)
-        self.static_methods = self.instantiate_static_methods(typenames)
-        self.properties = self.instantiate_properties(typenames)
+        # Make sure ctors' names and class name are the same. The instantiated
+        # ctors are named after the instantiated class, so check the names of
+        # the original ctors, without instantiating them.
+        for ctor in original.ctors:
+            if ctor.name != original.name:
+                raise ValueError("Error in constructor name! {} != {}".format(
+                    ctor.name, original.name))
 
-        # Instantiate all operator overloads
-        self.operators = self.instantiate_operators(typenames)
+        # Instantiate the parent class.
+        self.parent_class = self.instantiate_parent_class(self._typenames)
 
         # Set enums
         self.enums = original.enums
 
-        # Instantiate all instance methods
-        self.methods = self.instantiate_methods(typenames)
-
+        # The other members are set lazily, so `parser.Class.__init__`,
+        # which sets the parents of the members, is not called.
         self.dunder_methods = original.dunder_methods
+        for dunder_method in self.dunder_methods:
+            dunder_method.parent = self
 
-        super().__init__(
-            self.template,
-            self.is_virtual,
-            self.name,
-            [self.parent_class],
-            self.ctors,
-            self.methods,
-            self.static_methods,
-            self.dunder_methods,
-            self.properties,
-            self.operators,
-            self.enums,
-            parent=self.parent,
-        )
+    def instantiate_members(self):
+        """Instantiate all the members now, if they are not yet."""
+        for name in self.LAZY_MEMBERS:
+            getattr(self, name)
 
     def __repr__(self):
         return "{virtual}Class {cpp_class} : {parent_class}\n"\
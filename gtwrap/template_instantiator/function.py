@@ -50,7 +50,8 @@ class InstantiatedGlobalFunction(parser.GlobalFunction):
                          self.return_type,
                          self.args,
                          self.template,
-                         parent=self.parent)
+                         parent=self.parent,
+                         attributes=original.attributes)
 
     def to_cpp(self):
         """Generate the C++ code for wrapping."""
@@ -1,8 +1,9 @@
 """Various helpers for instantiation."""
 
 import itertools
-from copy import deepcopy
-from typing import Sequence, Union
+from collections import OrderedDict, namedtuple
+from copy import copy
+from typing import Any, Callable, Dict, Hashable, Sequence, Union
 
 import gtwrap.interface_parser as parser
 
@@ -13,6 +14,125 @@ InstantiatedMember = Union['InstantiatedConstructor', 'InstantiatedMethod',
                            'InstantiatedStaticMethod',
                            'InstantiatedGlobalFunction']
 
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class InstantiationCache:
+    """
+    Bounded LRU cache of instantiation results, with hit and miss counters.
+
+    The keys identify the typenames by their `id`, since typenames which
+    compare equal can still have different names and namespaces, e.g.
+    `gtsam::Point2` vs `Point2` in the `gtsam` namespace. Each entry holds on
+    to the objects of its key so that their ids are not reused while it is
+    cached.
+
+    Args:
+        maxsize: The maximum number of cached results.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, referents: Sequence,
+            compute: Callable[[], Any]):
+        """
+        Get the result for `key`, calling `compute` if it is not cached.
+
+        Args:
+            key: The key of the result.
+            referents: The objects whose ids are in the key.
+            compute: Function which computes the result.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        result = compute()
+        if self.maxsize > 0:
+            self._entries[key] = (result, referents)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return result
+
+    def cache_info(self) -> CacheInfo:
+        """Get the statistics of the cache, like `functools.lru_cache`."""
+        return CacheInfo(self.hits, self.misses, self.maxsize,
+                         len(self._entries))
+
+    def clear(self):
+        """Remove all the entries and reset the statistics."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# The instantiated types are immutable, so they are shared between all the
+# instantiations which substitute the same templates.
+TYPE_CACHE = InstantiationCache()
+ARGS_LIST_CACHE = InstantiationCache()
+RETURN_TYPE_CACHE = InstantiationCache()
+
+
+def instantiation_cache_info() -> Dict[str, CacheInfo]:
+    """Get the statistics of the instantiation caches."""
+    return {
+        "type": TYPE_CACHE.cache_info(),
+        "args_list": ARGS_LIST_CACHE.cache_info(),
+        "return_type": RETURN_TYPE_CACHE.cache_info(),
+    }
+
+
+def clear_instantiation_caches():
+    """Clear the instantiation caches, e.g. to release the memory."""
+    TYPE_CACHE.clear()
+    ARGS_LIST_CACHE.clear()
+    RETURN_TYPE_CACHE.clear()
+
+
+def _type_key(ctype: Union[parser.Type, parser.TemplatedType]):
+    """
+    Get a key which identifies `ctype` by value. The types are interned,
+    but the templated types are created anew for every occurrence.
+    """
+    if isinstance(ctype, parser.TemplatedType):
+        return (id(ctype.typename), tuple(map(_type_key,
+                                              ctype.template_params)),
+                ctype.is_const, ctype.is_shared_ptr, ctype.is_ptr,
+                ctype.is_ref)
+    return ctype
+
+
+def _substitution_key(ctypes: Sequence[parser.Type],
+                      template_typenames: Sequence[str],
+                      instantiations: Sequence[parser.Typename],
+                      cpp_typename: parser.Typename,
+                      instantiated_class: 'InstantiatedClass' = None):
+    """
+    Get the cache key of the substitution of the templates and `This`
+    in `ctypes`.
+
+    The class is only part of the key if `This` can be substituted, so that
+    the types are shared between the classes with the same instantiations.
+
+    Returns the key and the objects whose ids are in it.
+    """
+    instantiations = tuple(instantiations)
+    key = (tuple(map(_type_key, ctypes)), tuple(template_typenames),
+           tuple(map(id, instantiations)))
+    if any("This" in str(ctype.typename) for ctype in ctypes) or \
+            any("This" in str(instantiation)
+                for instantiation in instantiations):
+        key += (id(cpp_typename), id(instantiated_class))
+        return key, (ctypes, instantiations, cpp_typename, instantiated_class)
+    return key, (ctypes, instantiations)
+
 
 def is_scoped_template(template_typenames: Sequence[str],
                        str_arg_typename: str):
@@ -28,6 +148,47 @@ def is_scoped_template(template_typenames: Sequence[str],
     return False, -1
 
 
+def _with_typename(ctype: Union[parser.Type, parser.TemplatedType],
+                   typename: parser.Typename):
+    """Get a copy of the type `ctype` with its typename replaced."""
+    if isinstance(ctype, parser.TemplatedType):
+        ctype = copy(ctype)
+        ctype.typename = typename
+        return ctype
+
+    return parser.Type(
+        typename=typename,
+        is_const=ctype.is_const,
+        is_shared_ptr=ctype.is_shared_ptr,
+        is_ptr=ctype.is_ptr,
+        is_ref=ctype.is_ref,
+        is_basic=ctype.is_basic,
+    )
+
+
+def _with_instantiations(ctype: Union[parser.Type, parser.TemplatedType],
+                         instantiations: Sequence[parser.Typename]):
+    """
+    Get a copy of the type `ctype` with the template instantiations of its
+    typename replaced. The template parameters of a templated type, which
+    have the instantiations as their typenames, are replaced as well.
+    """
+    new_ctype = _with_typename(
+        ctype,
+        parser.Typename(name=ctype.typename.name,
+                        namespaces=ctype.typename.namespaces,
+                        instantiations=instantiations))
+
+    if isinstance(ctype, parser.TemplatedType):
+        new_ctype.template_params = [
+            param if new is old else _with_typename(param, new)
+            for param, old, new in zip(ctype.template_params,
+                                       ctype.typename.instantiations,
+                                       instantiations)
+        ]
+    return new_ctype
+
+
 def instantiate_type(
         ctype: parser.Type,
         template_typenames: Sequence[str],
@@ -37,6 +198,26 @@ def instantiate_type(
     """
     Instantiate template typename for `ctype`.
 
+    The results are memoized in `TYPE_CACHE`, see `_instantiate_type`.
+    """
+    key, referents = _substitution_key((ctype, ), template_typenames,
+                                       instantiations, cpp_typename,
+                                       instantiated_class)
+    return TYPE_CACHE.get(
+        key, referents,
+        lambda: _instantiate_type(ctype, template_typenames, instantiations,
+                                  cpp_typename, instantiated_class))
+
+
+def _instantiate_type(
+        ctype: parser.Type,
+        template_typenames: Sequence[str],
+        instantiations: Sequence[parser.Typename],
+        cpp_typename: parser.Typename,
+        instantiated_class: 'InstantiatedClass' = None) -> parser.Type:
+    """
+    Instantiate template typename for `ctype`.
+
     Args:
         ctype: The original argument type.
         template_typenames: List of strings representing the templates.
@@ -52,16 +233,22 @@ def instantiate_type(
         If ctype name is `This`, return the new typename `cpp_typename`.
         Otherwise, return the original ctype.
     """
-    # make a deep copy so that there is no overwriting of original template params
-    ctype = deepcopy(ctype)
+    # The types are not modified, but replaced with new ones where needed,
+    # so the types which do not depend on the templates are shared.
 
     # Check if the return type has template parameters as the typename's name
-    if ctype.typename.instantiations:
-        for idx, instantiation in enumerate(ctype.typename.instantiations):
+    if any(instantiation.name in template_typenames
+           for instantiation in ctype.typename.instantiations):
+        typename_instantiations = []
+        for instantiation in ctype.typename.instantiations:
             if instantiation.name in template_typenames:
                 template_idx = template_typenames.index(instantiation.name)
-                ctype.typename.instantiations[idx].name =\
-                    instantiations[template_idx]
+                instantiation = parser.Typename(
+                    name=instantiations[template_idx],
+                    namespaces=instantiation.namespaces,
+                    instantiations=instantiation.instantiations)
+            typename_instantiations.append(instantiation)
+        ctype = _with_instantiations(ctype, typename_instantiations)
 
     str_arg_typename = str(ctype.typename)
 
@@ -74,8 +261,7 @@ def instantiate_type(
 
     # Instantiate scoped templates, e.g. T::Value.
     if scoped_template:
-        # Create a copy of the instantiation so we can modify it.
-        instantiation = deepcopy(instantiations[scoped_idx])
+        instantiation = instantiations[scoped_idx]
 
         # Replace the part of the template with the instantiation
         # This new typename has the updated name, previous namespaces and no instantiations
@@ -131,15 +317,25 @@ def instantiate_type(
         if 'This' in ctype.typename.namespaces:
             # Simply get the index of `This` in the namespace and
             # replace it with the instantiated name.
-            namespace_idx = ctype.typename.namespaces.index('This')
-            ctype.typename.namespaces[namespace_idx] = cpp_typename.name
+            namespaces = list(ctype.typename.namespaces)
+            namespaces[namespaces.index('This')] = cpp_typename.name
+            return _with_typename(
+                ctype,
+                parser.Typename(name=ctype.typename.name,
+                                namespaces=namespaces,
+                                instantiations=ctype.typename.instantiations))
         # Else check if it is in the template namespace, e.g vector<This::Value>
         else:
-            for idx, instantiation in enumerate(ctype.typename.instantiations):
+            typename_instantiations = []
+            for instantiation in ctype.typename.instantiations:
                 if 'This' in instantiation.namespaces:
-                    ctype.typename.instantiations[idx].namespaces = \
-                        cpp_typename.namespaces + [cpp_typename.name]
-        return ctype
+                    instantiation = parser.Typename(
+                        name=instantiation.name,
+                        namespaces=cpp_typename.namespaces +
+                        [cpp_typename.name],
+                        instantiations=instantiation.instantiations)
+                typename_instantiations.append(instantiation)
+            return _with_instantiations(ctype, typename_instantiations)
 
     else:
         return ctype
@@ -164,14 +360,19 @@ def instantiate_args_list(
     @return A new list of parser.Argument which types are replaced with their
         instantiations.
     """
-    instantiated_args = []
-    for arg in args_list:
-        new_type = instantiate_type(arg.ctype, template_typenames,
-                                    instantiations, cpp_typename)
-        instantiated_args.append(
-            parser.Argument(name=arg.name, ctype=new_type,
-                            default=arg.default))
-    return instantiated_args
+    # Only the types are cached, since the arguments refer to their parent.
+    ctypes = tuple(arg.ctype for arg in args_list)
+    key, referents = _substitution_key(ctypes, template_typenames,
+                                       instantiations, cpp_typename)
+    new_types = ARGS_LIST_CACHE.get(
+        key, referents, lambda: tuple(
+            _instantiate_type(ctype, template_typenames, instantiations,
+                              cpp_typename) for ctype in ctypes))
+
+    return [
+        parser.Argument(name=arg.name, ctype=new_type, default=arg.default)
+        for arg, new_type in zip(args_list, new_types)
+    ]
 
 
 def instantiate_return_type(
@@ -181,20 +382,23 @@ def instantiate_return_type(
         cpp_typename: parser.Typename,
         instantiated_class: 'InstantiatedClass' = None):
     """Instantiate the return type."""
-    new_type1 = instantiate_type(return_type.type1,
-                                 template_typenames,
-                                 instantiations,
-                                 cpp_typename,
-                                 instantiated_class=instantiated_class)
-    if return_type.type2:
-        new_type2 = instantiate_type(return_type.type2,
-                                     template_typenames,
-                                     instantiations,
-                                     cpp_typename,
-                                     instantiated_class=instantiated_class)
-    else:
-        new_type2 = ''
-    return parser.ReturnType(new_type1, new_type2)
+    ctypes = (return_type.type1, return_type.type2) if return_type.type2 \
+        else (return_type.type1, )
+    # Only the types are cached, since the return type refers to its parent.
+    key, referents = _substitution_key(ctypes, template_typenames,
+                                       instantiations, cpp_typename,
+                                       instantiated_class)
+    new_types = RETURN_TYPE_CACHE.get(
+        key, referents,
+        lambda: tuple(
+            _instantiate_type(ctype,
+                              template_typenames,
+                              instantiations,
+                              cpp_typename,
+                              instantiated_class=instantiated_class)
+            for ctype in ctypes))
+    return parser.ReturnType(new_types[0],
+                             new_types[1] if len(new_types) > 1 else '')
 
 
 def instantiate_name(original_name: str,
@@ -271,8 +475,8 @@ class InstantiationHelper:
         instantiated_methods = []
 
         for method in methods_list:
-            # We creare a copy since we will modify the typenames list.
-            method_typenames = deepcopy(typenames)
+            # We create a copy since we will modify the typenames list.
+            method_typenames = list(typenames)
 
             if isinstance(method.template, parser.template.Template):
                 method_typenames.extend(method.template.typenames)
@@ -17,6 +17,8 @@ class InstantiatedMethod(parser.Method):
         void func(X x, Y y);
     }
     """
+    __slots__ = ("original", "instantiations")
+
     def __init__(self,
                  original: parser.Method,
                  instantiations: Iterable[parser.Typename] = ()):
@@ -35,7 +37,8 @@ class InstantiatedMethod(parser.Method):
                          self.return_type,
                          self.args,
                          self.is_const,
-                         parent=self.parent)
+                         parent=self.parent,
+                         attributes=original.attributes)
 
     @classmethod
     def construct(cls, original, typenames, class_instantiations,
@@ -51,6 +54,7 @@ class InstantiatedMethod(parser.Method):
             args=parser.ArgumentList(instantiated_args),
             is_const=original.is_const,
             parent=parent,
+            attributes=original.attributes,
         )
         return InstantiatedMethod(method, instantiations=method_instantiations)
 
@@ -86,8 +90,12 @@ class InstantiatedStaticMethod(parser.StaticMethod):
         self.template = original.template
         self.parent = original.parent
 
-        super().__init__(self.name, self.return_type, self.args, self.template,
-                         self.parent)
+        super().__init__(self.name,
+                         self.return_type,
+                         self.args,
+                         self.template,
+                         self.parent,
+                         attributes=original.attributes)
 
     @classmethod
     def construct(cls, original, typenames, class_instantiations,
@@ -104,6 +112,7 @@ class InstantiatedStaticMethod(parser.StaticMethod):
             args=parser.ArgumentList(instantiated_args),
             template=original.template,
             parent=parent,
+            attributes=original.attributes,
         )
         return InstantiatedStaticMethod(method,
                                         instantiations=method_instantiations)
@@ -1,8 +1,16 @@
 import os
 import sys
+from collections import OrderedDict
 from pathlib import Path
 import xml.etree.ElementTree as ET
 
+# Parsed XML trees shared by all the parsers, so that a long-lived process like
+# the wrap server does not parse the same files for every request. The trees
+# are keyed by the file path along with its modification time and size, and
+# the least recently used ones are evicted beyond `_SHARED_XML_CACHE_SIZE`.
+_SHARED_XML_CACHE = OrderedDict()
+_SHARED_XML_CACHE_SIZE = 256
+
 
 class XMLDocParser:
     """
@@ -67,7 +75,18 @@ class XMLDocParser:
             return self._parsed_xml_cache[file_key]
 
         try:
-            tree = ET.parse(xml_file_path)
+            stat = os.stat(file_key)
+            version = (stat.st_mtime_ns, stat.st_size)
+            shared = _SHARED_XML_CACHE.get(file_key)
+            if shared is not None and shared[0] == version:
+                tree = shared[1]
+                _SHARED_XML_CACHE.move_to_end(file_key)
+            else:
+                tree = ET.parse(xml_file_path)
+                _SHARED_XML_CACHE[file_key] = (version, tree)
+                _SHARED_XML_CACHE.move_to_end(file_key)
+                while len(_SHARED_XML_CACHE) > _SHARED_XML_CACHE_SIZE:
+                    _SHARED_XML_CACHE.popitem(last=False)
             self._parsed_xml_cache[file_key] = tree
             return tree
         except FileNotFoundError:
@@ -8,7 +8,10 @@ and invoked during the wrapping by CMake.
 import argparse
 import sys
 
+from gtwrap.interface_parser.packrat import (DEFAULT_PACKRAT_CACHE_SIZE,
+                                             PACKRAT_MODES)
 from gtwrap.matlab_wrapper import MatlabWrapper
+from gtwrap.profiling import PhaseTimer
 
 if __name__ == "__main__":
     arg_parser = argparse.ArgumentParser(
@@ -48,6 +51,38 @@ if __name__ == "__main__":
         action="store_true",
         help="Allow boost based serialization methods",
     )
+    arg_parser.add_argument(
+        "--cache_dir",
+        type=str,
+        default="",
+        help="Directory in which to cache the parsed interface files, "
+        "so unchanged files are not parsed again.")
+    arg_parser.add_argument(
+        "--packrat_cache_size",
+        type=int,
+        default=None,
+        help="Maximum number of entries of the packrat cache of the parser, "
+        f"{DEFAULT_PACKRAT_CACHE_SIZE} by default. A larger cache parses "
+        "faster but takes more memory.")
+    arg_parser.add_argument(
+        "--packrat_mode",
+        choices=PACKRAT_MODES,
+        default=None,
+        help="How the packrat cache evicts entries when it is full, "
+        "'fifo' by default. 'unbounded' never evicts entries and 'off' "
+        "disables the cache.")
+    arg_parser.add_argument(
+        "--timings",
+        "--profile",
+        action="store_true",
+        help="Report the wall time, CPU time and peak memory of each "
+        "wrapping phase per interface file, and the statistics of the "
+        "packrat cache. Tracing the memory slows down the wrapping.")
+    arg_parser.add_argument(
+        "--timings_output",
+        type=str,
+        default="",
+        help="JSON file to write the timings to. Implies --timings.")
     args = arg_parser.parse_args()
 
     top_module_namespaces = args.top_module_namespaces.split("::")
@@ -56,11 +91,25 @@ if __name__ == "__main__":
 
     print(f"[MatlabWrapper] Ignoring classes: {args.ignore}", file=sys.stderr)
 
+    timer = PhaseTimer(enabled=args.timings or bool(args.timings_output))
+
     wrapper = MatlabWrapper(
         module_name=args.module_name,
         top_module_namespace=top_module_namespaces,
         ignore_classes=args.ignore,
-        use_boost_serialization=args.use_boost_serialization)
+        use_boost_serialization=args.use_boost_serialization,
+        cache_dir=args.cache_dir,
+        timer=timer,
+        packrat_cache_size=args.packrat_cache_size,
+        packrat_mode=args.packrat_mode)
 
     sources = args.src.split(';')
     cc_content = wrapper.wrap(sources, path=args.out)
+
+    print(f"[MatlabWrapper] {wrapper.writer.summary()}", file=sys.stderr)
+    if timer.enabled:
+        print(timer.report(), file=sys.stderr)
+        print(f"[MatlabWrapper] {wrapper.packrat_stats.summary()}",
+              file=sys.stderr)
+    if args.timings_output:
+        timer.write_json(args.timings_output)
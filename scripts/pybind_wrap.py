@@ -8,8 +8,13 @@ and invoked during the wrapping by CMake.
 # pylint: disable=import-error
 
 import argparse
+import sys
 
-from gtwrap.pybind_wrapper import PybindWrapper
+from gtwrap.interface_parser.packrat import (DEFAULT_PACKRAT_CACHE_SIZE,
+                                             PACKRAT_MODES)
+from gtwrap.profiling import PhaseTimer
+from gtwrap.pybind_wrapper import (OVERLOAD_ORDERS, REFERENCE_RETURNS,
+                                   PybindWrapper)
 
 
 def main():
@@ -63,11 +68,90 @@ def main():
                             help="The module template file (e.g. module.tpl).")
     arg_parser.add_argument("--is_submodule",
                             default=False,
-                            action="store_true")
+                            action="store_true",
+                            help="Wrap the source(s) as submodules, each "
+                            "to its own .cpp file.")
+    arg_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes which wrap the submodules concurrently "
+        "when several are given with --is_submodule. 0 uses one per CPU.")
+    arg_parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Number of files into which the classes of each module are "
+        "split, so that they can be compiled in parallel. The shard k of "
+        "<out>.cpp is <out>_k.cpp.")
+    arg_parser.add_argument(
+        "--reference_returns",
+        choices=REFERENCE_RETURNS,
+        default="none",
+        help="Which references returned by methods are returned as views "
+        "into the object of the method instead of copies: none, only "
+        "references to Eigen types, or all of them. A view dangles if the "
+        "referenced object is reallocated. The [[reference_return]] "
+        "attribute of a method or class opts into it, and [[copy_return]] "
+        "opts out of it.")
+    arg_parser.add_argument(
+        "--eigen_ref_args",
+        action="store_true",
+        help="Also bind the functions with const reference arguments of "
+        "Eigen types to Eigen::Ref<const T>, for the NumPy arrays with a "
+        "matching memory layout only, so that these are passed without a "
+        "copy to callees taking Eigen::Ref. The other arrays are passed as "
+        "before. The [[eigen_ref]] attribute of a method, function or class "
+        "whose callees take Eigen::Ref binds them to Eigen::Ref only.")
+    arg_parser.add_argument(
+        "--overload_order",
+        choices=OVERLOAD_ORDERS,
+        default="declaration",
+        help="The order in which pybind11 tries the overloads of a function: "
+        "the declaration order, or the overloads whose failed attempts copy "
+        "fewer Eigen or STL arguments before the others of the same arity. "
+        "The latter changes which overload is called if several match.")
+    arg_parser.add_argument(
+        "--overload_diagnostics",
+        action="store_true",
+        help="Report the overloads whose failed attempts copy arguments "
+        "before the other overloads are tried.")
     arg_parser.add_argument("--xml_source",
                             type=str,
                             default="",
                             help="The path to the Doxygen-generated XML documentation")
+    arg_parser.add_argument(
+        "--cache_dir",
+        type=str,
+        default="",
+        help="Directory in which to cache the parsed interface files, "
+        "so unchanged files are not parsed again.")
+    arg_parser.add_argument(
+        "--packrat_cache_size",
+        type=int,
+        default=None,
+        help="Maximum number of entries of the packrat cache of the parser, "
+        f"{DEFAULT_PACKRAT_CACHE_SIZE} by default. A larger cache parses "
+        "faster but takes more memory.")
+    arg_parser.add_argument(
+        "--packrat_mode",
+        choices=PACKRAT_MODES,
+        default=None,
+        help="How the packrat cache evicts entries when it is full, "
+        "'fifo' by default. 'unbounded' never evicts entries and 'off' "
+        "disables the cache.")
+    arg_parser.add_argument(
+        "--timings",
+        "--profile",
+        action="store_true",
+        help="Report the wall time, CPU time and peak memory of each "
+        "wrapping phase per interface file, and the statistics of the "
+        "packrat cache. Tracing the memory slows down the wrapping.")
+    arg_parser.add_argument(
+        "--timings_output",
+        type=str,
+        default="",
+        help="JSON file to write the timings to. Implies --timings.")
     args = arg_parser.parse_args()
 
     top_module_namespaces = args.top_module_namespaces.split("::")
@@ -77,6 +161,8 @@ def main():
     with open(args.template, "r", encoding="UTF-8") as f:
         template_content = f.read()
 
+    timer = PhaseTimer(enabled=args.timings or bool(args.timings_output))
+
     wrapper = PybindWrapper(
         module_name=args.module_name,
         use_boost_serialization=args.use_boost_serialization,
@@ -84,16 +170,36 @@ def main():
         ignore_classes=args.ignore,
         module_template=template_content,
         xml_source=args.xml_source,
+        cache_dir=args.cache_dir,
+        timer=timer,
+        shards=args.shards,
+        packrat_cache_size=args.packrat_cache_size,
+        packrat_mode=args.packrat_mode,
+        reference_returns=args.reference_returns,
+        eigen_ref_args=args.eigen_ref_args,
+        overload_order=args.overload_order,
     )
 
     if args.is_submodule:
-        wrapper.wrap_submodule(args.src)
+        # Several submodules can be wrapped in a single batch.
+        wrapper.wrap_submodules(args.src.split(';'), jobs=args.jobs or None)
 
     else:
         # Wrap the code and get back the cpp/cc code.
         sources = args.src.split(';')
         wrapper.wrap(sources, args.out)
 
+    print(f"[PybindWrapper] {wrapper.writer.summary()}", file=sys.stderr)
+    if args.overload_diagnostics:
+        for diagnostic in wrapper.overload_diagnostics:
+            print(f"[PybindWrapper] {diagnostic}", file=sys.stderr)
+    if timer.enabled:
+        print(timer.report(), file=sys.stderr)
+        print(f"[PybindWrapper] {wrapper.packrat_stats.summary()}",
+              file=sys.stderr)
+    if args.timings_output:
+        timer.write_json(args.timings_output)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Helper script to run a wrapping script in a wrap server (see gtwrap/server.py),
+which keeps the interpreter, the interface grammar and the caches warm across
+the wrapping commands. If no server is running, the script is run directly,
+and with --spawn a server is started in the background for the next commands.
+This script is installed via CMake to the user's binary directory
+and invoked during the wrapping by CMake instead of the wrapping scripts.
+
+E.g.
+```
+python wrap_client.py --socket build/gtwrap.sock --spawn \
+    scripts/pybind_wrap.py --src gtsam.i ...
+```
+"""
+
+import argparse
+import json
+import os
+import os.path as osp
+import socket
+import subprocess
+import sys
+
+
+def request(socket_path, script, argv):
+    """
+    Run the `script` with the arguments `argv` in the server.
+
+    Returns the response of the server, or None if it cannot be reached.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+            sock.sendall(
+                json.dumps({
+                    "script": osp.abspath(script),
+                    "argv": argv,
+                    "cwd": os.getcwd(),
+                    # E.g. PYTHONPATH, which the script may depend on.
+                    "env": dict(os.environ),
+                }).encode("UTF-8") + b"\n")
+            with sock.makefile("rb") as f:
+                return json.loads(f.readline())
+    except (AttributeError, OSError, ValueError):
+        # No Unix sockets (Windows), no server or a broken connection.
+        return None
+
+
+def spawn(socket_path, script, idle_timeout):
+    """Start a server for the `script` in the background."""
+    subprocess.Popen(  # pylint: disable=consider-using-with
+        [
+            sys.executable, "-m", "gtwrap.server", "--socket", socket_path,
+            "--script",
+            osp.abspath(script), "--idle_timeout",
+            str(idle_timeout)
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True)
+
+
+def main():
+    """Main runner."""
+    arg_parser = argparse.ArgumentParser(
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    arg_parser.add_argument("--socket",
+                            type=str,
+                            required=True,
+                            help="Path of the Unix socket of the server")
+    arg_parser.add_argument("--spawn",
+                            action="store_true",
+                            help="Start a server if none is running")
+    arg_parser.add_argument("--idle_timeout",
+                            type=float,
+                            default=1800,
+                            help="Seconds without requests after which a "
+                            "spawned server stops")
+    arg_parser.add_argument("script",
+                            type=str,
+                            help="The wrapping script to run")
+    arg_parser.add_argument("args",
+                            nargs=argparse.REMAINDER,
+                            help="The arguments of the wrapping script")
+    args = arg_parser.parse_args()
+
+    response = request(args.socket, args.script, args.args)
+    if response is None or "error" in response:
+        if response is None and args.spawn and hasattr(socket, "AF_UNIX"):
+            spawn(args.socket, args.script, args.idle_timeout)
+        sys.stdout.flush()
+        sys.exit(
+            subprocess.call([sys.executable, args.script] + args.args))
+
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    sys.exit(response["returncode"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#include <pybind11/eigen.h>
+#include <pybind11/stl_bind.h>
+#include <pybind11/pybind11.h>
+#include <pybind11/operators.h>
+#include "gtsam/nonlinear/utilities.h"  // for RedirectCout.
+
+
+
+
+
+using namespace std;
+
+namespace py = pybind11;
+
+PYBIND11_MODULE(batch_py, m_) {
+    m_.doc() = "pybind11 wrapper of batch_py";
+
+    pybind11::module m_gtsam = m_.def_submodule("gtsam", "gtsam submodule");
+
+    py::class_<gtsam::Pose3, std::shared_ptr<gtsam::Pose3>>(m_gtsam, "Pose3")
+        .def(py::init<>())
+        .def("transformFrom",[](gtsam::Pose3* self, const gtsam::Point3& point){return self->transformFrom(point);}, py::arg("point"))
+        .def("transformFrom_batch",[](gtsam::Pose3* self, const py::sequence& point){
+            const size_t n = py::len(point);
+            std::vector<gtsam::Point3> point_values;
+            point_values.reserve(n);
+            for (const auto& item : point) point_values.push_back(item.cast<gtsam::Point3>());
+            std::vector<gtsam::Point3> results;
+            results.reserve(n);
+            {
+                py::gil_scoped_release release;
+                for (size_t i = 0; i < n; ++i) results.push_back(self->transformFrom(point_values[i]));
+            }
+            py::list result(n);
+            for (size_t i = 0; i < n; ++i) result[i] = py::cast(std::move(results[i]));
+            return result;
+        }, py::arg("point"))
+        .def("range",[](gtsam::Pose3* self, const gtsam::Vector3& point){return self->range(point);}, py::arg("point"))
+        .def("range_batch",[](gtsam::Pose3* self, const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3, Eigen::RowMajor>>& point){
+            const size_t n = point.rows();
+            Eigen::Matrix<double, Eigen::Dynamic, 1> result(n);
+            {
+                py::gil_scoped_release release;
+                for (size_t i = 0; i < n; ++i) result(i) = self->range(point.row(i).transpose());
+            }
+            return result;
+        }, py::arg("point"))
+        .def("rotate",[](gtsam::Pose3* self, const gtsam::Vector3& v, double scale){return self->rotate(v, scale);}, py::arg("v"), py::arg("scale"))
+        .def("rotate_batch",[](gtsam::Pose3* self, const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 3, Eigen::RowMajor>>& v, const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 1>>& scale){
+            const size_t n = v.rows();
+            if (static_cast<size_t>(scale.size()) != n) throw std::invalid_argument("rotate_batch: the arguments have different lengths");
+            Eigen::Matrix<double, Eigen::Dynamic, 3, Eigen::RowMajor> result(n, 3);
+            {
+                py::gil_scoped_release release;
+                for (size_t i = 0; i < n; ++i) result.row(i) = self->rotate(v.row(i).transpose(), scale(i)).transpose();
+            }
+            return result;
+        }, py::arg("v"), py::arg("scale"))
+        .def("between",[](gtsam::Pose3* self, const std::shared_ptr<gtsam::Pose3> other, size_t key){return self->between(other, key);}, py::arg("other"), py::arg("key"))
+        .def("between_batch",[](gtsam::Pose3* self, const py::sequence& other, const Eigen::Ref<const Eigen::Matrix<size_t, Eigen::Dynamic, 1>>& key){
+            const size_t n = py::len(other);
+            if (static_cast<size_t>(key.size()) != n) throw std::invalid_argument("between_batch: the arguments have different lengths");
+            std::vector<std::shared_ptr<gtsam::Pose3>> other_values;
+            other_values.reserve(n);
+            for (const auto& item : other) other_values.push_back(item.cast<std::shared_ptr<gtsam::Pose3>>());
+            std::vector<std::pair<gtsam::Pose3, double>> results;
+            results.reserve(n);
+            {
+                py::gil_scoped_release release;
+                for (size_t i = 0; i < n; ++i) results.push_back(self->between(other_values[i], key(i)));
+            }
+            py::list result(n);
+            for (size_t i = 0; i < n; ++i) result[i] = py::cast(std::move(results[i]));
+            return result;
+        }, py::arg("other"), py::arg("key"))
+        .def("setKey",[](gtsam::Pose3* self, size_t key){ self->setKey(key);}, py::arg("key"))
+        .def("setKey_batch",[](gtsam::Pose3* self, const Eigen::Ref<const Eigen::Matrix<size_t, Eigen::Dynamic, 1>>& key){
+            const size_t n = key.size();
+            {
+                py::gil_scoped_release release;
+                for (size_t i = 0; i < n; ++i) self->setKey(key(i));
+            }
+        }, py::arg("key"))
+        .def("transformToPoint3",[](gtsam::Pose3* self, const gtsam::Point3& point){return self->transformTo<gtsam::Point3>(point);}, py::arg("point"))
+        .def("transformToPoint3_batch",[](gtsam::Pose3* self, const py::sequence& point){
+            const size_t n = py::len(point);
+            std::vector<gtsam::Point3> point_values;
+            point_values.reserve(n);
+            for (const auto& item : point) point_values.push_back(item.cast<gtsam::Point3>());
+            std::vector<gtsam::Point3> results;
+            results.reserve(n);
+            {
+                py::gil_scoped_release release;
+                for (size_t i = 0; i < n; ++i) results.push_back(self->transformTo<gtsam::Point3>(point_values[i]));
+            }
+            py::list result(n);
+            for (size_t i = 0; i < n; ++i) result[i] = py::cast(std::move(results[i]));
+            return result;
+        }, py::arg("point"))
+        .def_static("Expmap",[](const gtsam::Vector6& xi){return gtsam::Pose3::Expmap(xi);}, py::arg("xi"))
+        .def_static("Expmap_batch",[](const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 6, Eigen::RowMajor>>& xi){
+            const size_t n = xi.rows();
+            std::vector<gtsam::Pose3> results;
+            results.reserve(n);
+            {
+                py::gil_scoped_release release;
+                for (size_t i = 0; i < n; ++i) results.push_back(gtsam::Pose3::Expmap(xi.row(i).transpose()));
+            }
+            py::list result(n);
+            for (size_t i = 0; i < n; ++i) result[i] = py::cast(std::move(results[i]));
+            return result;
+        }, py::arg("xi"));
+
+    m_gtsam.def("wrapAngle",[](double angle){return gtsam::wrapAngle(angle);}, py::arg("angle"));
+    m_gtsam.def("wrapAngle_batch",[](const Eigen::Ref<const Eigen::Matrix<double, Eigen::Dynamic, 1>>& angle){
+        const size_t n = angle.size();
+        Eigen::Matrix<double, Eigen::Dynamic, 1> result(n);
+        {
+            py::gil_scoped_release release;
+            for (size_t i = 0; i < n; ++i) result(i) = gtsam::wrapAngle(angle(i));
+        }
+        return result;
+    }, py::arg("angle"));
+
+#include "python/specializations.h"
+
+}
+
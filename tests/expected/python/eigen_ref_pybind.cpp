@@ -0,0 +1,44 @@
+#include <pybind11/eigen.h>
+#include <pybind11/stl_bind.h>
+#include <pybind11/pybind11.h>
+#include <pybind11/operators.h>
+#include "gtsam/nonlinear/utilities.h"  // for RedirectCout.
+
+
+
+
+
+using namespace std;
+
+namespace py = pybind11;
+
+PYBIND11_MODULE(eigen_ref_py, m_) {
+    m_.doc() = "pybind11 wrapper of eigen_ref_py";
+
+    pybind11::module m_gtsam = m_.def_submodule("gtsam", "gtsam submodule");
+
+    py::class_<gtsam::GaussianFactorGraph, std::shared_ptr<gtsam::GaussianFactorGraph>>(m_gtsam, "GaussianFactorGraph")
+        .def(py::init<>())
+        .def("error",[](gtsam::GaussianFactorGraph* self, const gtsam::Vector& x){return self->error(x);}, py::arg("x"))
+        .def("probPrime",[](gtsam::GaussianFactorGraph* self, const Eigen::Ref<const gtsam::Vector>& x){return self->probPrime(x);}, py::arg("x"))
+        .def("update",[](gtsam::GaussianFactorGraph* self, gtsam::Matrix& A, const Eigen::Ref<const Matrix3>& R, gtsam::Vector b){ self->update(A, R, b);}, py::arg("A"), py::arg("R"), py::arg("b"))
+        .def_static("FromMatrix",[](const Eigen::Ref<const gtsam::Matrix>& A, const Eigen::Ref<const gtsam::Vector>& b, size_t dim){return gtsam::GaussianFactorGraph::FromMatrix(A, b, dim);}, py::arg("A"), py::arg("b"), py::arg("dim"));
+
+    py::class_<gtsam::JacobianFactor, std::shared_ptr<gtsam::JacobianFactor>>(m_gtsam, "JacobianFactor")
+        .def(py::init<const gtsam::Matrix&>(), py::arg("A"))
+        .def("error",[](gtsam::JacobianFactor* self, const Eigen::Ref<const gtsam::Vector>& x){return self->error(x);}, py::arg("x"))
+        .def("print",[](gtsam::JacobianFactor* self, const Eigen::Ref<const gtsam::Matrix>& A){ py::scoped_ostream_redirect output; self->print(A);}, py::arg("A"))
+        .def("__repr__",
+                    [](const gtsam::JacobianFactor& self, const Eigen::Ref<const gtsam::Matrix>& A){
+                        gtsam::RedirectCout redirect;
+                        self.print(A);
+                        return redirect.str();
+                    }, py::arg("A"));
+
+    m_gtsam.def("squaredNorm",[](const Eigen::Ref<const gtsam::Vector>& v){return gtsam::squaredNorm(v);}, py::arg("v"));
+    m_gtsam.def("norm",[](const gtsam::Vector& v){return gtsam::norm(v);}, py::arg("v"));
+
+#include "python/specializations.h"
+
+}
+
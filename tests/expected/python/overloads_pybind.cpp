@@ -0,0 +1,40 @@
+#include <pybind11/eigen.h>
+#include <pybind11/stl_bind.h>
+#include <pybind11/pybind11.h>
+#include <pybind11/operators.h>
+#include "gtsam/nonlinear/utilities.h"  // for RedirectCout.
+
+
+
+
+
+using namespace std;
+
+namespace py = pybind11;
+
+PYBIND11_MODULE(overloads_py, m_) {
+    m_.doc() = "pybind11 wrapper of overloads_py";
+
+    pybind11::module m_gtsam = m_.def_submodule("gtsam", "gtsam submodule");
+
+    py::class_<gtsam::Values, std::shared_ptr<gtsam::Values>>(m_gtsam, "Values")
+        .def(py::init<>())
+        .def("at",[](gtsam::Values* self, size_t i, size_t j){return self->at(i, j);}, py::arg("i"), py::arg("j"))
+        .def("at",[](gtsam::Values* self, size_t j){return self->at(j);}, py::arg("j"))
+        .def("at",[](gtsam::Values* self, const std::vector<size_t>& keys){return self->at(keys);}, py::arg("keys"))
+        .def("at",[](gtsam::Values* self, const gtsam::Matrix& A, size_t j){return self->at(A, j);}, py::arg("A"), py::arg("j"))
+        .def("error",[](gtsam::Values* self, size_t j, double sigma){return self->error(j, sigma);}, py::arg("j"), py::arg("sigma") = 1.0)
+        .def("error",[](gtsam::Values* self, const gtsam::Vector& x){return self->error(x);}, py::arg("x"))
+        .def("update",[](gtsam::Values* self, const gtsam::Vector& v){ self->update(v);}, py::arg("v"))
+        .def("update",[](gtsam::Values* self, size_t j, double x){ self->update(j, x);}, py::prepend(), py::arg("j"), py::arg("x"))
+        .def("scale",[](gtsam::Values* self, double s){return self->scale(s);}, py::arg("s").noconvert())
+        .def("scale",[](gtsam::Values* self, int s){return self->scale(s);}, py::arg("s"));
+
+    m_gtsam.def("solve",[](const gtsam::Matrix& A, const gtsam::Vector& b){return gtsam::solve(A, b);}, py::arg("A"), py::arg("b"));
+    m_gtsam.def("solve",[](double b){return gtsam::solve(b);}, py::arg("b"));
+    m_gtsam.def("solve",[](const gtsam::Vector& b){return gtsam::solve(b);}, py::arg("b"));
+
+#include "python/specializations.h"
+
+}
+
@@ -0,0 +1,46 @@
+#include <pybind11/eigen.h>
+#include <pybind11/stl_bind.h>
+#include <pybind11/pybind11.h>
+#include <pybind11/operators.h>
+#include "gtsam/nonlinear/utilities.h"  // for RedirectCout.
+
+
+
+
+
+using namespace std;
+
+namespace py = pybind11;
+
+PYBIND11_MODULE(reference_returns_py, m_) {
+    m_.doc() = "pybind11 wrapper of reference_returns_py";
+
+    pybind11::module m_gtsam = m_.def_submodule("gtsam", "gtsam submodule");
+
+    py::class_<gtsam::JacobianFactor, std::shared_ptr<gtsam::JacobianFactor>>(m_gtsam, "JacobianFactor")
+        .def(py::init<>())
+        .def("getA",[](gtsam::JacobianFactor* self){return self->getA();})
+        .def("getb",[](gtsam::JacobianFactor* self){return self->getb();})
+        .def("rotation",[](gtsam::JacobianFactor* self){return self->rotation();})
+        .def("pose",[](gtsam::JacobianFactor* self){return self->pose();})
+        .def("information",[](gtsam::JacobianFactor* self){return self->information();})
+        .def("error",[](gtsam::JacobianFactor* self){return self->error();})
+        .def("whiten",[](gtsam::JacobianFactor* self, const gtsam::Vector& v){return self->whiten(v);}, py::arg("v"))
+        .def("augmentedJacobian",[](gtsam::JacobianFactor* self){return self->augmentedJacobian();})
+        .def("body",[](gtsam::JacobianFactor* self) -> const gtsam::Pose3& {return self->body();}, py::return_value_policy::reference_internal)
+        .def_static("Identity",[](){return gtsam::JacobianFactor::Identity();});
+
+    py::class_<gtsam::GaussianConditional, std::shared_ptr<gtsam::GaussianConditional>>(m_gtsam, "GaussianConditional")
+        .def(py::init<>())
+        .def("R",[](gtsam::GaussianConditional* self) -> const gtsam::Matrix& {return self->R();}, py::return_value_policy::reference_internal)
+        .def("d",[](gtsam::GaussianConditional* self){return self->d();});
+
+    py::class_<gtsam::Marginals, std::shared_ptr<gtsam::Marginals>>(m_gtsam, "Marginals")
+        .def(py::init<>())
+        .def("marginalCovariance",[](gtsam::Marginals* self, size_t variable){return self->marginalCovariance(variable);}, py::arg("variable"));
+
+
+#include "python/specializations.h"
+
+}
+
@@ -0,0 +1,47 @@
+#include <pybind11/eigen.h>
+#include <pybind11/stl_bind.h>
+#include <pybind11/pybind11.h>
+#include <pybind11/operators.h>
+#include "gtsam/nonlinear/utilities.h"  // for RedirectCout.
+
+
+
+
+
+using namespace std;
+
+namespace py = pybind11;
+
+PYBIND11_MODULE(release_gil_py, m_) {
+    m_.doc() = "pybind11 wrapper of release_gil_py";
+
+    pybind11::module m_gtsam = m_.def_submodule("gtsam", "gtsam submodule");
+
+    py::class_<gtsam::LevenbergMarquardtOptimizer, std::shared_ptr<gtsam::LevenbergMarquardtOptimizer>>(m_gtsam, "LevenbergMarquardtOptimizer")
+        .def(py::init<const gtsam::NonlinearFactorGraph&, const gtsam::Values&>(), py::arg("graph"), py::arg("initialValues"))
+        .def("optimize",[](gtsam::LevenbergMarquardtOptimizer* self){return self->optimize();}, py::call_guard<py::gil_scoped_release>())
+        .def("print",[](gtsam::LevenbergMarquardtOptimizer* self, string s){ py::scoped_ostream_redirect output; self->print(s);}, py::arg("s") = "")
+        .def("__repr__",
+                    [](const gtsam::LevenbergMarquardtOptimizer& self, string s){
+                        gtsam::RedirectCout redirect;
+                        self.print(s);
+                        return redirect.str();
+                    }, py::arg("s") = "")
+        .def_static("Create",[](){return gtsam::LevenbergMarquardtOptimizer::Create();}, py::call_guard<py::gil_scoped_release>());
+
+    py::class_<gtsam::NonlinearFactorGraph, std::shared_ptr<gtsam::NonlinearFactorGraph>>(m_gtsam, "NonlinearFactorGraph")
+        .def(py::init<>())
+        .def("size",[](gtsam::NonlinearFactorGraph* self){return self->size();})
+        .def("error",[](gtsam::NonlinearFactorGraph* self, const gtsam::Values& values){return self->error(values);}, py::call_guard<py::gil_scoped_release>(), py::arg("values"))
+        .def("linearize",[](gtsam::NonlinearFactorGraph* self, const gtsam::Values& values){return self->linearize(values);}, py::call_guard<py::gil_scoped_release>(), py::arg("values"))
+        .def("atPoint2",[](gtsam::NonlinearFactorGraph* self, size_t key){return self->at<gtsam::Point2>(key);}, py::call_guard<py::gil_scoped_release>(), py::arg("key"))
+        .def("atPoint3",[](gtsam::NonlinearFactorGraph* self, size_t key){return self->at<gtsam::Point3>(key);}, py::call_guard<py::gil_scoped_release>(), py::arg("key"))
+        .def_static("Load",[](string filename){return gtsam::NonlinearFactorGraph::Load(filename);}, py::call_guard<py::gil_scoped_release>(), py::arg("filename"));
+
+    m_gtsam.def("optimize",[](const gtsam::NonlinearFactorGraph& graph, const gtsam::Values& initial){return gtsam::optimize(graph, initial);}, py::call_guard<py::gil_scoped_release>(), py::arg("graph"), py::arg("initial"));
+    m_gtsam.def("numKeys",[](const gtsam::Values& values){return gtsam::numKeys(values);}, py::arg("values"));
+
+#include "python/specializations.h"
+
+}
+
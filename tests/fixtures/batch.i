@@ -0,0 +1,21 @@
+namespace gtsam {
+
+class Pose3 {
+  Pose3();
+  // Elements of a class type are passed and returned as lists.
+  [[batch]] gtsam::Point3 transformFrom(const gtsam::Point3& point) const;
+  // Scalars and fixed size vectors are passed and returned as arrays.
+  [[batch]] double range(const gtsam::Vector3& point) const;
+  [[batch]] gtsam::Vector3 rotate(const gtsam::Vector3& v, double scale) const;
+  [[batch]] static gtsam::Pose3 Expmap(const gtsam::Vector6& xi);
+  [[batch]] pair<gtsam::Pose3, double> between(const gtsam::Pose3* other,
+                                               size_t key) const;
+  [[batch]] void setKey(size_t key);
+
+  template <T = {gtsam::Point3}>
+  [[batch]] T transformTo(const T& point) const;
+};
+
+[[batch]] double wrapAngle(double angle);
+
+}  // namespace gtsam
@@ -0,0 +1,25 @@
+namespace gtsam {
+
+class GaussianFactorGraph {
+  GaussianFactorGraph();
+  // Copied, since the C++ method takes a const reference.
+  double error(const gtsam::Vector& x) const;
+  // Not copied for NumPy arrays with a matching layout.
+  [[eigen_ref]] double probPrime(const gtsam::Vector& x) const;
+  [[eigen_ref]] static gtsam::GaussianFactorGraph FromMatrix(
+      const gtsam::Matrix& A, const gtsam::Vector& b, size_t dim);
+  // Only the const references are taken as Eigen::Ref.
+  [[eigen_ref]] void update(gtsam::Matrix& A, const Matrix3& R,
+                            gtsam::Vector b);
+};
+
+class [[eigen_ref]] JacobianFactor {
+  JacobianFactor(const gtsam::Matrix& A);
+  double error(const gtsam::Vector& x) const;
+  void print(const gtsam::Matrix& A) const;
+};
+
+[[eigen_ref]] double squaredNorm(const gtsam::Vector& v);
+double norm(const gtsam::Vector& v);
+
+}  // namespace gtsam
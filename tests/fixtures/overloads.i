@@ -0,0 +1,29 @@
+namespace gtsam {
+
+class Values {
+  Values();
+  // Failed calls copy the matrix before the later overloads of the same
+  // arity are tried, while the overloads of other arities are skipped.
+  double at(const gtsam::Matrix& A, size_t j) const;
+  double at(size_t j) const;
+  double at(const std::vector<size_t>& keys) const;
+  double at(size_t i, size_t j) const;
+
+  // Both take a single argument, thanks to the default one.
+  double error(const gtsam::Vector& x) const;
+  double error(size_t j, double sigma = 1.0) const;
+
+  // Tried first, since it is prepended.
+  void update(const gtsam::Vector& v);
+  [[prefer]] void update(size_t j, double x);
+
+  // Only called with an exact float, never with a converted int.
+  [[noconvert]] double scale(double s) const;
+  double scale(int s) const;
+};
+
+gtsam::Vector solve(const gtsam::Matrix& A, const gtsam::Vector& b);
+gtsam::Vector solve(const gtsam::Vector& b);
+double solve(double b);
+
+}  // namespace gtsam
@@ -0,0 +1,39 @@
+namespace gtsam {
+
+class Pose3;
+
+class JacobianFactor {
+  JacobianFactor();
+  // Returned as views into the factor with --reference_returns eigen.
+  const gtsam::Matrix& getA() const;
+  gtsam::Vector& getb();
+  const Matrix3& rotation() const;
+  // Copied, unless --reference_returns all, since they are not Eigen types
+  // or not references.
+  const gtsam::Pose3& pose() const;
+  gtsam::Matrix information() const;
+  const double& error() const;
+  // Copied, since the reference could be to the argument.
+  const gtsam::Vector& whiten(const gtsam::Vector& v) const;
+  // Copied, since the method opts out.
+  [[copy_return]] const gtsam::Matrix& augmentedJacobian() const;
+  static const gtsam::Matrix& Identity();
+  // Always returned as a view, since the method opts in.
+  [[reference_return]] const gtsam::Pose3& body() const;
+};
+
+// Returned as views, since the class opts in.
+class [[reference_return]] GaussianConditional {
+  GaussianConditional();
+  const gtsam::Matrix& R() const;
+  // Copied, since the method opts out.
+  [[copy_return]] const gtsam::Vector& d() const;
+};
+
+// Copied, since the class opts out.
+class [[copy_return]] Marginals {
+  Marginals();
+  const gtsam::Matrix& marginalCovariance(size_t variable) const;
+};
+
+}  // namespace gtsam
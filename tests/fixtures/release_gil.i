@@ -0,0 +1,28 @@
+namespace gtsam {
+
+// All the methods of the class release the GIL, except print.
+class [[release_gil]] LevenbergMarquardtOptimizer {
+  LevenbergMarquardtOptimizer(const gtsam::NonlinearFactorGraph& graph,
+                              const gtsam::Values& initialValues);
+  gtsam::Values optimize();
+  void print(string s = "") const;
+  static gtsam::LevenbergMarquardtOptimizer Create();
+};
+
+class NonlinearFactorGraph {
+  NonlinearFactorGraph();
+  size_t size() const;
+  [[release_gil]] double error(const gtsam::Values& values) const;
+  [[release_gil]] gtsam::GaussianFactorGraph* linearize(
+      const gtsam::Values& values) const;
+  [[release_gil]] static gtsam::NonlinearFactorGraph Load(string filename);
+
+  template <T = {gtsam::Point2, gtsam::Point3}>
+  [[release_gil]] T at(size_t key) const;
+};
+
+[[release_gil]] gtsam::Values optimize(const gtsam::NonlinearFactorGraph& graph,
+                                       const gtsam::Values& initial);
+size_t numKeys(const gtsam::Values& values);
+
+}  // namespace gtsam
@@ -0,0 +1,163 @@
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Tests for the benchmark suite.
+"""
+
+# pylint: disable=import-error,wrong-import-position
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.eigen_args_benchmark import \
+    format_results as format_eigen_args
+from benchmarks.eigen_args_benchmark import CASES, VARIANTS, write_sources
+from benchmarks.generate_interface import (generate_interface,
+                                           generate_templated_interface)
+from benchmarks.instantiation_benchmark import \
+    format_results as format_instantiation
+from benchmarks.instantiation_benchmark import run_instantiation_benchmark
+from benchmarks.memory_benchmark import format_results as format_memory
+from benchmarks.memory_benchmark import run_memory_benchmark
+from benchmarks.run_benchmarks import format_results, run_benchmarks
+from benchmarks.startup_benchmark import format_results as format_startup
+from benchmarks.startup_benchmark import run_startup_benchmark
+from gtwrap.interface_parser import Class, Module, Namespace
+
+
+class TestBenchmarks(unittest.TestCase):
+    """Tests for the synthetic interfaces and the benchmark runner."""
+
+    def test_generate_interface(self):
+        """Test the structure of a generated interface."""
+        content = generate_interface(num_classes=10,
+                                     num_methods=4,
+                                     num_instantiations=2,
+                                     namespace_depth=3)
+        module = Module.parseString(content, backend="recursive_descent")
+
+        classes = []
+        namespace = module.content[0]
+        depth = 0
+        while namespace is not None:
+            depth += 1
+            classes += [x for x in namespace.content if isinstance(x, Class)]
+            namespace = next(
+                (x for x in namespace.content if isinstance(x, Namespace)),
+                None)
+
+        self.assertEqual(3, depth)
+        self.assertEqual(10, len(classes))
+        templates = [x for x in classes if x.template]
+        self.assertEqual(2, len(templates))
+        self.assertEqual([2, 2],
+                         [len(x.template.instantiations[0]) for x in templates])
+        self.assertTrue(all(len(x.methods) >= 4 for x in classes))
+
+    def test_run_benchmarks(self):
+        """Test that the benchmark report has all the measurements."""
+        report = run_benchmarks([2, 4],
+                                num_methods=2,
+                                phases=("parse", "instantiate"),
+                                backend="recursive_descent")
+
+        self.assertEqual("recursive_descent", report["backend"])
+        self.assertEqual([2, 4],
+                         [x["config"]["classes"] for x in report["results"]])
+        for result in report["results"]:
+            self.assertEqual(["parse", "instantiate"], list(result["phases"]))
+            for stats in result["phases"].values():
+                self.assertEqual({"wall_time", "cpu_time", "peak_memory"},
+                                 set(stats))
+
+        table = format_results(report, baseline=report)
+        self.assertIn("1.00x", table)
+
+    def test_instantiation_benchmark(self):
+        """Test the templated interface and the instantiation benchmark."""
+        content = generate_templated_interface(num_templates=2,
+                                               num_instantiations=3,
+                                               num_methods=4)
+        module = Module.parseString(content, backend="recursive_descent")
+        templates = [x for x in module.content[0].content if x.template]
+        self.assertEqual(2, len(templates))
+        self.assertEqual([3, 3],
+                         [len(x.template.instantiations[0]) for x in templates])
+
+        report = run_instantiation_benchmark([2, 3],
+                                             num_templates=2,
+                                             num_methods=4,
+                                             repeat=1)
+        self.assertEqual([2, 3], [
+            x["config"]["instantiations"] for x in report["results"]
+        ])
+        table = format_instantiation(report, baseline=report)
+        self.assertIn("1.00x", table)
+
+    def test_memory_benchmark(self):
+        """Test that the memory report has all the measurements."""
+        report = run_memory_benchmark([4], num_methods=2)
+
+        memory = report["results"][0]["memory"]
+        self.assertEqual(
+            {"retained_memory", "peak_memory", "start_rss", "peak_rss"},
+            set(memory))
+        self.assertGreater(memory["retained_memory"], 0)
+        self.assertGreaterEqual(memory["peak_memory"],
+                                memory["retained_memory"])
+
+        table = format_memory(report, baseline=report)
+        self.assertIn("1.00x", table)
+
+    def test_startup_benchmark(self):
+        """Test that the startup report has all the measurements."""
+        report = run_startup_benchmark(["recursive_descent"], repeat=1)
+
+        times = report["results"][0]["times"]
+        self.assertEqual(
+            {"interpreter", "import", "first_parse", "second_parse",
+             "process"}, set(times))
+        self.assertGreater(times["process"], times["import"])
+
+        table = format_startup(report, baseline=report)
+        self.assertIn("1.00x", table)
+
+    def test_eigen_args_benchmark(self):
+        """Test the wrapped modules and the table of the Eigen benchmark,
+        without compiling the modules."""
+        with tempfile.TemporaryDirectory() as build_dir:
+            sources = write_sources(build_dir)
+            self.assertEqual(set(VARIANTS), set(sources))
+            for module_name, eigen_ref_args in VARIANTS.items():
+                with open(sources[module_name], "r", encoding="UTF-8") as f:
+                    content = f.read()
+                self.assertIn(f"PYBIND11_MODULE({module_name}, m_)", content)
+                self.assertEqual(eigen_ref_args, "Eigen::Ref" in content)
+
+        report = {
+            "results": [{
+                "config": {
+                    "eigen_ref_args": eigen_ref_args,
+                    "size": 10
+                },
+                "times": {
+                    f"{method}/{layout}": 2e-6 if eigen_ref_args else 4e-6
+                    for method, layout in CASES
+                },
+            } for eigen_ref_args in VARIANTS.values()]
+        }
+        table = format_eigen_args(report)
+        self.assertIn("0.50x", table)
+        self.assertIn("1.00x", format_eigen_args(report, baseline=report))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Tests for the writing of the generated files.
+"""
+
+# pylint: disable=import-error,wrong-import-position
+
+import os
+import os.path as osp
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(osp.dirname(osp.dirname(osp.abspath(__file__))))
+
+from gtwrap.file_writer import FileWriter
+from gtwrap.matlab_wrapper import MatlabWrapper
+from gtwrap.pybind_wrapper import PybindWrapper
+
+
+class TestFileWriter(unittest.TestCase):
+    """Tests for FileWriter."""
+    TEST_DIR = osp.dirname(osp.realpath(__file__))
+    INTERFACE_DIR = osp.join(TEST_DIR, 'fixtures')
+
+    def test_write_if_changed(self):
+        """Test that a file is only written if its content changes."""
+        writer = FileWriter()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = osp.join(tmp_dir, "module.cpp")
+            self.assertTrue(writer.write(path, ["int a;\n", "int b;\n"]))
+
+            # Backdate the file to see whether it is touched.
+            os.utime(path, (1000, 1000))
+            self.assertFalse(writer.write(path, ["int a;\nint b;\n"]))
+            self.assertEqual(1000, os.stat(path).st_mtime)
+
+            self.assertTrue(writer.write(path, ["int a;\n"]))
+            with open(path, encoding="UTF-8") as f:
+                self.assertEqual("int a;\n", f.read())
+
+            # A file with other line endings is written again.
+            with open(path, "wb") as f:
+                f.write("int a;\n".replace("\n", "\r\n" if os.linesep
+                                           == "\n" else "\n").encode())
+            self.assertTrue(writer.write(path, ["int a;\n"]))
+            with open(path, "rb") as f:
+                self.assertEqual(f"int a;{os.linesep}".encode(), f.read())
+
+        self.assertEqual([path, path, path], writer.written)
+        self.assertEqual([path], writer.skipped)
+        self.assertEqual("3 file(s) written, 1 unchanged file(s) skipped",
+                         writer.summary())
+
+        other = FileWriter()
+        other.merge(writer)
+        self.assertEqual(writer.summary(), other.summary())
+
+    def test_wrappers(self):
+        """Test that wrapping an interface again does not write any files."""
+        source = osp.join(self.INTERFACE_DIR, 'class.i')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = osp.join(tmp_dir, "class_py.cpp")
+            for _ in range(2):
+                wrapper = PybindWrapper(module_name='class_py',
+                                        top_module_namespaces=[''],
+                                        module_template="{wrapped_namespace}")
+                wrapper.wrap([source], output)
+            self.assertEqual([], wrapper.writer.written)
+            self.assertEqual([output], wrapper.writer.skipped)
+
+            # The template file which CMake generates in the package.
+            template_file = osp.join(tmp_dir, "matlab_wrapper.tpl")
+            with open(template_file, 'w', encoding="UTF-8") as tpl:
+                tpl.write("#include <gtwrap/matlab.h>\n#include <map>\n")
+            with mock.patch.object(MatlabWrapper, "TEMPLATE_FILE",
+                                   template_file):
+                for _ in range(2):
+                    wrapper = MatlabWrapper(module_name='class')
+                    wrapper.wrap([source], osp.join(tmp_dir, "matlab"))
+            self.assertEqual([], wrapper.writer.written)
+            self.assertGreater(len(wrapper.writer.skipped), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,12 +12,17 @@ Author: Varun Agrawal
 
 # pylint: disable=import-error,wrong-import-position
 
+import copy
 import os
+import pickle
 import sys
+import tempfile
 import unittest
+from unittest import mock
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from gtwrap.interface_parser import cache as parse_cache
 from gtwrap.interface_parser import (ArgumentList, Class, Constructor,
                                      DunderMethod, Enum, Enumerator,
                                      ForwardDeclaration, GlobalFunction,
@@ -37,6 +42,33 @@ class TestInterfaceParser(unittest.TestCase):
         typename = Typename.rule.parseString("size_t")[0]
         self.assertEqual("size_t", typename.name)
 
+    def test_typename_interning(self):
+        """Test that equal typenames and types share the same object."""
+        module = Module.parseString("""
+            gtsam::Pose3 f(const gtsam::Pose3& a, const gtsam::Pose3& b);
+            std::vector<gtsam::Pose3> g(gtsam::Pose3 c);
+        """)
+        f, g = module.content
+        a, b = f.args.list()
+        self.assertIs(a.ctype, b.ctype)
+        self.assertIs(f.return_type.type1.typename, a.ctype.typename)
+        self.assertIs(g.args.list()[0].ctype.typename, a.ctype.typename)
+        self.assertIs(g.return_type.type1.typename.instantiations[0],
+                      a.ctype.typename)
+        self.assertIsNot(f.return_type.type1, a.ctype)
+
+        self.assertIs(Typename("Pose3", ["", "gtsam"]), a.ctype.typename)
+        self.assertEqual(Typename("gtsam::Pose3", []), a.ctype.typename)
+        self.assertEqual(hash(Typename("gtsam::Pose3", [])),
+                         hash(a.ctype.typename))
+        self.assertIs(copy.deepcopy(a.ctype), a.ctype)
+        self.assertIs(pickle.loads(pickle.dumps(a.ctype)), a.ctype)
+
+        with self.assertRaises(AttributeError):
+            a.ctype.typename.name = "Pose2"
+        with self.assertRaises(AttributeError):
+            a.ctype.is_const = ""
+
     def test_basic_type(self):
         """Tests for BasicType."""
         # Check basic type
@@ -673,6 +705,94 @@ class TestInterfaceParser(unittest.TestCase):
         self.assertEqual(["two", "two_dummy", "two", "oneVar"],
                          [x.name for x in module.content[0].content])
 
+    def test_find_class_or_function(self):
+        """Test the lookup of the classes and functions of a module."""
+        module = Module.parseString("""
+        namespace one {
+            namespace two {
+                class Class12a {};
+                void func12();
+            }
+            namespace two {
+                class Class12b {};
+                class Class12a {};
+            }
+            class Forward;
+        }
+        class Global {};
+        """)
+
+        def find(name):
+            return module.find_class_or_function(
+                Typename.rule.parseString(name)[0])
+
+        self.assertEqual(find("one::two::Class12b").name, "Class12b")
+        self.assertEqual(find("one::two::func12").name, "func12")
+        self.assertEqual(find("one::Forward").name, "Forward")
+        self.assertEqual(find("Global").name, "Global")
+        self.assertIs(find("one::two::Class12b").parent,
+                      module.content[0].content[1])
+
+        for name in ("Class12b", "one::Class12b", "one::three::Class12b"):
+            with self.assertRaisesRegex(ValueError, "Cannot find class"):
+                find(name)
+        with self.assertRaisesRegex(ValueError, "more than one"):
+            find("one::two::Class12a")
+
+        # The index follows the changes of the content.
+        module.content = module.content[:1]
+        with self.assertRaisesRegex(ValueError, "Cannot find class"):
+            find("Global")
+        module.content.append(Class.rule.parseString("class Global {};")[0])
+        self.assertEqual(find("Global").name, "Global")
+        replaced = Class.rule.parseString("class Global {};")[0]
+        module.content[1] = replaced
+        self.assertIs(find("Global"), replaced)
+        module.content[0].content[1].content[0] = Class.rule.parseString(
+            "class Class12c {};")[0]
+        self.assertEqual(find("one::two::Class12c").name, "Class12c")
+        with self.assertRaisesRegex(ValueError, "Cannot find class"):
+            find("one::two::Class12b")
+
+    def test_module_cache(self):
+        """Test caching of the parsed module."""
+        content = """
+        namespace gtsam {
+            class Point2 {
+                Point2(double x, double y);
+                double x() const;
+            };
+        }
+        """
+        with tempfile.TemporaryDirectory() as cache_dir:
+            module = Module.parseString(content, cache_dir=cache_dir)
+            self.assertEqual(1, len(os.listdir(cache_dir)))
+
+            # The second parse should be loaded from the cache.
+            with mock.patch.object(Module, "rule") as rule:
+                cached = Module.parseString(content, cache_dir=cache_dir)
+                rule.parseString.assert_not_called()
+
+            self.assertEqual(["gtsam"], [x.name for x in cached.content])
+            point2 = cached.content[0].content[0]
+            self.assertEqual("Point2", point2.name)
+            self.assertEqual(["x"], [m.name for m in point2.methods])
+            self.assertIs(point2, point2.methods[0].parent)
+            self.assertEqual(repr(module), repr(cached))
+
+            # Changing the content creates a new entry.
+            Module.parseString(content.replace("double x", "double z"),
+                               cache_dir=cache_dir)
+            self.assertEqual(2, len(os.listdir(cache_dir)))
+
+    def test_module_cache_grammar_version(self):
+        """Test that a different grammar invalidates the cache."""
+        cache = parse_cache.ParseCache("")
+        key = cache.key("class A {};")
+        with mock.patch.object(parse_cache, "grammar_version",
+                               return_value="other"):
+            self.assertNotEqual(key, cache.key("class A {};"))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -9,7 +9,9 @@ import filecmp
 import os
 import os.path as osp
 import sys
+import tempfile
 import unittest
+from unittest import mock
 
 sys.path.append(osp.dirname(osp.dirname(osp.abspath(__file__))))
 
@@ -33,12 +35,17 @@ class TestWrap(unittest.TestCase):
         if not osp.exists(self.MATLAB_ACTUAL_DIR):
             os.mkdir(self.MATLAB_ACTUAL_DIR)
 
-        # Generate the matlab.h file if it does not exist
-        template_file = osp.join(self.TEST_DIR, "..", "gtwrap",
-                                 "matlab_wrapper", "matlab_wrapper.tpl")
-        if not osp.exists(template_file):
-            with open(template_file, 'w', encoding="UTF-8") as tpl:
-                tpl.write("#include <gtwrap/matlab.h>\n#include <map>\n")
+        # Generate the template file, which CMake generates in the package,
+        # in a temporary directory instead.
+        template_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(template_dir.cleanup)
+        template_file = osp.join(template_dir.name, "matlab_wrapper.tpl")
+        with open(template_file, 'w', encoding="UTF-8") as tpl:
+            tpl.write("#include <gtwrap/matlab.h>\n#include <map>\n")
+        patcher = mock.patch.object(MatlabWrapper, "TEMPLATE_FILE",
+                                    template_file)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
         # Create the `actual/matlab` directory
         os.makedirs(self.MATLAB_ACTUAL_DIR, exist_ok=True)
@@ -0,0 +1,302 @@
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Tests that the parser backends give identical results.
+"""
+
+# pylint: disable=import-error,wrong-import-position
+
+import glob
+import os
+import subprocess
+import sys
+import unittest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyparsing import ParseException, ParseResults  # type: ignore
+
+from gtwrap.interface_parser import (Module, PackratStats, configure_packrat,
+                                     packrat_stats)
+from gtwrap.interface_parser.packrat import _LruCache
+from gtwrap.interface_parser.preprocess import strip_comments
+from gtwrap.interface_parser.recursive_descent import tokenize
+
+
+def dump(node):
+    """
+    Convert a parsed tree into nested lists and dicts which can be compared.
+
+    The `parent` back-references are skipped since they point up the tree,
+    and so are private attributes, e.g. cached strings.
+    """
+    if isinstance(node, (list, tuple, ParseResults)):
+        return [dump(x) for x in node]
+    if hasattr(node, "__dict__") or hasattr(node, "__slots__"):
+        attributes = dict(getattr(node, "__dict__", {}))
+        for cls in type(node).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if hasattr(node, slot):
+                    attributes[slot] = getattr(node, slot)
+        return (type(node).__name__, {
+            key: dump(value)
+            for key, value in sorted(attributes.items())
+            if key != "parent" and not key.startswith("_")
+        })
+    return node
+
+
+class TestParserBackends(unittest.TestCase):
+    """Compare the other parser backends against the pyparsing rules."""
+    TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+    FIXTURES_DIR = os.path.join(TEST_DIR, "fixtures")
+
+    def assertSameParse(self, content: str):
+        """Assert that all the backends give the same tree for `content`."""
+        expected = dump(Module.parseString(content, backend="pyparsing"))
+        for backend in Module.BACKENDS[1:]:
+            with self.subTest(backend=backend):
+                actual = Module.parseString(content, backend=backend)
+                self.assertEqual(expected, dump(actual))
+        for backend in Module.BACKENDS:
+            with self.subTest(backend=backend, strip_comments=True):
+                actual = Module.parseString(content,
+                                            backend=backend,
+                                            strip_comments=True)
+                self.assertEqual(expected, dump(actual))
+
+    def test_fixtures(self):
+        """Test that all the fixtures give the same tree."""
+        fixtures = sorted(glob.glob(os.path.join(self.FIXTURES_DIR, "*.i")))
+        self.assertTrue(fixtures)
+        for fixture in fixtures:
+            with self.subTest(fixture=os.path.basename(fixture)):
+                with open(fixture, "r") as f:
+                    self.assertSameParse(f.read())
+
+    def test_default_args(self):
+        """Test default arguments with nested and quoted expressions."""
+        self.assertSameParse("""
+            void f(string s = "hello, world", int x = -1,
+                   gtsam::Pose3 p = gtsam::Pose3(),
+                   std::vector<int> v = {1, 2}, K k = K<a, b>::c,
+                   string url = "http://x//y", char c = 'c',
+                   int y = (1, 2), double d = 1.5e-3);
+            double k = sizeof(int) ;
+        """)
+
+    def test_members(self):
+        """Test all the kinds of class members."""
+        self.assertSameParse("""
+            template<T = {gtsam::Point2, Matrix<3, 3>}, U>
+            virtual class Foo : Bar<T, U*> {
+              Foo(const T& t, U@ u);
+              __len__();
+              __contains__(size_t i);
+              std::pair<A, B> p() const;
+              pair<vector<int>, int> q();
+              static void s();
+              template<S = {double}> void t(S x);
+              Foo operator+(const Foo &v) const;
+              Foo operator-() const;
+              double operator()(double x) const;
+              int operator [] (size_t i) const;
+              enum class E { a, b };
+              unsigned char c(const unsigned char x);
+              double y = 2.0;
+              gtsam::Matrix m;
+            };
+        """)
+
+    def test_attributes(self):
+        """Test the attributes of classes, methods and functions."""
+        self.assertSameParse("""
+            class [[release_gil]] A {
+              A();
+              [[release_gil]] double x() const;
+              [[ release_gil ]] static A y();
+              template<T = {double}> [[release_gil]] T z();
+            };
+            template<T = {int}> [[release_gil]] void f(T t);
+        """)
+
+    def test_declarations(self):
+        """Test all the kinds of declarations in a namespace."""
+        self.assertSameParse("""
+            #include <gtsam/geometry/Pose3.h>
+            #include < spaced.h >
+            namespace a {
+            namespace b {
+              class C;
+              virtual class D : gtsam::E;
+              enum struct X { A };
+              typedef gtsam::Foo<double, int> FooDI;
+              std::vector<std::vector<double>> f(
+                  const std::vector<std::vector<double> >& in);
+            }  // namespace b
+            }
+        """)
+
+    def test_errors(self):
+        """Test that all the backends reject the same invalid inputs."""
+        for content in [
+                "class A { int x };", "void f(", "namespace a {", "}",
+                "class A {};;", "void f(int x = );"
+        ]:
+            for backend in Module.BACKENDS:
+                with self.subTest(content=content, backend=backend):
+                    with self.assertRaises(ParseException):
+                        Module.parseString(content, backend=backend)
+
+        for backend in Module.BACKENDS:
+            with self.subTest(backend=backend):
+                with self.assertRaises(ValueError):
+                    Module.parseString("class A { B(); };", backend=backend)
+                with self.assertRaises(ValueError):
+                    Module.parseString("[[fast]] void f();", backend=backend)
+
+        with self.assertRaises(ValueError):
+            Module.parseString("", backend="yacc")
+
+    def test_comments(self):
+        """Test comments between and within the declarations."""
+        self.assertSameParse("""
+            // A comment with a quote ' and "string".
+            #include <path//with/*slashes.h>
+            /* A block comment
+               over several lines. */
+            class/**/A {// comment
+              void f(string s = "/* not a comment */", int x = 1)/*x*/;
+              double y = 2 /* comment */;  /// doc
+            };
+            // The end""")
+
+    def test_strip_comments(self):
+        """Test the stripped text and the map of offsets to the source."""
+        source = 'f(/* a */x,  "//y"); // c\n  \n\tg(); //'
+        stripped, source_map = strip_comments(source)
+        self.assertEqual('f( x,  "//y");\ng(); ', stripped)
+        for token in ["x", '"//y"', "g", ";"]:
+            self.assertEqual(source.rindex(token),
+                             source_map.source_offset(stripped.rindex(token)))
+
+    def test_strip_comments_errors(self):
+        """Test that the errors point at the location in the source."""
+        source = "/* comment */\nclass A {\n  // comment\n  int x };"
+        for backend in Module.BACKENDS:
+            with self.subTest(backend=backend):
+                with self.assertRaises(ParseException) as expected:
+                    Module.parseString(source, backend=backend)
+                with self.assertRaises(ParseException) as actual:
+                    Module.parseString(source,
+                                       backend=backend,
+                                       strip_comments=True)
+                self.assertEqual(source, actual.exception.pstr)
+                self.assertEqual(expected.exception.loc,
+                                 actual.exception.loc)
+                self.assertGreater(actual.exception.lineno, 1)
+
+    def test_tokenize(self):
+        """Test that comments are skipped but not inside strings."""
+        tokens = tokenize('f(/* a */ "//b"); // c\n::d')
+        self.assertEqual(["f", "(", '"//b"', ")", ";", "::", "d", ""],
+                         [token.value for token in tokens])
+        self.assertEqual("eof", tokens[-1].kind)
+
+    def test_lazy_rules(self):
+        """
+        Test that no rule or token is built and packrat is not enabled on
+        import or by the recursive descent backend, that the rules are
+        built only once, and that they skip comments when built on their own.
+        """
+        result = subprocess.run([
+            sys.executable, "-c", "from gtwrap.interface_parser import *\n"
+            "from gtwrap.interface_parser.utils import lazy_rule\n"
+            "from pyparsing import ParserElement\n"
+            "rules = [(c, n) for c in (Typename, BasicType, CustomType, Type,\n"
+            "    TemplatedType, Template, Template.TypenameAndInstantiations,\n"
+            "    TypedefTemplateInstantiation, Argument, ArgumentList,\n"
+            "    ReturnType, GlobalFunction, Variable, Enumerator, Enum,\n"
+            "    Include, ForwardDeclaration, Method, StaticMethod,\n"
+            "    Constructor, Operator, DunderMethod, Class, Class.Members,\n"
+            "    Namespace, Module) for n, v in vars(c).items()\n"
+            "    if isinstance(v, lazy_rule)]\n"
+            "tokens = [n for n, v in vars(Tokens).items()\n"
+            "    if isinstance(v, lazy_rule)]\n"
+            "print(len(rules) >= 30, len(tokens) >= 25)\n"
+            "Module.parseString('class A {};', backend='recursive_descent')\n"
+            "print(isinstance(vars(Tokens)['IDENT'], lazy_rule),\n"
+            "      not ParserElement._packratEnabled)\n"
+            "print(Class.rule.parseString('class A { // B\\n };')[0].name\n"
+            "      == 'A')\n"
+            "rule = Module.rule\n"
+            "print(rule is Module.rule is Module.__dict__['rule'])\n"
+            "print(Module.uncommented_rule is Module.uncommented_rule)\n"
+            "print(isinstance(Module.__dict__['ordered_rule'], lazy_rule))\n"
+            "Module.parseString('class A {};')\n"
+            "print(not isinstance(vars(Tokens)['IDENT'], lazy_rule),\n"
+            "      ParserElement._packratEnabled)"
+        ],
+                                cwd=os.path.dirname(self.TEST_DIR),
+                                capture_output=True,
+                                text=True,
+                                check=True)
+        self.assertEqual(["True"] * 10, result.stdout.split())
+
+    def test_packrat(self):
+        """
+        Test that the packrat cache modes give the same tree, and the
+        statistics of the cache.
+        """
+        content = "class A { double x() const; void y(int a = 1); };"
+        expected = dump(Module.parseString(content))
+        try:
+            for size, mode in ((4, "fifo"), (4, "lru"), (4, "unbounded"),
+                               (4, "off")):
+                with self.subTest(mode=mode):
+                    stats = PackratStats()
+                    actual = Module.parseString(content,
+                                                packrat_cache_size=size,
+                                                packrat_mode=mode,
+                                                packrat_stats=stats)
+                    self.assertEqual(expected, dump(actual))
+                    if mode == "off":
+                        self.assertEqual(0, stats.misses)
+                        continue
+                    self.assertGreater(stats.hits, 0)
+                    self.assertEqual(
+                        stats.misses if mode == "unbounded" else size,
+                        stats.peak_size)
+
+            # The statistics accumulate over the parses.
+            stats = PackratStats()
+            for _ in range(2):
+                Module.parseString(content, packrat_stats=stats)
+            self.assertEqual(2 * packrat_stats().misses, stats.misses)
+
+            with self.assertRaises(ValueError):
+                configure_packrat(mode="random")
+            with self.assertRaises(ValueError):
+                configure_packrat(size=-1)
+        finally:
+            configure_packrat()
+
+    def test_lru_cache(self):
+        """Test that the LRU packrat cache evicts the least recently used."""
+        cache = _LruCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(1, cache.get("a"))
+        cache.set("c", 3)
+        self.assertIs(cache.not_in_cache, cache.get("b"))
+        self.assertEqual(1, cache.get("a"))
+        cache.clear()
+        self.assertIs(cache.not_in_cache, cache.get("a"))
+
+
+if __name__ == '__main__':
+    unittest.main()
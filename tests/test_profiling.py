@@ -0,0 +1,102 @@
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Tests for the timing of the wrapping phases.
+"""
+
+# pylint: disable=import-error,wrong-import-position
+
+import json
+import os
+import os.path as osp
+import sys
+import tempfile
+import unittest
+
+sys.path.append(osp.dirname(osp.dirname(osp.abspath(__file__))))
+
+from gtwrap.profiling import PhaseTimer
+from gtwrap.pybind_wrapper import PybindWrapper
+
+
+class TestPhaseTimer(unittest.TestCase):
+    """Tests for PhaseTimer."""
+
+    def test_disabled(self):
+        """Test that a disabled timer does not measure anything."""
+        timer = PhaseTimer()
+        with timer.phase("parse"):
+            pass
+        self.assertEqual({}, timer.records)
+
+    def test_nested_phases(self):
+        """Test the measurements of nested and repeated phases."""
+        timer = PhaseTimer(enabled=True)
+        with timer.phase("file.i"):
+            with timer.phase("parse"):
+                data = [0] * 100000
+            del data
+            with timer.phase("emit"):
+                for _ in range(3):
+                    with timer.phase("docstrings"):
+                        pass
+
+        self.assertEqual([("file.i", ), ("file.i", "parse"),
+                          ("file.i", "emit"), ("file.i", "emit", "docstrings")],
+                         list(timer.records))
+
+        total = timer.records[("file.i", )]
+        parse = timer.records[("file.i", "parse")]
+        docstrings = timer.records[("file.i", "emit", "docstrings")]
+        self.assertEqual(3, docstrings["calls"])
+        self.assertGreaterEqual(total["wall_time"], parse["wall_time"])
+        # The list allocated while parsing is included in the peaks.
+        self.assertGreater(parse["peak_memory"], 800000)
+        self.assertGreaterEqual(total["peak_memory"], parse["peak_memory"])
+
+        self.assertIn("    docstrings", timer.report())
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filename = osp.join(tmp_dir, "timings.json")
+            timer.write_json(filename)
+            with open(filename, "r", encoding="UTF-8") as f:
+                phases = json.load(f)["phases"]
+        self.assertEqual(["file.i", "parse"], phases[1]["phase"])
+        self.assertEqual(1, phases[1]["calls"])
+
+    def test_merge(self):
+        """Test accumulating the measurements of another timer."""
+        timer, other = PhaseTimer(enabled=True), PhaseTimer(enabled=True)
+        for t in (timer, other):
+            with t.phase("a.i"):
+                pass
+        with other.phase("b.i"):
+            pass
+
+        timer.merge(other.records)
+        self.assertEqual([("a.i", ), ("b.i", )], list(timer.records))
+        self.assertEqual(2, timer.records[("a.i", )]["calls"])
+
+    def test_pybind_wrapper(self):
+        """Test the phases measured when wrapping an interface file."""
+        timer = PhaseTimer(enabled=True)
+        wrapper = PybindWrapper(module_name="test",
+                                module_template="{wrapped_namespace}",
+                                timer=timer)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = osp.join(tmp_dir, "test.i")
+            with open(source, "w", encoding="UTF-8") as f:
+                f.write("class A { A(); double x() const; };")
+            wrapper.wrap([source], osp.join(tmp_dir, "test.cpp"))
+
+        self.assertEqual(
+            [("test.i", ), ("test.i", "parse"), ("test.i", "instantiate"),
+             ("test.i", "emit"), ("test.i", "write")], list(timer.records))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,15 +7,20 @@ Date: February 2019
 # pylint: disable=import-error, wrong-import-position, too-many-branches
 
 import filecmp
+import io
 import os
 import os.path as osp
+import re
 import sys
+import tempfile
 import unittest
 
 sys.path.append(osp.dirname(osp.dirname(osp.abspath(__file__))))
 sys.path.append(
     osp.normpath(osp.abspath(osp.join(__file__, '../../../build/wrap'))))
 
+import gtwrap.interface_parser as parser
+import gtwrap.template_instantiator as instantiator
 from gtwrap.pybind_wrapper import PybindWrapper
 
 sys.path.append(osp.dirname(osp.dirname(osp.abspath(__file__))))
@@ -35,7 +40,10 @@ class TestWrap(unittest.TestCase):
                      sources,
                      module_name,
                      output_dir,
-                     use_boost_serialization=False):
+                     use_boost_serialization=False,
+                     reference_returns="none",
+                     eigen_ref_args=False,
+                     overload_order="declaration"):
         """
         Common function to wrap content in `sources`.
         """
@@ -49,7 +57,10 @@ class TestWrap(unittest.TestCase):
             top_module_namespaces=[''],
             ignore_classes=[''],
             module_template=module_template,
-            use_boost_serialization=use_boost_serialization)
+            use_boost_serialization=use_boost_serialization,
+            reference_returns=reference_returns,
+            eigen_ref_args=eigen_ref_args,
+            overload_order=overload_order)
 
         output = osp.join(self.TEST_DIR, output_dir, module_name + ".cpp")
 
@@ -159,6 +170,316 @@ class TestWrap(unittest.TestCase):
 
         self.compare_and_diff('enum_pybind.cpp', output)
 
+    def test_release_gil(self):
+        """Test that the GIL is released for the [[release_gil]] members."""
+        source = osp.join(self.INTERFACE_DIR, 'release_gil.i')
+        output = self.wrap_content([source], 'release_gil_py',
+                                   self.PYTHON_ACTUAL_DIR)
+
+        self.compare_and_diff('release_gil_pybind.cpp', output)
+
+    def test_reference_returns(self):
+        """Test the return value policies of the methods returning references."""
+        source = osp.join(self.INTERFACE_DIR, 'reference_returns.i')
+        output = self.wrap_content([source], 'reference_returns_py',
+                                   self.PYTHON_ACTUAL_DIR)
+
+        self.compare_and_diff('reference_returns_pybind.cpp', output)
+
+        policy = "py::return_value_policy::reference_internal"
+        with open(output, "r", encoding="UTF-8") as f:
+            content = f.read()
+        self.assertIn(
+            "[](gtsam::JacobianFactor* self) -> const gtsam::Pose3& {",
+            content)
+        self.assertIn(
+            "[](gtsam::GaussianConditional* self) -> const gtsam::Matrix& {",
+            content)
+        self.assertEqual(2, content.count(policy))
+
+        for reference_returns, count in [("eigen", 5), ("all", 6)]:
+            with self.subTest(reference_returns=reference_returns):
+                output = self.wrap_content([source],
+                                           'reference_returns_py',
+                                           self.PYTHON_ACTUAL_DIR,
+                                           reference_returns=reference_returns)
+                with open(output, "r", encoding="UTF-8") as f:
+                    self.assertEqual(count, f.read().count(policy))
+
+        with self.assertRaises(ValueError):
+            PybindWrapper('reference_returns_py', reference_returns="some")
+
+    def test_eigen_ref(self):
+        """Test that the Eigen arguments are taken as Eigen::Ref."""
+        source = osp.join(self.INTERFACE_DIR, 'eigen_ref.i')
+        output = self.wrap_content([source], 'eigen_ref_py',
+                                   self.PYTHON_ACTUAL_DIR)
+
+        self.compare_and_diff('eigen_ref_pybind.cpp', output)
+
+        output = self.wrap_content([source],
+                                   'eigen_ref_py',
+                                   self.PYTHON_ACTUAL_DIR,
+                                   eigen_ref_args=True)
+        with open(output, "r", encoding="UTF-8") as f:
+            content = f.read()
+        # The callees which may take a const reference also keep their
+        # usual binding, for the arrays with another memory layout.
+        self.assertIn(
+            'm_gtsam.def("norm",'
+            '[](const Eigen::Ref<const gtsam::Vector>& v)'
+            '{return gtsam::norm(v);}, py::arg("v").noconvert());\n'
+            '    m_gtsam.def("norm",[](const gtsam::Vector& v)'
+            '{return gtsam::norm(v);}, py::arg("v"));', content)
+        self.assertEqual(3, content.count('.def("error",'))
+        self.assertEqual(1, content.count('.def("probPrime",'))
+
+    def test_batch(self):
+        """Test the vectorized variants of the [[batch]] functions."""
+        source = osp.join(self.INTERFACE_DIR, 'batch.i')
+        output = self.wrap_content([source], 'batch_py',
+                                   self.PYTHON_ACTUAL_DIR)
+
+        self.compare_and_diff('batch_pybind.cpp', output)
+
+        wrapper = PybindWrapper('batch_py')
+        for content in [
+                "namespace a { [[batch]] double f(); }",
+                "namespace a { [[batch]] void f(double x, double& y); }",
+                "namespace a { class A { [[batch]] void f(gtsam::Vector& v); };}",
+                "namespace a { class B {}; [[batch]] void f(a::B* b); }",
+                "namespace a { class B {}; [[batch]] void f(a::B@ b); }",
+        ]:
+            with self.subTest(content=content):
+                with self.assertRaises(ValueError):
+                    wrapper.wrap_file(content, module_name='batch_py')
+
+    def test_overload_order(self):
+        """Test ordering the overloads by the arguments their attempts copy."""
+        source = osp.join(self.INTERFACE_DIR, 'overloads.i')
+        output = self.wrap_content([source],
+                                   'overloads_py',
+                                   self.PYTHON_ACTUAL_DIR,
+                                   overload_order="cost")
+
+        self.compare_and_diff('overloads_pybind.cpp', output)
+
+        with open(source, encoding="UTF-8") as f:
+            content = f.read()
+        wrapper = PybindWrapper('overloads_py',
+                                module_template="{wrapped_namespace}")
+        declared = wrapper.wrap_file(content, module_name='overloads_py')
+        self.assertLess(declared.index("const gtsam::Matrix& A, size_t j"),
+                        declared.index("size_t i, size_t j"))
+        # The overloads of other arities are skipped without any copy.
+        self.assertEqual([
+            "gtsam::Values::at(const gtsam::Matrix&, size_t) copies 1 "
+            "argument(s) before the 1 overload(s) after it are tried",
+            "gtsam::Values::error(const gtsam::Vector&) copies 1 argument(s) "
+            "before the 1 overload(s) after it are tried",
+            "gtsam::solve(const gtsam::Vector&) copies 1 argument(s) before "
+            "the 1 overload(s) after it are tried",
+        ], wrapper.overload_diagnostics)
+
+        wrapper = PybindWrapper('overloads_py', overload_order="cost")
+        wrapper.wrap_file(content, module_name='overloads_py')
+        self.assertEqual([], wrapper.overload_diagnostics)
+
+        with self.assertRaises(ValueError):
+            PybindWrapper('overloads_py', overload_order="fastest")
+
+    def test_lazy_instantiation(self):
+        """
+        Test that the members of the ignored classes and of the classes
+        outside of the wrapped namespaces are not instantiated.
+        """
+        module = instantiator.instantiate_namespace(
+            parser.Module.parseString("""
+            namespace gtsam {
+              template <T = {double, int}>
+              class Wrapped { T value() const; };
+              template <T = {double, int}>
+              class Ignored { T value() const; };
+            }
+            namespace other {
+              class Outside { double value() const; };
+            }
+            """))
+        wrapper = PybindWrapper(module_name='lazy_py',
+                                top_module_namespaces=['', 'gtsam'],
+                                ignore_classes=['gtsam::Ignored<int>'],
+                                module_template="")
+        wrapped, _ = wrapper.wrap_namespace(module)
+
+        classes = {
+            cls.name: cls
+            for namespace in module.content for cls in namespace.content
+        }
+        self.assertIn('"WrappedInt"', wrapped)
+        self.assertIn('"IgnoredDouble"', wrapped)
+        self.assertNotIn('"IgnoredInt"', wrapped)
+        self.assertIn("methods", classes["WrappedInt"]._members)
+        self.assertEqual(classes["IgnoredInt"]._members, {})
+        self.assertEqual(classes["Outside"]._members, {})
+
+    def test_write_file(self):
+        """
+        Test that writing the wrapped code to a file object gives the same
+        code as `wrap_file`.
+        """
+        with open(osp.join(self.INTERFACE_DIR, 'class.i'),
+                  encoding="UTF-8") as f:
+            content = f.read()
+        with open(osp.join(self.PYTHON_TEST_DIR, 'class_pybind.cpp'),
+                  encoding="UTF-8") as f:
+            expected = f.read()
+        with open(osp.join(self.TEST_DIR, "pybind_wrapper.tpl"),
+                  encoding="UTF-8") as f:
+            module_template = f.read()
+
+        wrapper = PybindWrapper(module_name='class_py',
+                                top_module_namespaces=[''],
+                                ignore_classes=[''],
+                                module_template=module_template)
+        self.assertEqual(expected,
+                         wrapper.wrap_file(content, module_name='class_py'))
+
+        output = io.StringIO()
+        wrapper.write_file(output, content, module_name='class_py')
+        self.assertEqual(expected, output.getvalue())
+
+        # The wrapped namespace can occur in the template several times.
+        wrapper.module_template = "{wrapped_namespace}"
+        wrapped = wrapper.wrap_file(content, module_name='class_py')
+        wrapper.module_template = "{wrapped_namespace}\n{wrapped_namespace}"
+        self.assertEqual(wrapped + "\n" + wrapped,
+                         wrapper.wrap_file(content, module_name='class_py'))
+
+    def test_shards(self):
+        """
+        Test splitting the classes of a module into several files, with
+        the base classes in earlier shards than the derived classes.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = osp.join(tmp_dir, "sharded.i")
+            with open(source, "w", encoding="UTF-8") as f:
+                f.write("""
+                class Derived : Base { double value() const; };
+                namespace ns { class Inner { double value() const; }; }
+                class Base { double value() const; };
+                class Other { double value() const; };
+                """)
+            wrapper = PybindWrapper(
+                module_name='sharded_py',
+                top_module_namespaces=[''],
+                module_template="{submodules}\n{module_def} {{\n"
+                "{wrapped_namespace}\n}}\n",
+                shards=2)
+            output = osp.join(tmp_dir, "sharded.cpp")
+            wrapper.wrap([source], output)
+
+            with open(output, encoding="UTF-8") as f:
+                module = f.read()
+            shards = []
+            for index in range(2):
+                with open(osp.join(tmp_dir, f"sharded_{index}.cpp"),
+                          encoding="UTF-8") as f:
+                    shards.append(f.read())
+
+            wrapper.module_template = "{wrapped_namespace}"
+            with self.assertRaises(ValueError):
+                wrapper.wrap([source], output)
+
+        self.assertIn("void init_sharded_py_0(py::module_ &);", module)
+        self.assertIn('m_ns = m_.def_submodule("ns", "ns submodule");',
+                      module)
+        self.assertLess(module.index("init_sharded_py_0(m_);"),
+                        module.index("init_sharded_py_1(m_);"))
+        self.assertNotIn("py::class_", module)
+
+        code = "".join(shards)
+        self.assertIn("void init_sharded_py_1(py::module_ &m_) {", shards[1])
+        self.assertIn('m_ns = m_.attr("ns").cast<pybind11::module>();', code)
+        classes = re.findall(r', "(\w+)"\)', code)
+        self.assertEqual(["Base", "Derived", "Inner", "Other"], classes)
+
+    def test_shards_base_names(self):
+        """
+        Test that the base classes named relative to the namespace of the
+        derived classes, or with templates, are in earlier shards.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = osp.join(tmp_dir, "sharded.i")
+            with open(source, "w", encoding="UTF-8") as f:
+                f.write("""
+                namespace gtsam {
+                class Derived : internal::Base<double> {
+                  double value() const;
+                };
+                namespace internal {
+                class Inner : Root { double value() const; };
+                }
+                class Other { double value() const; };
+                namespace internal {
+                template <T = {double}>
+                class Base { double value() const; };
+                class Root { double value() const; };
+                }
+                }
+                """)
+            wrapper = PybindWrapper(
+                module_name='sharded_py',
+                top_module_namespaces=[''],
+                module_template="{submodules}\n{module_def} {{\n"
+                "{wrapped_namespace}\n}}\n",
+                shards=2)
+            wrapper.wrap([source], osp.join(tmp_dir, "sharded.cpp"))
+
+            code = ""
+            for index in range(2):
+                with open(osp.join(tmp_dir, f"sharded_{index}.cpp"),
+                          encoding="UTF-8") as f:
+                    code += f.read()
+
+        classes = re.findall(r', "(\w+)"\)', code)
+        self.assertLess(classes.index("BaseDouble"), classes.index("Derived"))
+        self.assertLess(classes.index("Root"), classes.index("Inner"))
+
+    def test_submodules(self):
+        """
+        Test that wrapping the submodules in a batch of processes gives the
+        same files as wrapping them one by one.
+        """
+        sources = [
+            osp.join(self.INTERFACE_DIR, 'part1.i'),
+            osp.join(self.INTERFACE_DIR, 'part2.i'),
+            osp.join(self.INTERFACE_DIR, 'enum.i')
+        ]
+        wrapper = PybindWrapper(module_name='submodules_py',
+                                top_module_namespaces=[''],
+                                ignore_classes=[''],
+                                module_template="{module_def} {{\n"
+                                "{wrapped_namespace}\n}}\n")
+
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            try:
+                for jobs in (1, 2):
+                    os.mkdir(osp.join(tmp_dir, str(jobs)))
+                    os.chdir(osp.join(tmp_dir, str(jobs)))
+                    wrapper.wrap_submodules(sources, jobs=jobs)
+            finally:
+                os.chdir(cwd)
+
+            files = ['part1.cpp', 'part2.cpp', 'enum.cpp']
+            self.assertEqual(sorted(files),
+                             sorted(os.listdir(osp.join(tmp_dir, '2'))))
+            _, mismatch, errors = filecmp.cmpfiles(osp.join(tmp_dir, '1'),
+                                                   osp.join(tmp_dir, '2'),
+                                                   files,
+                                                   shallow=False)
+            self.assertEqual([], mismatch + errors)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,226 @@
+"""
+GTSAM Copyright 2010-2020, Georgia Tech Research Corporation,
+Atlanta, Georgia 30332-0415
+All Rights Reserved
+
+See LICENSE for the license information
+
+Tests for the wrap server and its client.
+"""
+
+# pylint: disable=import-error,wrong-import-position
+
+import filecmp
+import os
+import os.path as osp
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.append(osp.dirname(osp.dirname(osp.abspath(__file__))))
+
+from unittest import mock
+
+from gtwrap.interface_parser import packrat
+from gtwrap.interface_parser.cache import ParseCache
+from gtwrap.server import WrapServer, run_script
+from gtwrap.template_instantiator import instantiation_cache_info
+from gtwrap.xml_parser import xml_parser
+
+ROOT_DIR = osp.dirname(osp.dirname(osp.abspath(__file__)))
+PYBIND_WRAP_SCRIPT = osp.join(ROOT_DIR, "scripts", "pybind_wrap.py")
+CLIENT_SCRIPT = osp.join(ROOT_DIR, "scripts", "wrap_client.py")
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix sockets")
+class TestServer(unittest.TestCase):
+    """Tests for WrapServer and wrap_client.py."""
+    TEST_DIR = osp.dirname(osp.realpath(__file__))
+    INTERFACE_DIR = osp.join(TEST_DIR, 'fixtures')
+
+    # Prints an environment variable and a module found on the PYTHONPATH.
+    ENV_SCRIPT = """
+import os
+import gtwrap_test_env_module
+print(os.environ["GTWRAP_TEST_ENV"], gtwrap_test_env_module.VALUE)
+"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.socket_path = osp.join(self.tmp_dir.name, "gtwrap.sock")
+        self.env_script = osp.join(self.tmp_dir.name, "env_script.py")
+        with open(self.env_script, "w", encoding="UTF-8") as f:
+            f.write(self.ENV_SCRIPT)
+        self.server = WrapServer(self.socket_path,
+                                 [PYBIND_WRAP_SCRIPT, self.env_script],
+                                 idle_timeout=60)
+        self.thread = threading.Thread(target=self.server.serve)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.running = False
+        # Wake the server up so that it sees that it should stop.
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.socket_path)
+        self.thread.join()
+        self.server.server_close()
+        self.tmp_dir.cleanup()
+
+    def wrap(self, script, output):
+        """Wrap `class.i` to `output` through the client."""
+        env = dict(os.environ,
+                   PYTHONPATH=os.pathsep.join(
+                       [ROOT_DIR, os.environ.get("PYTHONPATH", "")]))
+        return subprocess.run([
+            sys.executable, CLIENT_SCRIPT, "--socket", self.socket_path,
+            script, "--src",
+            osp.join(self.INTERFACE_DIR, "class.i"), "--module_name",
+            "class_py", "--out", output, "--ignore", "--template",
+            osp.join(self.TEST_DIR, "pybind_wrapper.tpl")
+        ],
+                              env=env,
+                              cwd=self.tmp_dir.name,
+                              capture_output=True,
+                              text=True,
+                              check=False)
+
+    def test_client(self):
+        """Test that wrapping through the server gives the expected file."""
+        result = self.wrap(PYBIND_WRAP_SCRIPT, "class_py.cpp")
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertIn("[PybindWrapper]", result.stderr)
+        self.assertTrue(
+            filecmp.cmp(osp.join(self.tmp_dir.name, "class_py.cpp"),
+                        osp.join(self.TEST_DIR, "expected", "python",
+                                 "class_pybind.cpp"),
+                        shallow=False))
+
+    def test_fallback(self):
+        """Test that the client runs the scripts refused by the server."""
+        script = osp.join(self.tmp_dir.name, "pybind_wrap.py")
+        with open(PYBIND_WRAP_SCRIPT, encoding="UTF-8") as f:
+            content = f.read()
+        with open(script, "w", encoding="UTF-8") as f:
+            f.write(content)
+
+        self.assertIn("error", self.server.run(script, [], self.tmp_dir.name))
+        result = self.wrap(script, "class_py.cpp")
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertTrue(osp.exists(osp.join(self.tmp_dir.name,
+                                            "class_py.cpp")))
+
+    def test_env(self):
+        """
+        Test that the script runs with the environment of the client,
+        including its PYTHONPATH, and that the server's is restored.
+        """
+        module_dir = osp.join(self.tmp_dir.name, "modules")
+        os.mkdir(module_dir)
+        with open(osp.join(module_dir, "gtwrap_test_env_module.py"),
+                  "w",
+                  encoding="UTF-8") as f:
+            f.write("VALUE = 42\n")
+
+        old_path, old_environ = list(sys.path), dict(os.environ)
+        env = dict(os.environ,
+                   GTWRAP_TEST_ENV="forwarded",
+                   PYTHONPATH=os.pathsep.join(
+                       [ROOT_DIR, "modules",
+                        os.environ.get("PYTHONPATH", "")]))
+        try:
+            result = subprocess.run([
+                sys.executable, CLIENT_SCRIPT, "--socket", self.socket_path,
+                self.env_script
+            ],
+                                    env=env,
+                                    cwd=self.tmp_dir.name,
+                                    capture_output=True,
+                                    text=True,
+                                    check=False)
+        finally:
+            sys.modules.pop("gtwrap_test_env_module", None)
+        self.assertEqual(0, result.returncode, result.stderr)
+        self.assertEqual("forwarded 42", result.stdout.strip())
+        self.assertEqual(old_path, sys.path)
+        self.assertEqual(old_environ, dict(os.environ))
+
+    def test_reset_caches(self):
+        """
+        Test that the packrat cache and the instantiation caches do not
+        carry over to the next run.
+        """
+        response = run_script(PYBIND_WRAP_SCRIPT, [
+            "--src",
+            osp.join(self.INTERFACE_DIR, "class.i"), "--module_name",
+            "class_py", "--out", "class_py.cpp", "--ignore", "--template",
+            osp.join(self.TEST_DIR, "pybind_wrapper.tpl"),
+            "--packrat_cache_size", "7"
+        ], self.tmp_dir.name)
+        self.assertEqual(0, response["returncode"], response["stderr"])
+        self.assertIsNone(packrat._config)  # pylint: disable=protected-access
+        for info in instantiation_cache_info().values():
+            self.assertEqual(0, info.currsize)
+
+    def test_run_script(self):
+        """Test the exit code and output of a script run in the server."""
+        response = run_script(PYBIND_WRAP_SCRIPT, ["--help"],
+                              self.tmp_dir.name)
+        self.assertEqual(0, response["returncode"])
+        self.assertIn("--module_name", response["stdout"])
+
+        response = run_script(PYBIND_WRAP_SCRIPT, [], self.tmp_dir.name)
+        self.assertEqual(2, response["returncode"])
+        self.assertIn("required", response["stderr"])
+
+
+class TestMemoryCache(unittest.TestCase):
+    """Tests for the in-memory cache of the parsed interface files."""
+
+    def tearDown(self):
+        ParseCache.memory = None
+
+    def test_memory(self):
+        """Test that the parsed files are kept in memory without a cache
+        directory."""
+        ParseCache.enable_memory(maxsize=1)
+        cache = ParseCache("")
+        self.assertIsNone(cache.load("class A {};"))
+
+        cache.store("class A {};", {"a": 1})
+        self.assertEqual({"a": 1}, cache.load("class A {};"))
+        # A copy is returned, so that the cached data cannot be changed.
+        self.assertIsNot(cache.load("class A {};"), cache.load("class A {};"))
+
+        cache.store("class B {};", {"b": 2})
+        self.assertIsNone(cache.load("class A {};"))
+        self.assertEqual({"b": 2}, cache.load("class B {};"))
+
+
+class TestXMLCache(unittest.TestCase):
+    """Tests for the shared cache of the parsed Doxygen XML files."""
+
+    def test_lru(self):
+        """Test that the least recently used trees are evicted."""
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+                mock.patch.object(xml_parser, "_SHARED_XML_CACHE_SIZE", 2), \
+                mock.patch.object(xml_parser, "_SHARED_XML_CACHE",
+                                  xml_parser.OrderedDict()) as cache:
+            paths = []
+            for name in "abc":
+                paths.append(osp.realpath(osp.join(tmp_dir, name + ".xml")))
+                with open(paths[-1], "w", encoding="UTF-8") as f:
+                    f.write(f"<{name}/>")
+
+            xml_parser.XMLDocParser().parse_xml(paths[0])
+            xml_parser.XMLDocParser().parse_xml(paths[1])
+            # Using the first tree keeps it over the second one.
+            xml_parser.XMLDocParser().parse_xml(paths[0])
+            xml_parser.XMLDocParser().parse_xml(paths[2])
+            self.assertEqual([paths[0], paths[2]], list(cache))
+
+
+if __name__ == '__main__':
+    unittest.main()
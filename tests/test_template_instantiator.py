@@ -20,7 +20,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from gtwrap.interface_parser import (Argument, ArgumentList, Class,
                                      Constructor, ForwardDeclaration,
-                                     GlobalFunction, Include, Method,
+                                     GlobalFunction, Include, Method, Module,
                                      Namespace, ReturnType, StaticMethod,
                                      Typename)
 from gtwrap.template_instantiator import (InstantiatedClass,
@@ -29,12 +29,16 @@ from gtwrap.template_instantiator import (InstantiatedClass,
                                           InstantiatedGlobalFunction,
                                           InstantiatedMethod,
                                           InstantiatedStaticMethod,
+                                          InstantiationCache,
                                           InstantiationHelper,
+                                          clear_instantiation_caches,
                                           instantiate_args_list,
                                           instantiate_name,
                                           instantiate_namespace,
                                           instantiate_return_type,
-                                          instantiate_type, is_scoped_template)
+                                          instantiate_type,
+                                          instantiation_cache_info,
+                                          is_scoped_template)
 
 
 class TestInstantiationHelper(unittest.TestCase):
@@ -347,6 +351,28 @@ class TestInstantiatedClass(unittest.TestCase):
         self.assertIsInstance(self.cl.original, Class)
         self.assertEqual(self.cl.name, "FooString")
 
+    def test_lazy_members(self):
+        """Test that the members are instantiated when first accessed."""
+        self.assertEqual(self.cl._members, {})
+
+        methods = self.cl.methods
+        self.assertEqual(list(self.cl._members), ["methods"])
+        self.assertIs(self.cl.methods, methods)
+        self.assertEqual(methods[0].name, "methodDouble")
+        self.assertIs(methods[0].parent, self.cl)
+
+        self.assertEqual(self.cl.properties[0].name, "prop")
+        self.assertIs(self.cl.properties[0].parent, self.cl)
+        self.assertEqual(sorted(self.cl._members), ["methods", "properties"])
+
+    def test_constructor_name(self):
+        """Test that a wrong constructor name fails before instantiation."""
+        original = self.cl.original
+        original.ctors[0].name = "Bar"
+        with self.assertRaisesRegex(ValueError,
+                                    "Error in constructor name! Bar != Foo"):
+            InstantiatedClass(original, self.cl.instantiations)
+
     def test_instantiate_ctors(self):
         """Test instantiate_ctors method."""
         ctors = self.cl.instantiate_ctors(self.typenames)
@@ -560,6 +586,65 @@ class TestTemplateInstantiator(unittest.TestCase):
                          "double")
         self.assertEqual(instantiated_return_type.type2.get_typename(), "char")
 
+    def test_instantiation_cache(self):
+        """Test the memoization of the instantiated types."""
+        clear_instantiation_caches()
+        instantiations = [Typename.rule.parseString("gtsam::Pose3")[0]]
+
+        # Parse the arguments twice, so that the templated types differ.
+        args = [
+            ArgumentList.rule.parseString(
+                "const T& x, const std::vector<T>& v, double y")[0].list()
+            for _ in range(2)
+        ]
+        instantiated_args = [
+            instantiate_args_list(args_list, ['T'], instantiations,
+                                  "ExampleClass") for args_list in args
+        ]
+        info = instantiation_cache_info()["args_list"]
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+        # The arguments are new, but their types are shared.
+        for first, second in zip(*instantiated_args):
+            self.assertIsNot(first, second)
+            self.assertIs(first.ctype, second.ctype)
+        self.assertEqual(instantiated_args[0][1].ctype.to_cpp(),
+                         "const std::vector<gtsam::Pose3>&")
+
+        # Typenames which are equal can still have different namespaces.
+        other_instantiations = [
+            Typename(name="gtsam::Pose3", namespaces=[], instantiations=[])
+        ]
+        self.assertEqual(other_instantiations, instantiations)
+        other_args = instantiate_args_list(args[0], ['T'],
+                                           other_instantiations,
+                                           "ExampleClass")
+        self.assertEqual(other_args[0].ctype.typename.namespaces, [])
+
+        # `This` is only replaced by the class of its own instantiation.
+        return_type = ReturnType.rule.parseString("This")[0]
+        for name in ("ExampleClass", "OtherClass"):
+            instantiated_return_type = instantiate_return_type(
+                return_type, ['T'], instantiations,
+                Typename(name=name, namespaces=[]))
+            self.assertEqual(instantiated_return_type.type1.typename.name,
+                             name)
+
+        clear_instantiation_caches()
+        self.assertEqual(instantiation_cache_info()["args_list"].currsize, 0)
+
+    def test_instantiation_cache_size(self):
+        """Test the bound of the InstantiationCache."""
+        cache = InstantiationCache(maxsize=2)
+        for key in (1, 2, 1, 3, 2):
+            cache.get(key, (), lambda key=key: key * 10)
+        info = cache.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 4))
+        self.assertEqual((info.maxsize, info.currsize), (2, 2))
+        # The least recently used entry is evicted.
+        self.assertEqual(cache.get(3, (), lambda: None), 30)
+        self.assertEqual(cache.get(1, (), lambda: None), None)
+
     def test_instantiate_name(self):
         """Test for instantiate_name."""
         instantiations = [Typename.rule.parseString("Man")[0]]
@@ -616,5 +701,25 @@ class TestTemplateInstantiator(unittest.TestCase):
             "staticMethodDouble")
 
 
+    def test_find_instantiated_class(self):
+        """Test that the lookups after the instantiation find its results."""
+        module = instantiate_namespace(
+            Module.parseString("""
+            namespace gtsam {
+                class Pose3 {};
+                template<T={double}>
+                class Values {};
+                typedef gtsam::Values<gtsam::Pose3> PoseValues;
+            }
+            """))
+        namespace = module.content[0]
+        for name, element in (("gtsam::Pose3", namespace.content[0]),
+                              ("gtsam::PoseValues", namespace.content[2])):
+            found = module.find_class_or_function(
+                Typename.rule.parseString(name)[0])
+            self.assertIsInstance(found, InstantiatedClass)
+            self.assertIs(element, found)
+
+
 if __name__ == '__main__':
     unittest.main()